@@ -1,62 +1,58 @@
 #!/usr/bin/env python3
-import json
 import sys
+from pathlib import Path
+
+from localization_cache import load_cached_catalog
+from localization_catalog import STATE_TRANSLATED, STATE_VARIATIONS
+from localization_changeset import Changeset
 
 def fix_localizations(file_path):
     """Fix missing English localizations in Localizable.xcstrings file"""
     
-    # Read the file
-    with open(file_path, 'r', encoding='utf-8') as f:
-        data = json.load(f)
+    file_path = Path(file_path)
     
-    if 'strings' not in data:
-        print("Error: No 'strings' section found in file")
+    # Read the file
+    catalog = load_cached_catalog(file_path)
+    if catalog is None:
         return
     
+    changeset = Changeset(catalog)
     missing_en_count = 0
     fixed_count = 0
     
     # Process each string entry
-    for string_key, string_data in data['strings'].items():
-        # Skip entries that shouldn't be translated
-        if string_data.get('shouldTranslate') == False:
-            continue
-            
-        # Check if this entry has localizations
-        if 'localizations' not in string_data:
+    for key in catalog.keys:
+        available_languages = catalog.available_languages(key)
+        
+        # Skip entries that shouldn't be translated or have no localizations
+        if not catalog.translatable(key) or not available_languages:
             continue
-            
-        localizations = string_data['localizations']
         
         # Check if English ("en") is missing but other languages exist
-        if 'en' not in localizations and len(localizations) > 0:
+        if 'en' not in available_languages:
             missing_en_count += 1
-            print(f"Missing EN for key: '{string_key}'")
+            print(f"Missing EN for key: '{key}'")
             
             # Add English localization using the string key as the value
-            localizations['en'] = {
-                "stringUnit": {
-                    "state": "translated",
-                    "value": string_key
-                }
-            }
+            changeset.add(key, 'en', key)
             fixed_count += 1
             
         # Ensure all existing localizations have "state": "translated"
-        for lang_code, localization in localizations.items():
-            if 'stringUnit' in localization and 'state' not in localization['stringUnit']:
-                localization['stringUnit']['state'] = 'translated'
-            elif 'stringUnit' in localization and localization['stringUnit']['state'] != 'translated':
-                localization['stringUnit']['state'] = 'translated'
+        for lang_code in available_languages:
+            if catalog.state_code(key, lang_code) not in (STATE_TRANSLATED, STATE_VARIATIONS):
+                changeset.set_state(key, lang_code, 'translated')
     
     print(f"Found {missing_en_count} entries missing English localization")
     print(f"Fixed {fixed_count} entries")
     
-    # Write back the fixed file
-    with open(file_path, 'w', encoding='utf-8') as f:
-        json.dump(data, f, ensure_ascii=False, indent=2)
+    # Nothing to change: leave the file and its mtime (and snapshot) alone
+    if len(changeset) == 0:
+        print(f"No changes needed; {file_path} left untouched")
+        return
     
-    print(f"Successfully updated {file_path}")
+    # Write back only the changed entries
+    if changeset.save(file_path, backup=False):
+        print(f"Successfully updated {file_path}")
 
 if __name__ == "__main__":
     if len(sys.argv) > 1:
@@ -0,0 +1,199 @@
+#!/usr/bin/env python3
+"""
+Localization Command Line
+One entry point for the localization tools: status, analyze, diff, fix,
+merge, history, scan and bench. Each subcommand imports only what it
+uses, so a status check in an Xcode build phase does not load the fixer,
+translation store or MT client
+"""
+
+import argparse
+import os
+import sys
+from pathlib import Path
+
+from localization_report import FORMATS
+
+DEFAULT_CATALOG = Path(__file__).parent / "Localizable.xcstrings"
+
+
+class HelpFormatter(argparse.HelpFormatter):
+    """argparse's formatter, sized to the terminal without importing shutil.
+
+    argparse builds a formatter for every add_argument call, and the stock
+    one imports shutil, and with it bz2 and lzma, to read the terminal
+    width: a few milliseconds of every status check.
+    """
+
+    def __init__(self, prog, indent_increment=2, max_help_position=24, width=None):
+        if width is None:
+            try:
+                width = int(os.environ['COLUMNS'])
+            except (KeyError, ValueError):
+                try:
+                    width = os.get_terminal_size(sys.__stdout__.fileno()).columns
+                except (AttributeError, ValueError, OSError):
+                    width = 80
+            width -= 2
+        super().__init__(prog, indent_increment, max_help_position, width)
+
+
+def command_status(args):
+    from localization_status import check_localization_status
+
+    if not check_localization_status(args.format, args.catalog, args.true_completion):
+        sys.exit(1)
+
+
+def command_analyze(args):
+    from localization_analyzer import load_catalog, report_analysis
+
+    catalog = load_catalog(args.catalog, args.format)
+    report_analysis(args.catalog, catalog, args.format, args.coverage, args.usage)
+
+
+def command_diff(args):
+    from localization_diff import check_diff
+
+    sys.exit(check_diff(args.catalog, args.base, args.format, args.require_translated))
+
+
+def command_fix(args):
+    if not args.dry_run and not args.yes:
+        # Prompting without a terminal would hang CI; refuse instead
+        if args.format != 'text' or not sys.stdin.isatty():
+            print("Error: fix needs --yes or --dry-run when not run interactively", file=sys.stderr)
+            sys.exit(2)
+        response = input(f"Fix missing translations in {args.catalog}? (y/n): ").strip().lower()
+        if response != 'y':
+            print("Fix cancelled by user.")
+            return
+
+    from localization_fixer import fix_catalog_file
+
+    fix_catalog_file(args.catalog, args)
+
+
+def command_merge(args):
+    from localization_merge import main as merge_main
+
+    merge_main(args.arguments)
+
+
+def command_history(args):
+    from localization_history import main as history_main
+
+    history_main(args.arguments)
+
+
+def command_scan(args):
+    from localization_scanner import report_usage
+
+    if args.catalog.is_dir():
+        # scan used to take the source directory; do not read one as a catalog
+        print(f"Error: {args.catalog} is a directory; scan takes a catalog, use --root for the sources",
+              file=sys.stderr)
+        sys.exit(2)
+    report_usage(args.root or args.catalog.parent, args.catalog, args.jobs)
+
+
+def command_bench(args):
+    from localization_bench import main as bench_main
+
+    bench_main(args.arguments)
+
+
+def build_parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(prog='localization', description="Localization tools for .xcstrings catalogs",
+                                     formatter_class=HelpFormatter)
+    subcommands = parser.add_subparsers(dest='command', required=True, metavar='command')
+
+    def subcommand(name, **kwargs):
+        return subcommands.add_parser(name, formatter_class=HelpFormatter, **kwargs)
+
+    def catalog_argument(subparser):
+        subparser.add_argument('catalog', nargs='?', type=Path, default=DEFAULT_CATALOG,
+                               help="catalog file (default: Localizable.xcstrings next to this script)")
+
+    def format_argument(subparser):
+        subparser.add_argument('--format', choices=FORMATS, default='text',
+                               help="output format; json and ndjson keep progress messages on stderr")
+
+    status = subcommand('status', help="show completion status")
+    catalog_argument(status)
+    format_argument(status)
+    status.add_argument('--true-completion', action='store_true',
+                        help="also count copies of the source and wrong-script values as incomplete")
+    status.set_defaults(handler=command_status)
+
+    analyze = subcommand('analyze', help="report missing translations and suspicious values")
+    catalog_argument(analyze)
+    format_argument(analyze)
+    analyze.add_argument('--coverage', action='store_true',
+                         help="only print the per-language coverage and state histogram")
+    analyze.add_argument('--usage', action='store_true',
+                         help="also scan the Swift sources next to the catalog for unused or missing keys")
+    analyze.set_defaults(handler=command_analyze)
+
+    diff = subcommand('diff', help="check only the keys changed since a git ref")
+    catalog_argument(diff)
+    format_argument(diff)
+    diff.add_argument('--base', default='HEAD',
+                      help="git ref to compare against, e.g. origin/main (default: HEAD)")
+    diff.add_argument('--require-translated', action='store_true',
+                      help="also report changed keys with cells not in the 'translated' state")
+    diff.set_defaults(handler=command_diff)
+
+    fix = subcommand('fix', help="fill missing translations")
+    catalog_argument(fix)
+    format_argument(fix)
+    fix.add_argument('--dry-run', action='store_true', help="print the patch without saving")
+    fix.add_argument('--yes', '-y', action='store_true', help="do not ask for confirmation")
+    fix.add_argument('--mt-url', default=os.environ.get('LOCALIZATION_MT_URL'),
+                     help="machine-translation endpoint (default: $LOCALIZATION_MT_URL)")
+    fix.add_argument('--translation-db', type=Path, default=None,
+                     help="shared SQLite translation store "
+                          "(default: $LOCALIZATION_TRANSLATION_DB or ~/.cache/localization)")
+    fix.add_argument('--no-translation-db', action='store_true',
+                     help="do not read or record translations in the shared store")
+    fix.add_argument('--jobs', '-j', type=int, default=None,
+                     help="worker processes for translation lookups (default: one per CPU)")
+    fix.set_defaults(handler=command_fix)
+
+    merge = subcommand('merge', add_help=False,
+                       help="three-way merge driver for .xcstrings files (see merge --help)")
+    # Arguments go to localization_merge.py: BASE OURS THEIRS [PATH], or --install
+    merge.set_defaults(handler=command_merge)
+
+    history = subcommand('history', add_help=False,
+                         help="completion per language across the catalog's git history (see history --help)")
+    # Arguments go to localization_history.py, e.g. a catalog path, --format csv or --html chart.html
+    history.set_defaults(handler=command_history)
+
+    scan = subcommand('scan', help="find localization keys used in the Swift sources")
+    catalog_argument(scan)
+    scan.add_argument('--root', type=Path, default=None,
+                      help="source directory to scan (default: the directory of the catalog)")
+    scan.add_argument('--jobs', '-j', type=int, default=None, help="worker processes for parsing")
+    scan.set_defaults(handler=command_scan)
+
+    bench = subcommand('bench', add_help=False,
+                       help="time load, analysis, fix and save on a catalog "
+                            "or on generated synthetic catalogs")
+    # Everything after "bench" is handed to localization_bench.py, e.g. a catalog path or --case 100kx40
+    bench.set_defaults(handler=command_bench)
+    return parser
+
+
+def main(argv=None):
+    """Main function."""
+    parser = build_parser()
+    args, arguments = parser.parse_known_args(argv)
+    if arguments and args.command not in ('bench', 'merge', 'history'):
+        parser.error(f"unrecognized arguments: {' '.join(arguments)}")
+    args.arguments = arguments
+    args.handler(args)
+
+
+if __name__ == "__main__":
+    main()
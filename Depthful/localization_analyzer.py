@@ -4,67 +4,27 @@ Localization Analyzer and Fixer for Afternoon App
 Analyzes Localizable.xcstrings file and identifies missing translations
 """
 
-import json
+import argparse
 import sys
 from pathlib import Path
-from typing import Dict, List, Set, Tuple
+from typing import Dict, List, Optional
 
-# Expected languages based on the file
-EXPECTED_LANGUAGES = {'ar', 'de', 'es', 'fr', 'hi', 'ja', 'ko', 'pt', 'zh-Hans', 'en'}
-
-def load_localizations(file_path: Path) -> Dict:
-    """Load the localization file."""
-    try:
-        with open(file_path, 'r', encoding='utf-8') as f:
-            return json.load(f)
-    except Exception as e:
-        print(f"Error loading file: {e}")
-        return {}
-
-def analyze_completeness(data: Dict) -> Dict:
-    """Analyze the completeness of localizations."""
-    strings = data.get('strings', {})
-    analysis = {
-        'total_keys': len(strings),
-        'complete_keys': 0,
-        'incomplete_keys': [],
-        'missing_languages': {},
-        'should_not_translate': 0,
-        'completion_percentage': 0.0
-    }
-    
-    for key, value in strings.items():
-        # Skip entries that should not be translated
-        if value.get('shouldTranslate') == False:
-            analysis['should_not_translate'] += 1
-            continue
-            
-        localizations = value.get('localizations', {})
-        available_languages = set(localizations.keys())
-        missing_languages = EXPECTED_LANGUAGES - available_languages
-        
-        if missing_languages:
-            analysis['incomplete_keys'].append(key)
-            analysis['missing_languages'][key] = list(missing_languages)
-        else:
-            # Check if all available languages have 'translated' state
-            all_translated = True
-            for lang, loc_data in localizations.items():
-                if loc_data.get('stringUnit', {}).get('state') != 'translated':
-                    all_translated = False
-                    break
-            
-            if all_translated:
-                analysis['complete_keys'] += 1
-            else:
-                analysis['incomplete_keys'].append(key)
-    
-    # Calculate completion percentage
-    translatable_keys = analysis['total_keys'] - analysis['should_not_translate']
-    if translatable_keys > 0:
-        analysis['completion_percentage'] = (analysis['complete_keys'] / translatable_keys) * 100
-    
-    return analysis
+from localization_cache import load_cached_catalog
+from localization_catalog import EXPECTED_LANGUAGES, Catalog, analyze_completeness
+from localization_changeset import Changeset
+from localization_report import (
+    FORMATS,
+    analysis_document,
+    change_record,
+    finding_records,
+    incomplete_record,
+    ndjson_writer,
+    progress_to_stderr,
+    summary_record,
+    write_json,
+    write_records,
+)
+from localization_scanner import compare_with_catalog, print_usage_report, scan_sources
 
 def print_analysis(analysis: Dict):
     """Print the analysis results."""
@@ -77,20 +37,15 @@ def print_analysis(analysis: Dict):
     print(f"Complete keys: {analysis['complete_keys']}")
     print(f"Incomplete keys: {len(analysis['incomplete_keys'])}")
     print(f"Completion percentage: {analysis['completion_percentage']:.1f}%")
+    print(f"True completion percentage: {analysis['true_completion_percentage']:.1f}%")
     print()
     
     if analysis['incomplete_keys']:
         print("MISSING TRANSLATIONS BREAKDOWN:")
         print("-" * 40)
         
-        # Group by missing languages count
-        missing_counts = {}
-        for key in analysis['incomplete_keys']:
-            missing_langs = analysis['missing_languages'].get(key, [])
-            count = len(missing_langs)
-            if count not in missing_counts:
-                missing_counts[count] = []
-            missing_counts[count].append(key)
+        # Grouped by missing languages count
+        missing_counts = analysis['missing_counts']
         
         for count in sorted(missing_counts.keys(), reverse=True):
             keys = missing_counts[count]
@@ -100,16 +55,57 @@ def print_analysis(analysis: Dict):
                 print(f"  '{key}' -> Missing: {', '.join(missing_langs)}")
             if len(keys) > 10:
                 print(f"  ... and {len(keys) - 10} more keys")
+    
+    mismatches = analysis.get('placeholder_mismatches')
+    if mismatches:
+        print()
+        print("FORMAT PLACEHOLDER MISMATCHES:")
+        print("-" * 40)
+        for lang, keys in mismatches.items():
+            print(f"\n{lang} ({len(keys)} keys):")
+            for key in keys[:10]:
+                print(f"  '{key}'")
+            if len(keys) > 10:
+                print(f"  ... and {len(keys) - 10} more keys")
+    
+    for title, section in (("UNTRANSLATED COPIES OF THE SOURCE:", 'untranslated_copies'),
+                           ("VALUES IN THE WRONG SCRIPT:", 'wrong_script')):
+        suspects = analysis.get(section)
+        if suspects:
+            print()
+            print(title)
+            print("-" * 40)
+            for lang, keys in suspects.items():
+                print(f"\n{lang} ({len(keys)} keys):")
+                for key in keys[:10]:
+                    print(f"  '{key}'")
+                if len(keys) > 10:
+                    print(f"  ... and {len(keys) - 10} more keys")
 
-def generate_missing_translations(data: Dict, key: str, missing_languages: List[str]) -> Dict:
-    """Generate missing translations for a key."""
-    existing_localizations = data['strings'][key].get('localizations', {})
+def print_coverage(analysis: Dict):
+    """Print a per-language histogram of cell states, one row per language."""
+    translatable = analysis['total_keys'] - analysis['should_not_translate']
+    columns = ('translated', 'new', 'needs_review', 'stale', 'missing', 'untranslated_copies', 'wrong_script')
+    headers = ('translated', 'new', 'review', 'stale', 'missing', 'copies', 'script')
+    print("LANGUAGE COVERAGE REPORT")
+    print("=" * 97)
+    print(f"{'language':<10}{'coverage':>10}" + ''.join(f"{header:>11}" for header in headers))
+    print("-" * 97)
+    for lang, counts in analysis['state_counts'].items():
+        coverage = (analysis['language_coverage'][lang] / translatable) * 100 if translatable else 0.0
+        print(f"{lang:<10}{coverage:>9.1f}%" + ''.join(f"{counts[column]:>11}" for column in columns))
+    print("-" * 97)
+    print(f"{translatable} translatable keys. copies: value identical to the source; "
+          f"script: value not in the locale's script")
+
+def generate_missing_translations(catalog: Catalog, key: str, missing_languages: List[str]) -> Dict[str, str]:
+    """Generate missing translation values for a key, by language."""
     new_translations = {}
     
     # Use the key itself as the English value if it's missing English
-    english_value = key
-    if 'en' in existing_localizations:
-        english_value = existing_localizations['en']['stringUnit']['value']
+    english_value = catalog.value(key, 'en')
+    if english_value is None:
+        english_value = key
     
     # Basic translation mappings for common strings
     translation_map = {
@@ -134,93 +130,155 @@ def generate_missing_translations(data: Dict, key: str, missing_languages: List[
             # Fallback to English value
             value = english_value
         
-        new_translations[lang] = {
-            "stringUnit": {
-                "state": "translated",
-                "value": value
-            }
-        }
+        new_translations[lang] = value
     
     return new_translations
 
-def fix_localizations(data: Dict) -> Dict:
-    """Fix missing localizations in the data."""
-    analysis = analyze_completeness(data)
-    fixed_data = data.copy()
+def fix_localizations(catalog: Catalog, analysis: Optional[Dict] = None) -> Changeset:
+    """Record the missing localizations as a changeset against the catalog."""
+    if analysis is None:
+        analysis = analyze_completeness(catalog, require_translated=True)
+    changeset = Changeset(catalog)
     
     print(f"\nFIXING {len(analysis['incomplete_keys'])} incomplete keys...")
     
     for key in analysis['incomplete_keys']:
         missing_languages = analysis['missing_languages'].get(key, [])
         if missing_languages:
-            new_translations = generate_missing_translations(data, key, missing_languages)
+            new_translations = generate_missing_translations(catalog, key, missing_languages)
             
             # Add missing translations
-            for lang, translation in new_translations.items():
-                fixed_data['strings'][key]['localizations'][lang] = translation
+            for lang, value in new_translations.items():
+                changeset.add(key, lang, value)
             
             print(f"Fixed '{key}' -> Added {len(missing_languages)} languages: {', '.join(missing_languages)}")
     
-    return fixed_data
-
-def save_fixed_file(data: Dict, file_path: Path, backup: bool = True):
-    """Save the fixed localization file."""
-    if backup:
-        backup_path = file_path.with_suffix('.xcstrings.backup')
-        if file_path.exists():
-            import shutil
-            shutil.copy2(file_path, backup_path)
-            print(f"Backup saved to: {backup_path}")
-    
-    try:
-        with open(file_path, 'w', encoding='utf-8') as f:
-            json.dump(data, f, indent=2, ensure_ascii=False)
-        print(f"Fixed file saved to: {file_path}")
-        return True
-    except Exception as e:
-        print(f"Error saving file: {e}")
-        return False
+    return changeset
 
-def main():
-    """Main function."""
-    # File path
-    file_path = Path(__file__).parent / "Localizable.xcstrings"
+def write_report(output_format: str, file_path: Path, catalog: Catalog, dry_run: bool = False):
+    """Write the analysis, and with dry_run the fix it would apply, as JSON or NDJSON."""
+    emit = ndjson_writer()
+    on_incomplete = None
+    # The fix needs the full key lists; otherwise keys are written as they are found
+    if output_format == 'ndjson' and not dry_run:
+        def on_incomplete(key, missing_languages):
+            emit(incomplete_record(file_path, key, missing_languages))
+    
+    with progress_to_stderr(output_format):
+        analysis = analyze_completeness(catalog, require_translated=True, on_incomplete=on_incomplete)
+        changeset = fix_localizations(catalog, analysis) if dry_run else None
     
+    if output_format == 'json':
+        document = analysis_document('analyze', file_path, analysis)
+        if changeset is not None:
+            document['changes'] = [change_record(file_path, operation) for operation in changeset]
+        write_json(document)
+        return
+    
+    if on_incomplete is None:
+        write_records(incomplete_record(file_path, key, analysis['missing_languages'].get(key, []))
+                      for key in analysis['incomplete_keys'])
+    write_records(finding_records(file_path, analysis))
+    if changeset is not None:
+        write_records(change_record(file_path, operation) for operation in changeset)
+    emit(summary_record('analyze', file_path, analysis))
+
+def load_catalog(file_path: Path, output_format: str = 'text') -> Catalog:
+    """Load the catalog to analyze, exiting with status 1 if it cannot be read."""
     if not file_path.exists():
-        print(f"Error: File not found at {file_path}")
+        print(f"Error: File not found at {file_path}", file=sys.stderr)
         sys.exit(1)
     
-    print("Loading localization file...")
-    data = load_localizations(file_path)
-    if not data:
-        print("Failed to load localization data")
+    with progress_to_stderr(output_format):
+        print("Loading localization file...")
+        catalog = load_cached_catalog(file_path)
+    if catalog is None:
+        print("Failed to load localization data", file=sys.stderr)
         sys.exit(1)
+    return catalog
+
+def report_analysis(file_path: Path, catalog: Catalog, output_format: str = 'text',
+                    coverage: bool = False, usage: bool = False, dry_run: bool = False) -> Optional[Dict]:
+    """Report on a loaded catalog as the analyze command does.
+    
+    Returns the analysis when a text report was printed that a fix may
+    follow, or None when the report is complete on its own (JSON, NDJSON
+    or the coverage table).
+    """
+    if output_format != 'text':
+        write_report(output_format, file_path, catalog, dry_run)
+        return None
     
-    # Initial analysis
     print("Analyzing current state...")
-    analysis = analyze_completeness(data)
+    analysis = analyze_completeness(catalog, require_translated=True)
+    if coverage:
+        print_coverage(analysis)
+        return None
     print_analysis(analysis)
     
+    if usage:
+        index = scan_sources(file_path.parent)
+        print()
+        print_usage_report(compare_with_catalog(index, catalog), index)
+    return analysis
+
+def main():
+    """Main function."""
+    parser = argparse.ArgumentParser(description="Analyze missing translations in Localizable.xcstrings")
+    parser.add_argument('--dry-run', action='store_true',
+                        help="print the patch that would fix missing translations without saving")
+    parser.add_argument('--usage', action='store_true',
+                        help="also scan the Swift sources for keys missing from or unused in the catalog")
+    parser.add_argument('--coverage', action='store_true',
+                        help="only print the per-language coverage and state histogram")
+    parser.add_argument('--format', choices=FORMATS, default='text',
+                        help="output format; json and ndjson never prompt and keep progress on stderr")
+    parser.add_argument('--yes', '-y', action='store_true',
+                        help="fix missing translations without asking")
+    args = parser.parse_args()
+    
+    # File path
+    file_path = Path(__file__).parent / "Localizable.xcstrings"
+    
+    catalog = load_catalog(file_path, args.format)
+    analysis = report_analysis(file_path, catalog, args.format, args.coverage, args.usage, args.dry_run)
+    if analysis is None:
+        return
+    
     if analysis['completion_percentage'] >= 100.0:
         print("✅ Localizations are already 100% complete!")
         return
     
+    if args.dry_run:
+        changeset = fix_localizations(catalog, analysis)
+        print("\nPatch (dry run, nothing saved):")
+        print(changeset.format_patch())
+        return
+    
     # Ask user if they want to fix
     print(f"\nCurrent completion: {analysis['completion_percentage']:.1f}%")
-    response = input("Do you want to automatically fix missing translations? (y/n): ").strip().lower()
+    if args.yes:
+        response = 'y'
+    elif not sys.stdin.isatty():
+        # Prompting without a terminal would hang CI or read a piped answer by accident
+        print("Not fixing: run with --yes to fix without a terminal, or --dry-run to preview")
+        return
+    else:
+        response = input("Do you want to automatically fix missing translations? (y/n): ").strip().lower()
     
     if response == 'y':
         print("\nFixing localizations...")
-        fixed_data = fix_localizations(data)
+        changeset = fix_localizations(catalog, analysis)
         
         # Verify fix
         print("\nVerifying fixes...")
-        new_analysis = analyze_completeness(fixed_data)
+        changeset.apply_to_catalog()
+        new_analysis = catalog.completeness().summary(require_translated=True)
         print(f"New completion percentage: {new_analysis['completion_percentage']:.1f}%")
         
         if new_analysis['completion_percentage'] > analysis['completion_percentage']:
             # Save the fixed file
-            if save_fixed_file(fixed_data, file_path):
+            if changeset.save(file_path):
                 print("✅ Localizations have been fixed!")
                 print(f"Completion improved from {analysis['completion_percentage']:.1f}% to {new_analysis['completion_percentage']:.1f}%")
             else:
@@ -231,4 +289,4 @@ def main():
         print("Fix cancelled by user.")
 
 if __name__ == "__main__":
-    main()
\ No newline at end of file
+    main()
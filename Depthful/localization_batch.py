@@ -0,0 +1,285 @@
+#!/usr/bin/env python3
+"""
+Batch Localization Runner
+Discovers every .xcstrings catalog under a set of directories or globs
+(Localizable, InfoPlist, ... across an app family) and runs status,
+analysis or fixes on all of them over a process pool
+"""
+
+import argparse
+import contextlib
+import glob
+import io
+import os
+import sys
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional
+
+from localization_cache import CACHE_DIR_NAME, load_cached_catalog
+from localization_catalog import analyze_completeness
+from localization_report import FORMATS, SCHEMA_VERSION, write_json, write_records
+from localization_scanner import SKIPPED_DIRECTORIES
+
+CATALOG_SUFFIX = '.xcstrings'
+
+MODES = ('status', 'analyze', 'fix')
+
+
+def discover_catalogs(targets: Iterable[str]) -> List[Path]:
+    """Catalog files named by targets: files, directories (searched recursively) or globs."""
+    found = {}
+    for target in targets:
+        path = Path(target)
+        if path.is_dir():
+            for directory, subdirectories, filenames in os.walk(path):
+                subdirectories[:] = sorted(name for name in subdirectories
+                                           if not name.startswith('.') and name not in SKIPPED_DIRECTORIES)
+                for name in sorted(filenames):
+                    if name.endswith(CATALOG_SUFFIX):
+                        catalog_path = Path(directory) / name
+                        found[catalog_path.resolve()] = catalog_path
+        elif path.is_file():
+            found[path.resolve()] = path
+        else:
+            for name in sorted(glob.glob(target, recursive=True)):
+                catalog_path = Path(name)
+                if (name.endswith(CATALOG_SUFFIX) and catalog_path.is_file()
+                        and CACHE_DIR_NAME not in catalog_path.parts):
+                    found[catalog_path.resolve()] = catalog_path
+    return list(found.values())
+
+
+def _summary(file_path: Path, analysis: Dict) -> Dict:
+    translatable = analysis['total_keys'] - analysis['should_not_translate']
+    return {
+        'path': str(file_path),
+        'total_keys': analysis['total_keys'],
+        'translatable_keys': translatable,
+        'complete_keys': analysis['complete_keys'],
+        'incomplete_keys': translatable - analysis['complete_keys'],
+        'completion_percentage': analysis['completion_percentage'],
+        'true_complete_keys': analysis['true_complete_keys'],
+        'true_completion_percentage': analysis['true_completion_percentage'],
+        'error': None,
+    }
+
+
+def _failure(file_path: Path, message: str) -> Dict:
+    return {'path': str(file_path), 'error': message}
+
+
+def run_catalog(mode: str, file_path: Path, languages: Optional[List[str]] = None,
+                dry_run: bool = False, translation_db: Optional[Path] = None,
+                use_store: bool = True, mt_url: Optional[str] = None) -> Dict:
+    """Run one mode on one catalog and return a picklable summary.
+
+    A catalog is held to the given languages, or else to the languages it
+    already contains: sibling apps and InfoPlist catalogs target their own
+    sets, and a fix must not add languages they never shipped.
+
+    Output of the single-catalog tools is captured so that workers do not
+    interleave their progress messages.
+    """
+    output = io.StringIO()
+    with contextlib.redirect_stdout(output):
+        catalog = load_cached_catalog(file_path)
+    if catalog is None:
+        return _failure(file_path, output.getvalue().strip() or "Failed to load localization data")
+
+    expected_languages = languages or catalog.present_languages()
+    analysis = analyze_completeness(catalog, expected_languages)
+    result = _summary(file_path, analysis)
+    result['languages'] = sorted(expected_languages)
+    if mode == 'analyze':
+        result['missing_counts'] = {count: len(keys) for count, keys in analysis['missing_counts'].items()}
+        result['language_coverage'] = analysis['language_coverage']
+    elif mode == 'fix':
+        result.update(_fix_catalog(catalog, analysis, expected_languages, file_path, dry_run,
+                                   translation_db, use_store, mt_url, output))
+    return result
+
+
+def _fix_catalog(catalog, analysis, expected_languages, file_path, dry_run,
+                 translation_db, use_store, mt_url, output) -> Dict:
+    # Imported here so status and analysis runs do not pay for the fixer stack
+    from localization_fixer import fix_localizations
+    from localization_memory import load_memory_for
+    from localization_store import open_store
+    from localization_translate import HTTPTranslationProvider
+
+    if not analysis['incomplete_keys']:
+        return {'added_cells': 0, 'saved': False}
+    with contextlib.redirect_stdout(output):
+        memory = load_memory_for([catalog])
+        store = open_store(translation_db) if use_store else None
+        try:
+            if store is not None:
+                store.import_memory(memory)
+            provider = HTTPTranslationProvider(mt_url) if mt_url else None
+            # Catalogs already run in parallel; one process per catalog is enough
+            changeset = fix_localizations(catalog, analysis, memory, provider, store, jobs=1)
+        finally:
+            if store is not None:
+                store.close()
+        saved = False
+        if not dry_run and len(changeset):
+            saved = changeset.save(file_path)
+    if not dry_run and len(changeset) and not saved:
+        return {'added_cells': len(changeset), 'saved': False,
+                'error': "Failed to save the fixed file"}
+    changeset.apply_to_catalog()
+    fixed = catalog.completeness(expected_languages).summary()
+    return {'added_cells': len(changeset), 'saved': saved,
+            'fixed_completion_percentage': fixed['completion_percentage']}
+
+
+def _run_catalog_safely(mode: str, file_path: Path, **options) -> Dict:
+    """run_catalog, with any error turned into a failure record so one bad catalog never ends the run."""
+    try:
+        return run_catalog(mode, file_path, **options)
+    except Exception as e:
+        return _failure(file_path, f"{type(e).__name__}: {e}")
+
+
+def run_batch(mode: str, catalogs: List[Path], jobs: Optional[int] = None, **options) -> List[Dict]:
+    """Run a mode over every catalog, largest first, on a process pool when it pays off."""
+    # Starting the biggest catalogs first keeps the wall time close to the largest one
+    ordered = sorted(catalogs, key=lambda path: path.stat().st_size, reverse=True)
+    jobs = min(jobs or os.cpu_count() or 1, len(ordered))
+    if jobs <= 1:
+        results = [_run_catalog_safely(mode, path, **options) for path in ordered]
+    else:
+        from concurrent.futures import ProcessPoolExecutor
+        with ProcessPoolExecutor(max_workers=jobs) as pool:
+            futures = [pool.submit(_run_catalog_safely, mode, path, **options) for path in ordered]
+            results = []
+            for path, future in zip(ordered, futures):
+                try:
+                    results.append(future.result())
+                except Exception as e:
+                    # The worker itself died, e.g. killed for running out of memory
+                    results.append(_failure(path, str(e)))
+    order = {path: i for i, path in enumerate(catalogs)}
+    results.sort(key=lambda result: order.get(Path(result['path']), len(order)))
+    return results
+
+
+def aggregate(results: List[Dict]) -> Dict:
+    """Totals across every catalog that loaded."""
+    loaded = [result for result in results if 'total_keys' in result]
+    translatable = sum(result['translatable_keys'] for result in loaded)
+    complete = sum(result['complete_keys'] for result in loaded)
+    true_complete = sum(result['true_complete_keys'] for result in loaded)
+    return {
+        'catalogs': len(results),
+        'failed': sum(1 for result in results if result.get('error')),
+        'total_keys': sum(result['total_keys'] for result in loaded),
+        'translatable_keys': translatable,
+        'complete_keys': complete,
+        'incomplete_keys': translatable - complete,
+        'completion_percentage': (complete / translatable) * 100 if translatable else 0.0,
+        'true_complete_keys': true_complete,
+        'true_completion_percentage': (true_complete / translatable) * 100 if translatable else 0.0,
+        'added_cells': sum(result.get('added_cells', 0) for result in loaded),
+    }
+
+
+def print_batch_report(mode: str, results: List[Dict], totals: Dict):
+    """Print one line per catalog followed by the aggregate."""
+    print(f"📚 Localization {mode} - {totals['catalogs']} catalogs")
+    print("=" * 60)
+    for result in results:
+        if 'total_keys' not in result:
+            print(f"❌ {result['path']}: {result['error']}")
+            continue
+        line = (f"{result['completion_percentage']:6.1f}%  "
+                f"{result['complete_keys']}/{result['translatable_keys']} complete  {result['path']}")
+        if mode == 'fix' and result.get('added_cells'):
+            state = 'saved' if result.get('saved') else 'not saved'
+            line += (f"  -> +{result['added_cells']} cells, "
+                     f"{result.get('fixed_completion_percentage', 0.0):.1f}% ({state})")
+        if result.get('error'):
+            line += f"  ❌ {result['error']}"
+        print(line)
+        if mode == 'analyze' and result['missing_counts']:
+            groups = ', '.join(f"{count}: {number}" for count, number in sorted(result['missing_counts'].items()))
+            print(f"         keys by missing-language count: {groups}")
+    print("-" * 60)
+    print(f"Total strings: {totals['total_keys']}")
+    print(f"Translatable: {totals['translatable_keys']}")
+    print(f"Complete: {totals['complete_keys']}")
+    print(f"Completion: {totals['completion_percentage']:.1f}%")
+    print(f"True completion: {totals['true_completion_percentage']:.1f}%")
+    if mode == 'fix':
+        print(f"Cells added: {totals['added_cells']}")
+    if totals['failed']:
+        print(f"Failed catalogs: {totals['failed']}")
+
+
+def write_batch_records(output_format: str, mode: str, results: List[Dict], totals: Dict):
+    """Write per-catalog results and totals as one JSON document or as NDJSON records."""
+    records = [{'schema': SCHEMA_VERSION, 'type': 'catalog', 'tool': mode, **result} for result in results]
+    total = {'schema': SCHEMA_VERSION, 'type': 'batch_summary', 'tool': mode, **totals}
+    if output_format == 'json':
+        total['results'] = records
+        write_json(total)
+    else:
+        write_records(records + [total])
+
+
+def main():
+    """Main function."""
+    parser = argparse.ArgumentParser(description="Run localization checks or fixes over many catalogs")
+    parser.add_argument('mode', choices=MODES)
+    parser.add_argument('targets', nargs='+',
+                        help="catalog files, directories to search, or glob patterns")
+    parser.add_argument('--jobs', '-j', type=int, default=None,
+                        help="worker processes (default: one per core)")
+    parser.add_argument('--languages', default=None,
+                        help="comma-separated languages every catalog must have "
+                             "(default: the languages each catalog already contains)")
+    parser.add_argument('--dry-run', action='store_true', help="fix: do not save anything")
+    parser.add_argument('--yes', '-y', action='store_true', help="fix: do not ask for confirmation")
+    parser.add_argument('--mt-url', default=os.environ.get('LOCALIZATION_MT_URL'),
+                        help="fix: machine-translation endpoint (default: $LOCALIZATION_MT_URL)")
+    parser.add_argument('--translation-db', type=Path, default=None,
+                        help="fix: shared SQLite translation store")
+    parser.add_argument('--no-translation-db', action='store_true',
+                        help="fix: do not use the shared translation store")
+    parser.add_argument('--format', choices=FORMATS, default='text',
+                        help="output format; ndjson writes one record per catalog, then the totals")
+    args = parser.parse_args()
+
+    catalogs = discover_catalogs(args.targets)
+    if not catalogs:
+        print("Error: no .xcstrings catalogs found")
+        sys.exit(1)
+
+    options = {}
+    if args.languages:
+        options['languages'] = [lang.strip() for lang in args.languages.split(',') if lang.strip()]
+    if args.mode == 'fix':
+        if not args.dry_run and not args.yes:
+            # Prompting without a terminal would hang CI; refuse instead
+            if args.format != 'text' or not sys.stdin.isatty():
+                print("Error: fix needs --yes or --dry-run when not run interactively", file=sys.stderr)
+                sys.exit(2)
+            response = input(f"\nFix {len(catalogs)} catalogs in place? (y/n): ")
+            if response.lower() != 'y':
+                print("Fix cancelled.")
+                return
+        options.update(dry_run=args.dry_run, translation_db=args.translation_db,
+                       use_store=not args.no_translation_db, mt_url=args.mt_url)
+
+    results = run_batch(args.mode, catalogs, args.jobs, **options)
+    totals = aggregate(results)
+    if args.format == 'text':
+        print_batch_report(args.mode, results, totals)
+    else:
+        write_batch_records(args.format, args.mode, results, totals)
+    if totals['failed']:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
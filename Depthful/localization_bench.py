@@ -0,0 +1,386 @@
+#!/usr/bin/env python3
+"""
+Localization Benchmarks
+Generates synthetic .xcstrings catalogs of any size and times each stage
+the tools go through (load, snapshot load, analysis, fix and save) along
+with peak memory, so changes to any of them show up as numbers
+"""
+
+import argparse
+import contextlib
+import io
+import json
+import os
+import platform
+import random
+import shutil
+import subprocess
+import sys
+import tempfile
+import time
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Callable, Dict, List, NamedTuple, Optional, Sequence, Tuple
+
+from localization_cache import load_cached_catalog
+from localization_catalog import Catalog, analyze_completeness
+from localization_writer import INDENT, format_entry, xcode_sort_key
+
+DEFAULT_REPEAT = 5
+
+# Result files carry this so old results can be told apart when fields change
+RESULTS_FORMAT = 1
+
+# (keys, locales) measured when no --case is given
+DEFAULT_CASES = ((1_000, 10), (10_000, 10), (10_000, 40), (100_000, 10))
+
+# Source language first, then the app's locales, then common App Store locales
+LOCALES = (
+    'en', 'ar', 'de', 'es', 'fr', 'hi', 'ja', 'ko', 'pt', 'zh-Hans',
+    'it', 'nl', 'sv', 'da', 'fi', 'nb', 'pl', 'cs', 'sk', 'hu',
+    'ro', 'tr', 'el', 'ru', 'uk', 'he', 'th', 'vi', 'id', 'ms',
+    'ca', 'hr', 'bg', 'sr', 'sl', 'lt', 'lv', 'et', 'fa', 'ur',
+    'bn', 'ta', 'te', 'mr', 'gu', 'kn', 'ml', 'pa', 'sw', 'fil',
+    'zh-Hant', 'zh-HK', 'pt-PT', 'es-419', 'fr-CA', 'en-GB', 'en-AU', 'de-CH', 'is', 'ga',
+)
+
+# Translations in these locales are written in their own script, so the
+# quality checks see realistic values rather than flagging every cell
+SCRIPT_SAMPLES = {
+    'ar': 'نص', 'fa': 'متن', 'ur': 'متن', 'he': 'טקסט', 'hi': 'पाठ', 'mr': 'मजकूर',
+    'bn': 'পাঠ্য', 'ta': 'உரை', 'te': 'వచనం', 'gu': 'લખાણ', 'kn': 'ಪಠ್ಯ', 'ml': 'വാചകം',
+    'pa': 'ਪਾਠ', 'ja': 'テキスト', 'ko': '텍스트', 'zh-Hans': '文本', 'zh-Hant': '文字',
+    'zh-HK': '文字', 'th': 'ข้อความ', 'ru': 'текст', 'uk': 'текст', 'bg': 'текст',
+    'sr': 'текст', 'el': 'κείμενο',
+}
+
+_WORDS = (
+    'thought', 'entry', 'journal', 'memory', 'tag', 'filter', 'reminder', 'export',
+    'import', 'backup', 'settings', 'language', 'theme', 'record', 'gallery', 'search',
+    'daily', 'weekly', 'prompt', 'mood', 'favorite', 'archive', 'share', 'review',
+)
+
+
+class CatalogShape(NamedTuple):
+    """Size and composition of a synthetic catalog; ratios are per key or per cell."""
+    keys: int = 1_000
+    locales: int = 10
+    missing_ratio: float = 0.03        # cells without a localization
+    stale_ratio: float = 0.02          # cells in state "stale"
+    review_ratio: float = 0.02         # cells in state "needs_review"
+    no_translate_ratio: float = 0.05   # keys with "shouldTranslate": false
+    variation_ratio: float = 0.05      # keys with plural variations instead of a stringUnit
+    substitution_ratio: float = 0.02   # keys with a plural substitution
+    format_ratio: float = 0.10         # keys with printf-style arguments
+    seed: int = 0
+
+
+def best_time(function: Callable[[], object], repeat: int = DEFAULT_REPEAT) -> float:
+    """Fastest of repeat runs, in seconds; the minimum is the least noisy estimate."""
+    best = float('inf')
+    for _ in range(max(1, repeat)):
+        start = time.perf_counter()
+        function()
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def _sentence(rng: random.Random, index: int) -> str:
+    return f"{' '.join(rng.sample(_WORDS, rng.randint(1, 4))).capitalize()} {index}"
+
+
+def _translate(text: str, language: str) -> str:
+    sample = SCRIPT_SAMPLES.get(language)
+    if sample is not None:
+        # Keep the format arguments so placeholder parity holds
+        arguments = ' '.join(part for part in text.split() if part.startswith('%'))
+        return f"{sample} {arguments}".rstrip()
+    return f"{text} [{language}]"
+
+
+def _string_unit(value: str, state: str) -> Dict:
+    return {'stringUnit': {'state': state, 'value': value}}
+
+
+def synthetic_entry(rng: random.Random, key: str, shape: CatalogShape,
+                    locales: Sequence[str]) -> Dict:
+    """One catalog entry drawn according to shape."""
+    entry = {}
+    if rng.random() < shape.no_translate_ratio:
+        entry['shouldTranslate'] = False
+        return entry
+
+    roll = rng.random()
+    kind = ('variations' if roll < shape.variation_ratio else
+            'substitutions' if roll < shape.variation_ratio + shape.substitution_ratio else 'unit')
+    localizations = {}
+    for language in locales:
+        if language != locales[0] and rng.random() < shape.missing_ratio:
+            continue
+        state_roll = rng.random()
+        state = ('stale' if state_roll < shape.stale_ratio else
+                 'needs_review' if state_roll < shape.stale_ratio + shape.review_ratio else 'translated')
+        text = key if language == locales[0] else _translate(key, language)
+        if kind == 'variations':
+            localizations[language] = {'variations': {'plural': {
+                'one': _string_unit(text.replace('%lld', '1'), state),
+                'other': _string_unit(text, state),
+            }}}
+        elif kind == 'substitutions':
+            localization = _string_unit(f"%#@items@ {text}", state)
+            localization['substitutions'] = {'items': {
+                'argNum': 1,
+                'formatSpecifier': 'lld',
+                'variations': {'plural': {
+                    'one': _string_unit('%arg item', state),
+                    'other': _string_unit('%arg items', state),
+                }},
+            }}
+            localizations[language] = localization
+        else:
+            localizations[language] = _string_unit(text, state)
+    entry['localizations'] = localizations
+    return entry
+
+
+def write_synthetic_catalog(file_path: Path, shape: CatalogShape) -> Path:
+    """Write a catalog in Xcode's layout, one entry at a time.
+
+    Only the key list is held in memory, so catalogs far larger than the
+    available RAM can be generated.
+    """
+    rng = random.Random(shape.seed)
+    locales = LOCALES[:max(1, min(shape.locales, len(LOCALES)))]
+    keys = []
+    for index in range(shape.keys):
+        key = _sentence(rng, index)
+        if rng.random() < shape.format_ratio:
+            key += rng.choice((' %@', ' %lld', ': %1$@ of %2$lld'))
+        keys.append(key)
+    keys.sort(key=xcode_sort_key)
+
+    temporary = file_path.with_name(file_path.name + '.tmp')
+    with open(temporary, 'w', encoding='utf-8') as f:
+        f.write('{\n' + INDENT + '"sourceLanguage" : ' + json.dumps(locales[0]) + ',\n')
+        f.write(INDENT + '"strings" : {\n')
+        for index, key in enumerate(keys):
+            if index:
+                f.write(',\n')
+            f.write(format_entry(key, synthetic_entry(rng, key, shape, locales)))
+        f.write('\n' + INDENT + '},\n' + INDENT + '"version" : "1.0"\n}')
+    os.replace(temporary, file_path)
+    return file_path
+
+
+def peak_rss_bytes() -> Optional[int]:
+    """Peak resident set size of this process, or None where it is not available."""
+    try:
+        import resource
+    except ImportError:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # Linux reports kilobytes, macOS bytes
+    return peak if sys.platform == 'darwin' else peak * 1024
+
+
+def time_catalog(file_path: Path, repeat: int = DEFAULT_REPEAT,
+                 expected_languages: Optional[Sequence[str]] = None) -> Dict[str, float]:
+    """Seconds per stage for one catalog file, plus peak_rss_bytes.
+
+    The fix runs without translation memory, store or machine translation,
+    so it measures the fixer and changeset rather than I/O. Saving writes
+    into a scratch copy of the catalog.
+    """
+    from localization_fixer import fix_localizations
+
+    timings = {}
+    timings['load'] = best_time(
+        lambda: Catalog.from_data(json.loads(file_path.read_bytes()), path=file_path), repeat)
+    catalog = Catalog.from_data(json.loads(file_path.read_bytes()), path=file_path)
+    if expected_languages is None:
+        expected_languages = catalog.languages
+
+    with tempfile.TemporaryDirectory() as scratch:
+        scratch = Path(scratch)
+        load_cached_catalog(file_path, scratch)
+        timings['snapshot_load'] = best_time(lambda: load_cached_catalog(file_path, scratch), repeat)
+
+        def analyze():
+            # Drop the counters a previous run left on the catalog so every run counts from scratch
+            catalog.counters = None
+            return analyze_completeness(catalog, expected_languages, require_translated=True)
+
+        timings['analyze'] = best_time(analyze, repeat)
+        analysis = analyze_completeness(catalog, expected_languages, require_translated=True)
+
+        with contextlib.redirect_stdout(io.StringIO()):
+            timings['fix'] = best_time(lambda: fix_localizations(catalog, analysis), repeat)
+            changeset = fix_localizations(catalog, analysis)
+
+        # Each save needs the unfixed file underneath it
+        copy = scratch / file_path.name
+        best = float('inf')
+        for _ in range(max(1, repeat)):
+            shutil.copyfile(file_path, copy)
+            with contextlib.redirect_stdout(io.StringIO()):
+                start = time.perf_counter()
+                changeset.save(copy, backup=False)
+                best = min(best, time.perf_counter() - start)
+        timings['save'] = best
+
+    timings['changes'] = len(changeset)
+    timings['peak_rss_bytes'] = peak_rss_bytes()
+    return timings
+
+
+def _generate(shape: CatalogShape, directory: Path) -> Tuple[Path, float]:
+    file_path = directory / f"synthetic-{shape.keys}x{shape.locales}.xcstrings"
+    start = time.perf_counter()
+    write_synthetic_catalog(file_path, shape)
+    return file_path, time.perf_counter() - start
+
+
+def run_suite(shapes: Sequence[CatalogShape], repeat: int = DEFAULT_REPEAT,
+              directory: Optional[Path] = None) -> List[Dict]:
+    """Generate and measure every shape, each stage in a fresh process.
+
+    Generation and measurement run in separate single-use workers so the
+    reported peak RSS belongs to the tools alone.
+    """
+    from concurrent.futures import ProcessPoolExecutor
+
+    results = []
+    with contextlib.ExitStack() as stack:
+        if directory is None:
+            directory = Path(stack.enter_context(tempfile.TemporaryDirectory()))
+        for shape in shapes:
+            with ProcessPoolExecutor(max_workers=1) as pool:
+                file_path, generate_seconds = pool.submit(_generate, shape, directory).result()
+            with ProcessPoolExecutor(max_workers=1) as pool:
+                timings = pool.submit(time_catalog, file_path, repeat).result()
+            file_bytes = file_path.stat().st_size
+            file_path.unlink()
+            results.append({
+                'shape': shape._asdict(),
+                'file_bytes': file_bytes,
+                'generate_seconds': generate_seconds,
+                'seconds': {stage: value for stage, value in timings.items()
+                            if stage not in ('changes', 'peak_rss_bytes')},
+                'changes': timings['changes'],
+                'peak_rss_bytes': timings['peak_rss_bytes'],
+            })
+            print_case(results[-1])
+    return results
+
+
+def _git_commit() -> Optional[str]:
+    try:
+        return subprocess.run(['git', 'rev-parse', 'HEAD'], cwd=Path(__file__).parent,
+                              capture_output=True, text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def results_document(results: List[Dict], repeat: int) -> Dict:
+    """Results with enough context to compare runs across commits and machines."""
+    return {
+        'format': RESULTS_FORMAT,
+        'created': datetime.now(timezone.utc).isoformat(timespec='seconds'),
+        'commit': _git_commit(),
+        'python': platform.python_version(),
+        'platform': platform.platform(),
+        'cpu_count': os.cpu_count(),
+        'repeat': repeat,
+        'results': results,
+    }
+
+
+def print_timings(file_path: Path, timings: Dict[str, float]):
+    """Print one line per stage."""
+    print(f"⏱  {file_path}")
+    for stage, value in timings.items():
+        if stage == 'peak_rss_bytes':
+            if value is not None:
+                print(f"  {'peak RSS':<14}{value / 2**20:10.1f} MB")
+        elif stage == 'changes':
+            print(f"  {'changes':<14}{value:10d}")
+        else:
+            print(f"  {stage:<14}{value * 1000:10.2f} ms")
+
+
+def print_case(result: Dict):
+    """Print one suite result on a line."""
+    shape = result['shape']
+    stages = '  '.join(f"{stage} {seconds * 1000:.1f}ms" for stage, seconds in result['seconds'].items())
+    rss = result['peak_rss_bytes']
+    rss = f"  peak {rss / 2**20:.0f}MB" if rss is not None else ''
+    print(f"{shape['keys']:>9} keys x {shape['locales']:>2} locales "
+          f"({result['file_bytes'] / 2**20:.1f}MB): {stages}{rss}")
+
+
+def parse_case(text: str) -> Tuple[int, int]:
+    """'100000x40' -> (100000, 40); keys may use k/M suffixes ('1Mx60')."""
+    keys, _, locales = text.lower().partition('x')
+    multiplier = 1
+    if keys.endswith('k'):
+        keys, multiplier = keys[:-1], 1_000
+    elif keys.endswith('m'):
+        keys, multiplier = keys[:-1], 1_000_000
+    try:
+        return int(float(keys) * multiplier), int(locales or 10)
+    except ValueError:
+        raise argparse.ArgumentTypeError(f"expected KEYSxLOCALES such as 10kx40, got {text!r}")
+
+
+def add_suite_arguments(parser: argparse.ArgumentParser):
+    """Options selecting the synthetic catalogs and how they are measured."""
+    defaults = CatalogShape()
+    parser.add_argument('--case', dest='cases', type=parse_case, action='append',
+                        help="catalog size as KEYSxLOCALES, e.g. 1kx10 or 1Mx60 (repeatable; "
+                             "default: " + ', '.join(f"{k}x{l}" for k, l in DEFAULT_CASES) + ")")
+    parser.add_argument('--repeat', type=int, default=DEFAULT_REPEAT,
+                        help="runs per stage; the fastest is reported")
+    for name in ('missing_ratio', 'stale_ratio', 'review_ratio', 'no_translate_ratio',
+                 'variation_ratio', 'substitution_ratio', 'format_ratio'):
+        parser.add_argument('--' + name.replace('_', '-'), type=float, default=getattr(defaults, name))
+    parser.add_argument('--seed', type=int, default=defaults.seed)
+    parser.add_argument('--output', type=Path, default=None, help="write the results as JSON to this file")
+
+
+def shapes_from_arguments(args) -> List[CatalogShape]:
+    """One shape per --case, with the ratio and seed options applied."""
+    options = {name: getattr(args, name) for name in CatalogShape._fields if name not in ('keys', 'locales')}
+    return [CatalogShape(keys, locales, **options) for keys, locales in (args.cases or DEFAULT_CASES)]
+
+
+def run_suite_from_arguments(args):
+    """Run the suite described by add_suite_arguments' options and save the results."""
+    shapes = shapes_from_arguments(args)
+    results = run_suite(shapes, args.repeat)
+    if args.output:
+        args.output.write_text(json.dumps(results_document(results, args.repeat), indent=2) + '\n',
+                               encoding='utf-8')
+        print(f"Results saved to {args.output}")
+
+
+def main(argv: Optional[List[str]] = None):
+    """Main function."""
+    parser = argparse.ArgumentParser(description="Benchmark the localization tools")
+    parser.add_argument('catalog', nargs='?', type=Path, default=None,
+                        help="time one existing catalog instead of running the synthetic suite")
+    parser.add_argument('--generate', type=Path, default=None, metavar='PATH',
+                        help="only write a synthetic catalog of the first --case to PATH")
+    add_suite_arguments(parser)
+    args = parser.parse_args(argv)
+
+    if args.catalog is not None:
+        print_timings(args.catalog, time_catalog(args.catalog, args.repeat))
+    elif args.generate is not None:
+        write_synthetic_catalog(args.generate, shapes_from_arguments(args)[0])
+        print(f"Wrote {args.generate} ({args.generate.stat().st_size / 2**20:.1f} MB)")
+    else:
+        run_suite_from_arguments(args)
+
+
+if __name__ == "__main__":
+    main()
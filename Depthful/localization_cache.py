@@ -0,0 +1,156 @@
+#!/usr/bin/env python3
+"""
+Parsed Catalog Cache
+Keeps a binary snapshot of the compact Catalog model next to each
+.xcstrings file so repeated status checks skip the full JSON parse
+"""
+
+from __future__ import annotations
+
+import marshal
+import os
+from pathlib import Path
+
+from localization_catalog import Catalog
+
+TYPE_CHECKING = False
+if TYPE_CHECKING:
+    from typing import Optional
+
+CACHE_DIR_NAME = ".localization_cache"
+
+# Bump whenever the Catalog layout or the snapshot tuple changes
+SNAPSHOT_FORMAT = 2
+SNAPSHOT_MAGIC = b"XCSNAP"
+
+
+def default_cache_dir(file_path: Path) -> Path:
+    """Cache directory used for a catalog when none is given."""
+    return file_path.parent / CACHE_DIR_NAME
+
+
+def snapshot_path(file_path: Path, cache_dir: Optional[Path] = None) -> Path:
+    """Location of the snapshot for a catalog file."""
+    cache_dir = cache_dir or default_cache_dir(file_path)
+    return cache_dir / f"{file_path.name}.snapshot"
+
+
+def content_hash(content: bytes) -> str:
+    # Imported here: snapshot hits never hash, and loading OpenSSL costs milliseconds
+    import hashlib
+    return hashlib.sha256(content).hexdigest()
+
+
+def _catalog_to_tuple(catalog: Catalog) -> tuple:
+    return (
+        catalog.source_language,
+        catalog.version,
+        catalog.keys,
+        catalog.languages,
+        bytes(catalog.should_translate),
+        catalog.extraction_states,
+        bytes(catalog.states),
+        catalog.values,
+        sorted(catalog.placeholder_errors),
+    )
+
+
+def _catalog_from_tuple(snapshot: tuple, file_path: Path) -> Catalog:
+    (source_language, version, keys, languages,
+     should_translate, extraction_states, states, values, placeholder_errors) = snapshot
+    catalog = Catalog(keys, languages, source_language=source_language,
+                      version=version, path=file_path)
+    catalog.should_translate = bytearray(should_translate)
+    catalog.extraction_states = extraction_states
+    catalog.states = bytearray(states)
+    catalog.values = values
+    catalog.placeholder_errors = set(placeholder_errors)
+    return catalog
+
+
+def read_snapshot(file_path: Path, cache_dir: Optional[Path] = None) -> Optional[dict]:
+    """Read a snapshot header and payload, or None if there is no usable snapshot."""
+    path = snapshot_path(file_path, cache_dir)
+    try:
+        with open(path, 'rb') as f:
+            content = f.read()
+        if not content.startswith(SNAPSHOT_MAGIC):
+            return None
+        # marshal.load on the file reads it in small pieces, several times slower
+        snapshot = marshal.loads(memoryview(content)[len(SNAPSHOT_MAGIC):])
+    except (OSError, EOFError, ValueError, TypeError):
+        return None
+    if not isinstance(snapshot, dict) or snapshot.get('format') != SNAPSHOT_FORMAT:
+        return None
+    return snapshot
+
+
+def write_snapshot(catalog: Catalog, file_path: Path, mtime_ns: int, size: int,
+                   digest: str, cache_dir: Optional[Path] = None) -> bool:
+    """Write a snapshot atomically; a failed write only costs the next run a parse."""
+    path = snapshot_path(file_path, cache_dir)
+    snapshot = {
+        'format': SNAPSHOT_FORMAT,
+        'mtime_ns': mtime_ns,
+        'size': size,
+        'sha256': digest,
+        'catalog': _catalog_to_tuple(catalog),
+    }
+    tmp_path = path.with_name(f"{path.name}.{os.getpid()}.tmp")
+    try:
+        path.parent.mkdir(parents=True, exist_ok=True)
+        with open(tmp_path, 'wb') as f:
+            f.write(SNAPSHOT_MAGIC)
+            marshal.dump(snapshot, f)
+        os.replace(tmp_path, path)
+        return True
+    except OSError:
+        try:
+            tmp_path.unlink()
+        except OSError:
+            pass
+        return False
+
+
+def load_cached_catalog(file_path: Path, cache_dir: Optional[Path] = None) -> Optional[Catalog]:
+    """Load a catalog from its snapshot, re-parsing only when the file changed.
+
+    The snapshot is reused when mtime and size match. Otherwise the file is
+    hashed and the snapshot is still reused (and re-stamped) if the content
+    is identical, e.g. after a git checkout that only touched the mtime.
+    """
+    snapshot = read_snapshot(file_path, cache_dir)
+    try:
+        with open(file_path, 'rb') as f:
+            stat = os.fstat(f.fileno())
+            if (snapshot and snapshot['mtime_ns'] == stat.st_mtime_ns
+                    and snapshot['size'] == stat.st_size):
+                return _catalog_from_tuple(snapshot['catalog'], file_path)
+            content = f.read()
+    except OSError as e:
+        print(f"Error loading file: {e}")
+        return None
+
+    digest = content_hash(content)
+    if snapshot and snapshot['sha256'] == digest:
+        catalog = _catalog_from_tuple(snapshot['catalog'], file_path)
+    else:
+        # Imported here like hashlib: a snapshot hit never decodes JSON
+        import json
+        try:
+            data = json.loads(content)
+        except ValueError as e:
+            print(f"Error loading file: {e}")
+            return None
+        catalog = Catalog.from_data(data, path=file_path)
+
+    write_snapshot(catalog, file_path, stat.st_mtime_ns, len(content), digest, cache_dir)
+    return catalog
+
+
+def clear_cache(file_path: Path, cache_dir: Optional[Path] = None):
+    """Remove the snapshot for a catalog, if any."""
+    try:
+        snapshot_path(file_path, cache_dir).unlink()
+    except FileNotFoundError:
+        pass
@@ -0,0 +1,571 @@
+#!/usr/bin/env python3
+"""
+Shared Localization Catalog Engine
+Parses a Localizable.xcstrings file once into a compact model and answers
+completeness, state and missing-language queries for all localization tools
+
+Cell states are stored in a dense keys x languages uint8 matrix (a flat
+bytearray, row-major), so catalog-wide questions are answered with
+bytes.translate, strided column slices and big-integer bit operations
+instead of per-key Python sets.
+"""
+
+from __future__ import annotations
+
+from pathlib import Path
+
+# Every status check imports this module, and importing typing costs it a
+# few milliseconds; with postponed annotations the names are only needed
+# by type checkers
+TYPE_CHECKING = False
+if TYPE_CHECKING:
+    from typing import Callable, Dict, Iterable, Iterator, List, Optional, Union
+
+# Expected languages based on the file
+EXPECTED_LANGUAGES = {'ar', 'de', 'es', 'fr', 'hi', 'ja', 'ko', 'pt', 'zh-Hans', 'en'}
+
+DEFAULT_CATALOG_NAME = "Localizable.xcstrings"
+
+# One code per stringUnit.state
+STATE_MISSING = 0       # language has no localization for the key
+STATE_TRANSLATED = 1
+STATE_NEW = 2
+STATE_NEEDS_REVIEW = 3
+STATE_STALE = 4
+STATE_VARIATIONS = 5    # localization without a stringUnit (plural/device variations, substitutions)
+STATE_OTHER = 6         # stringUnit with a missing or unknown state
+
+STATE_CODES = {
+    'translated': STATE_TRANSLATED,
+    'new': STATE_NEW,
+    'needs_review': STATE_NEEDS_REVIEW,
+    'stale': STATE_STALE,
+}
+STATE_NAMES = {code: name for name, code in STATE_CODES.items()}
+STATE_NAMES[STATE_VARIATIONS] = ''
+STATE_NAMES[STATE_OTHER] = ''
+
+# Columns of the per-language state histogram, besides 'missing'
+HISTOGRAM_STATES = (
+    ('translated', STATE_TRANSLATED),
+    ('new', STATE_NEW),
+    ('needs_review', STATE_NEEDS_REVIEW),
+    ('stale', STATE_STALE),
+    ('variations', STATE_VARIATIONS),
+    ('other', STATE_OTHER),
+)
+
+
+def _byte_table(codes: Iterable[int]) -> bytes:
+    """Translation table mapping the given state codes to 1 and everything else to 0."""
+    table = bytearray(256)
+    for code in codes:
+        table[code] = 1
+    return bytes(table)
+
+
+PRESENT_TABLE = _byte_table(range(1, 256))
+ABSENT_TABLE = _byte_table([STATE_MISSING])
+UNTRANSLATED_TABLE = _byte_table(code for code in range(1, 256) if code != STATE_TRANSLATED)
+NONZERO_TABLE = PRESENT_TABLE
+STRING_UNIT_TABLE = _byte_table(code for code in range(1, 256) if code != STATE_VARIATIONS)
+FLAG_TO_MASK_TABLE = bytes([0] + [0xFF] * 255)
+
+
+class Catalog:
+    """Compact, query-oriented view of an .xcstrings catalog."""
+
+    def __init__(self, keys: List[str], languages: List[str],
+                 source_language: str = 'en', version: str = '1.0',
+                 path: Optional[Path] = None):
+        self.source_language = source_language
+        self.version = version
+        self.path = path
+        self.keys = keys
+        self.index = {key: row for row, key in enumerate(keys)}
+        self.languages = languages
+        self.language_index = {lang: col for col, lang in enumerate(languages)}
+        self.should_translate = bytearray(b'\x01' * len(keys))
+        self.extraction_states: List[Optional[str]] = [None] * len(keys)
+        # (row, column) of every cell whose format specifiers differ from the
+        # source's; maintained as cells change so analysis never re-parses text
+        self.placeholder_errors = set()
+        # keys x languages state codes and the matching stringUnit values
+        self.states = bytearray(len(keys) * len(languages))
+        self.values: List[Optional[str]] = [None] * (len(keys) * len(languages))
+        # Built on first use by completeness(), then kept current by every edit
+        self.counters: Optional['CompletenessCounters'] = None
+
+    @classmethod
+    def from_data(cls, data: Dict, path: Optional[Path] = None) -> 'Catalog':
+        """Build the model from an already decoded xcstrings JSON tree."""
+        strings = data.get('strings', {})
+
+        # Expected languages come first so their columns are stable across catalogs
+        seen = set(EXPECTED_LANGUAGES)
+        for value in strings.values():
+            seen.update(value.get('localizations', ()))
+        languages = sorted(EXPECTED_LANGUAGES) + sorted(seen - EXPECTED_LANGUAGES)
+
+        catalog = cls(
+            list(strings), languages,
+            source_language=data.get('sourceLanguage', 'en'),
+            version=data.get('version', '1.0'),
+            path=path,
+        )
+        width = len(languages)
+        language_index = catalog.language_index
+        states = catalog.states
+        values = catalog.values
+
+        for row, (key, value) in enumerate(strings.items()):
+            if value.get('shouldTranslate') == False:
+                catalog.should_translate[row] = 0
+            catalog.extraction_states[row] = value.get('extractionState')
+            base = row * width
+            has_specifiers = '%' in key
+            for lang, loc_data in value.get('localizations', {}).items():
+                cell = base + language_index[lang]
+                string_unit = loc_data.get('stringUnit')
+                if string_unit is None:
+                    states[cell] = STATE_VARIATIONS
+                    continue
+                states[cell] = STATE_CODES.get(string_unit.get('state'), STATE_OTHER)
+                text = values[cell] = string_unit.get('value')
+                if text and '%' in text:
+                    has_specifiers = True
+            # Only rows that contain a '%' anywhere can have mismatched specifiers
+            if has_specifiers:
+                catalog.check_placeholders(row)
+        return catalog
+
+    def add_key(self, key: str, should_translate: bool = True) -> int:
+        """Append an empty row for a new key and return its row number."""
+        if key in self.index:
+            return self.index[key]
+        row = len(self.keys)
+        self.keys.append(key)
+        self.index[key] = row
+        self.should_translate.append(1 if should_translate else 0)
+        self.extraction_states.append(None)
+        self.states.extend(bytes(self.width))
+        self.values.extend([None] * self.width)
+        if self.counters is not None:
+            self.counters.add_row(bool(should_translate))
+        return row
+
+    def add_language(self, language: str) -> int:
+        """Append a column for a new language and return its column number."""
+        if language in self.language_index:
+            return self.language_index[language]
+        width = self.width
+        states = bytearray()
+        values = []
+        for row in range(len(self.keys)):
+            start = row * width
+            states += self.states[start:start + width]
+            states.append(STATE_MISSING)
+            values.extend(self.values[start:start + width])
+            values.append(None)
+        self.states = states
+        self.values = values
+        self.language_index[language] = width
+        self.languages.append(language)
+        return width
+
+    def set_cell(self, key: str, language: str, state: str, value: Optional[str] = None):
+        """Set the state (and value, if given) of a cell, creating the key or language as needed."""
+        row = self.add_key(key)
+        col = self.add_language(language)
+        cell = row * self.width + col
+        old_code = self.states[cell]
+        code = self.states[cell] = STATE_CODES.get(state, STATE_OTHER)
+        if self.counters is not None:
+            self.counters.update(row, language, old_code, code)
+        if value is not None:
+            from localization_placeholders import mismatched_cells
+            self.values[cell] = value
+            if col == self.language_index.get(self.source_language):
+                self.check_placeholders(row)
+            elif mismatched_cells(self.source_value(key), [value]):
+                self.placeholder_errors.add((row, col))
+            else:
+                self.placeholder_errors.discard((row, col))
+
+    def completeness(self, expected_languages: Iterable[str] = EXPECTED_LANGUAGES) -> 'CompletenessCounters':
+        """Completeness counters for expected_languages, kept current as cells change.
+
+        The first call (or a call with different languages) counts the whole
+        catalog once; after that every set_cell updates them in O(1).
+        """
+        expected = frozenset(expected_languages)
+        if self.counters is None or self.counters.expected_languages != expected:
+            self.counters = CompletenessCounters(self, expected)
+        return self.counters
+
+    def check_placeholders(self, row: int):
+        """Recompute the placeholder mismatches of one row."""
+        # Imported here: only rows containing a '%' get this far, and a status
+        # check on a snapshot never does
+        from localization_placeholders import mismatched_cells
+        width = self.width
+        start = row * width
+        for col in range(width):
+            self.placeholder_errors.discard((row, col))
+        source = self.source_value(self.keys[row])
+        for col in mismatched_cells(source, self.values[start:start + width]):
+            self.placeholder_errors.add((row, col))
+
+    def __len__(self) -> int:
+        return len(self.keys)
+
+    def __contains__(self, key: str) -> bool:
+        return key in self.index
+
+    @property
+    def width(self) -> int:
+        return len(self.languages)
+
+    def cell(self, key: str, language: str) -> int:
+        """Flat matrix offset of a (key, language) cell."""
+        return self.index[key] * self.width + self.language_index[language]
+
+    def row_states(self, key: str) -> bytearray:
+        """State codes of one key, in column order."""
+        start = self.index[key] * self.width
+        return self.states[start:start + self.width]
+
+    def column_states(self, language: str) -> bytearray:
+        """State codes of one language, in key order."""
+        return self.states[self.language_index[language]::self.width]
+
+    def state_code(self, key: str, language: str) -> int:
+        if language not in self.language_index:
+            return STATE_MISSING
+        return self.states[self.cell(key, language)]
+
+    def state(self, key: str, language: str) -> Optional[str]:
+        """Return the stringUnit state for a cell, or None if the language is missing."""
+        code = self.state_code(key, language)
+        if code == STATE_MISSING:
+            return None
+        return STATE_NAMES[code]
+
+    def value(self, key: str, language: str) -> Optional[str]:
+        """Return the stringUnit value for a cell, if any."""
+        if language not in self.language_index:
+            return None
+        return self.values[self.cell(key, language)]
+
+    def source_value(self, key: str) -> str:
+        """Return the source-language value, falling back to the key itself."""
+        value = self.value(key, self.source_language)
+        return key if value is None else value
+
+    def translatable(self, key: str) -> bool:
+        return bool(self.should_translate[self.index[key]])
+
+    def available_languages(self, key: str) -> List[str]:
+        """Languages that have a localization for a key."""
+        row = self.row_states(key)
+        return [lang for lang, code in zip(self.languages, row) if code != STATE_MISSING]
+
+    def present_languages(self) -> List[str]:
+        """Languages with at least one localization, plus the source language."""
+        width = self.width
+        return sorted(lang for col, lang in enumerate(self.languages)
+                      if lang == self.source_language or any(self.states[col::width]))
+
+    def missing_languages(self, key: str,
+                          expected_languages: Iterable[str] = EXPECTED_LANGUAGES) -> List[str]:
+        """Expected languages that have no localization for a key."""
+        return sorted(lang for lang in expected_languages
+                      if self.state_code(key, lang) == STATE_MISSING)
+
+    def is_fully_translated(self, key: str) -> bool:
+        """True if every available localization has the 'translated' state."""
+        return not any(self.row_states(key).translate(UNTRANSLATED_TABLE))
+
+    def column_bits(self, table: bytes, language: str) -> int:
+        """One byte per key (0 or 1) for a language column, packed into an int."""
+        if language not in self.language_index:
+            return int.from_bytes(bytes([table[STATE_MISSING]]) * len(self.keys), 'big')
+        column = self.column_states(language).translate(table)
+        return int.from_bytes(column, 'big')
+
+    def translatable_bits(self) -> int:
+        return int.from_bytes(self.should_translate, 'big')
+
+
+class CompletenessCounters:
+    """Completeness totals of a catalog that are updated cell by cell.
+
+    Per key it keeps the number of missing expected languages and of present
+    cells that are not 'translated'; from those it maintains the complete key
+    counts (with and without require_translated), per-language coverage and
+    per-language state histograms over translatable keys.
+    """
+
+    def __init__(self, catalog: Catalog, expected_languages: frozenset):
+        self.catalog = catalog
+        self.expected_languages = expected_languages
+        rows = len(catalog)
+        translatable = catalog.translatable_bits()
+        self.translatable_count = _count_rows(translatable)
+
+        # Per-key byte counters, summed from packed columns as in analyze_completeness
+        missing = 0
+        for lang in expected_languages:
+            missing += catalog.column_bits(ABSENT_TABLE, lang)
+        untranslated = 0
+        for lang in catalog.languages:
+            untranslated += catalog.column_bits(UNTRANSLATED_TABLE, lang)
+        self.row_missing = bytearray(missing.to_bytes(rows, 'big'))
+        self.row_untranslated = bytearray(untranslated.to_bytes(rows, 'big'))
+
+        incomplete = int.from_bytes(self.row_missing.translate(NONZERO_TABLE), 'big')
+        unreviewed = int.from_bytes(self.row_untranslated.translate(NONZERO_TABLE), 'big')
+        self.complete = self.translatable_count - _count_rows(incomplete & translatable)
+        self.complete_translated = self.translatable_count - _count_rows((incomplete | unreviewed) & translatable)
+
+        # Untranslatable keys are zeroed out of each column, so bytes.count gives
+        # every state count in C; they are taken back out of the missing count
+        translatable_mask = int.from_bytes(catalog.should_translate.translate(FLAG_TO_MASK_TABLE), 'big')
+        should_not_translate = rows - self.translatable_count
+        self.state_counts: Dict[str, List[int]] = {}
+        for lang in expected_languages:
+            if lang in catalog.language_index:
+                column = catalog.column_states(lang)
+                column = (int.from_bytes(column, 'big') & translatable_mask).to_bytes(rows, 'big')
+            else:
+                column = bytes(rows)
+            counts = [column.count(code) for code in range(STATE_OTHER + 1)]
+            counts[STATE_MISSING] -= should_not_translate
+            self.state_counts[lang] = counts
+
+    def _row_status(self, row: int):
+        return not self.row_missing[row], not self.row_missing[row] and not self.row_untranslated[row]
+
+    def update(self, row: int, language: str, old_code: int, code: int):
+        """Account for one cell changing from old_code to code."""
+        if old_code == code:
+            return
+        translatable = self.catalog.should_translate[row]
+        before = self._row_status(row)
+        if language in self.expected_languages:
+            self.row_missing[row] += (code == STATE_MISSING) - (old_code == STATE_MISSING)
+            if translatable:
+                counts = self.state_counts[language]
+                counts[old_code] -= 1
+                counts[code] += 1
+        self.row_untranslated[row] += ((code not in (STATE_MISSING, STATE_TRANSLATED))
+                                       - (old_code not in (STATE_MISSING, STATE_TRANSLATED)))
+        if translatable:
+            after = self._row_status(row)
+            self.complete += after[0] - before[0]
+            self.complete_translated += after[1] - before[1]
+
+    def add_row(self, translatable: bool):
+        """Account for a new key with no localizations."""
+        self.row_missing.append(len(self.expected_languages))
+        self.row_untranslated.append(0)
+        if translatable:
+            self.translatable_count += 1
+            for counts in self.state_counts.values():
+                counts[STATE_MISSING] += 1
+
+    def summary(self, require_translated: bool = False) -> Dict:
+        """The counters of analyze_completeness, without any per-key lists."""
+        complete = self.complete_translated if require_translated else self.complete
+        rows = len(self.catalog)
+        coverage = {lang: self.translatable_count - counts[STATE_MISSING]
+                    for lang, counts in sorted(self.state_counts.items())}
+        return {
+            'total_keys': rows,
+            'complete_keys': complete,
+            'incomplete_count': self.translatable_count - complete,
+            'should_not_translate': rows - self.translatable_count,
+            'completion_percentage': (complete / self.translatable_count) * 100 if self.translatable_count else 0.0,
+            'language_coverage': coverage,
+            'state_counts': {lang: {**{name: self.state_counts[lang][code] for name, code in HISTOGRAM_STATES},
+                                    'missing': self.state_counts[lang][STATE_MISSING]}
+                             for lang in coverage},
+        }
+
+
+def load_localizations(file_path: Path) -> Dict:
+    """Load the localization file."""
+    import json
+    try:
+        with open(file_path, 'r', encoding='utf-8') as f:
+            return json.load(f)
+    except Exception as e:
+        print(f"Error loading file: {e}")
+        return {}
+
+
+def load_catalog(file_path: Path) -> Optional[Catalog]:
+    """Load and parse a catalog file, returning None if it cannot be read."""
+    data = load_localizations(file_path)
+    if not data:
+        return None
+    return Catalog.from_data(data, path=file_path)
+
+
+def _set_rows(bits: int, rows: int) -> List[int]:
+    """Row numbers whose byte is non-zero in a packed per-key int."""
+    return list(_iter_set_rows(bits, rows))
+
+
+def _count_rows(bits: int) -> int:
+    """Number of rows set in a packed per-key int; int.bit_count needs Python 3.10."""
+    return bin(bits).count('1')
+
+
+def _iter_set_rows(bits: int, rows: int) -> Iterator[int]:
+    packed = bits.to_bytes(rows, 'big')
+    row = packed.find(1)
+    while row != -1:
+        yield row
+        row = packed.find(1, row + 1)
+
+
+def analyze_completeness(catalog: Union[Catalog, Dict],
+                         expected_languages: Iterable[str] = EXPECTED_LANGUAGES,
+                         require_translated: bool = False,
+                         on_incomplete: Optional[Callable[[str, List[str]], None]] = None,
+                         check_values: bool = True) -> Dict:
+    """Analyze the completeness of localizations.
+
+    With require_translated, keys that have every expected language but
+    contain a non-'translated' cell are also reported as incomplete.
+    placeholder_mismatches maps each language to the keys whose format
+    specifiers differ from the source; they are tracked on the catalog as it
+    is parsed and edited, so reporting them costs no extra pass.
+
+    untranslated_copies and wrong_script list, per language, the keys whose
+    value is just the source text or is not written in the locale's script.
+    true_completion_percentage counts such keys as incomplete too. Without
+    check_values these value checks are skipped and their fields left out,
+    as in the counts status streams from very large catalogs.
+
+    state_counts maps each language to a histogram of its translatable
+    cells by state, plus missing cells and the copy/script findings above.
+    The counts come from catalog.completeness(), which stays current as
+    cells are edited, so re-checking after a fix needs no new pass.
+
+    With on_incomplete, each incomplete key is passed to it with its missing
+    languages as it is found, and incomplete_keys, missing_languages and
+    missing_counts are left empty instead of being built.
+    """
+    if not isinstance(catalog, Catalog):
+        catalog = Catalog.from_data(catalog)
+    expected_languages = sorted(set(expected_languages))
+    rows = len(catalog)
+
+    translatable = catalog.translatable_bits()
+    translatable_count = _count_rows(translatable)
+
+    # Per-key missing and not-yet-translated counts are kept by the catalog
+    counters = catalog.completeness(expected_languages)
+    counts = counters.row_missing
+    incomplete = int.from_bytes(counts.translate(NONZERO_TABLE), 'big') & translatable
+    if require_translated:
+        incomplete |= int.from_bytes(counters.row_untranslated.translate(NONZERO_TABLE), 'big') & translatable
+    summary = counters.summary(require_translated)
+    complete_keys = summary['complete_keys']
+
+    analysis = {
+        'total_keys': rows,
+        'complete_keys': complete_keys,
+        'incomplete_keys': [],
+        'missing_languages': {},
+        'missing_counts': {},
+        'language_coverage': {},
+        'state_counts': {},
+        'should_not_translate': rows - translatable_count,
+        'completion_percentage': 0.0,
+        'placeholder_mismatches': {},
+        'untranslated_copies': {},
+        'wrong_script': {},
+        'true_complete_keys': complete_keys,
+        'true_completion_percentage': 0.0
+    }
+
+    width = catalog.width
+    # Expected languages absent from every key have no column at all
+    absent_everywhere = [lang for lang in expected_languages if lang not in catalog.language_index]
+    expected_columns = [(lang, catalog.language_index[lang]) for lang in expected_languages
+                        if lang in catalog.language_index]
+    for row in _iter_set_rows(incomplete, rows):
+        key = catalog.keys[row]
+        count = counts[row]
+        missing_languages = []
+        if count:
+            row_states = catalog.states[row * width:(row + 1) * width]
+            missing_languages = sorted(
+                absent_everywhere + [lang for lang, col in expected_columns if not row_states[col]])
+        if on_incomplete is not None:
+            on_incomplete(key, missing_languages)
+            continue
+        analysis['incomplete_keys'].append(key)
+        analysis['missing_counts'].setdefault(count, []).append(key)
+        if count:
+            analysis['missing_languages'][key] = missing_languages
+
+    analysis['language_coverage'] = summary['language_coverage']
+    for lang, histogram in summary['state_counts'].items():
+        if check_values:
+            histogram['untranslated_copies'] = 0
+            histogram['wrong_script'] = 0
+        analysis['state_counts'][lang] = histogram
+
+    mismatches = analysis['placeholder_mismatches']
+    for row, col in sorted(catalog.placeholder_errors):
+        mismatches.setdefault(catalog.languages[col], []).append(catalog.keys[row])
+    analysis['placeholder_mismatches'] = {lang: mismatches[lang] for lang in sorted(mismatches)}
+
+    if not check_values:
+        for field in ('untranslated_copies', 'wrong_script', 'true_complete_keys', 'true_completion_percentage'):
+            del analysis[field]
+        if translatable_count > 0:
+            analysis['completion_percentage'] = (complete_keys / translatable_count) * 100
+        return analysis
+
+    # Imported here: compiling the per-script patterns is most of a status check
+    from localization_quality import copy_bits, letter_bits, wrong_script_bits
+
+    # Present cells that are not really translated
+    suspect = 0
+    source_column = catalog.language_index.get(catalog.source_language)
+    if source_column is not None and rows:
+        # Keys without a source stringUnit are compared against the key itself
+        source_values = catalog.values[source_column::width]
+        source_units = catalog.column_bits(STRING_UNIT_TABLE, catalog.source_language)
+        for row in _set_rows(translatable & ~source_units, rows):
+            source_values[row] = catalog.keys[row]
+        candidates = translatable & letter_bits(source_values)
+
+        for lang in expected_languages:
+            if lang == catalog.source_language or lang not in catalog.language_index:
+                continue
+            column = catalog.values[catalog.language_index[lang]::width]
+            units = catalog.column_bits(STRING_UNIT_TABLE, lang) & translatable
+            copies = copy_bits(column, source_values) & units & candidates
+            wrong = wrong_script_bits(lang, column) & units
+            if copies:
+                analysis['untranslated_copies'][lang] = [catalog.keys[row] for row in _set_rows(copies, rows)]
+                analysis['state_counts'][lang]['untranslated_copies'] = _count_rows(copies)
+            if wrong:
+                analysis['wrong_script'][lang] = [catalog.keys[row] for row in _set_rows(wrong, rows)]
+                analysis['state_counts'][lang]['wrong_script'] = _count_rows(wrong)
+            suspect |= copies | wrong
+
+    # Calculate completion percentage
+    if translatable_count > 0:
+        analysis['completion_percentage'] = (complete_keys / translatable_count) * 100
+        true_complete = translatable_count - _count_rows((incomplete | suspect) & translatable)
+        analysis['true_complete_keys'] = true_complete
+        analysis['true_completion_percentage'] = (true_complete / translatable_count) * 100
+
+    return analysis
@@ -0,0 +1,148 @@
+#!/usr/bin/env python3
+"""
+Localization Changesets
+Records fixes as add / replace / set-state operations against a base
+catalog instead of copying it, so they can be previewed as a patch,
+verified on the compact model and written back in a single pass
+"""
+
+import json
+from pathlib import Path
+from typing import Dict, Iterator, List, NamedTuple, Optional
+
+from localization_catalog import STATE_MISSING, STATE_VARIATIONS, Catalog
+from localization_writer import (
+    format_xcstrings,
+    index_entries,
+    read_entries,
+    splice_entries,
+    write_catalog_bytes,
+)
+
+ADD = 'add'
+REPLACE = 'replace'
+SET_STATE = 'set_state'
+
+
+class Operation(NamedTuple):
+    """One cell-level change; value is None for set_state."""
+    op: str
+    key: str
+    language: str
+    value: Optional[str]
+    state: Optional[str]
+
+
+class Changeset:
+    """Ordered list of cell operations overlaid on a base catalog."""
+
+    def __init__(self, catalog: Catalog):
+        self.catalog = catalog
+        self.operations: List[Operation] = []
+
+    def __len__(self) -> int:
+        return len(self.operations)
+
+    def __iter__(self) -> Iterator[Operation]:
+        return iter(self.operations)
+
+    def add(self, key: str, language: str, value: str, state: str = 'translated'):
+        """Add a localization for a language the key does not have yet."""
+        if key in self.catalog and self.catalog.state_code(key, language) != STATE_MISSING:
+            raise ValueError(f"'{key}' already has a '{language}' localization")
+        self.operations.append(Operation(ADD, key, language, value, state))
+
+    def replace(self, key: str, language: str, value: str, state: Optional[str] = None):
+        """Replace the value (and optionally the state) of an existing stringUnit."""
+        self._require_string_unit(key, language)
+        self.operations.append(Operation(REPLACE, key, language, value, state))
+
+    def set_state(self, key: str, language: str, state: str):
+        """Change the state of an existing stringUnit."""
+        self._require_string_unit(key, language)
+        self.operations.append(Operation(SET_STATE, key, language, None, state))
+
+    def _require_string_unit(self, key: str, language: str):
+        if key not in self.catalog or self.catalog.state_code(key, language) in (STATE_MISSING,
+                                                                                 STATE_VARIATIONS):
+            raise ValueError(f"'{key}' has no '{language}' stringUnit")
+
+    def changed_keys(self) -> List[str]:
+        """Keys touched by the changeset, in first-touched order."""
+        return list(dict.fromkeys(operation.key for operation in self.operations))
+
+    def format_patch(self) -> str:
+        """Human-readable patch listing every operation."""
+        lines = []
+        for operation in self.operations:
+            key = json.dumps(operation.key, ensure_ascii=False)
+            if operation.op == ADD:
+                value = json.dumps(operation.value, ensure_ascii=False)
+                lines.append(f"+ [{operation.language}] {key} = {value} ({operation.state})")
+            elif operation.op == REPLACE:
+                old = json.dumps(self.catalog.value(operation.key, operation.language), ensure_ascii=False)
+                value = json.dumps(operation.value, ensure_ascii=False)
+                state = f" ({operation.state})" if operation.state else ''
+                lines.append(f"~ [{operation.language}] {key} = {value}{state} (was {old})")
+            else:
+                old_state = self.catalog.state(operation.key, operation.language)
+                lines.append(f"= [{operation.language}] {key} state: {old_state} -> {operation.state}")
+        return '\n'.join(lines)
+
+    def apply_to_catalog(self):
+        """Apply every operation to the base catalog model in place."""
+        catalog = self.catalog
+        for operation in self.operations:
+            if operation.op == SET_STATE:
+                catalog.set_cell(operation.key, operation.language, operation.state)
+            else:
+                state = operation.state or catalog.state(operation.key, operation.language)
+                catalog.set_cell(operation.key, operation.language, state, operation.value)
+
+    def apply_to_entries(self, entries: Dict[str, Dict]):
+        """Apply every operation to decoded xcstrings entries in place."""
+        for operation in self.operations:
+            entry = entries.setdefault(operation.key, {})
+            localizations = entry.setdefault('localizations', {})
+            if operation.op == ADD:
+                localizations[operation.language] = {
+                    "stringUnit": {
+                        "state": operation.state,
+                        "value": operation.value
+                    }
+                }
+                continue
+            string_unit = localizations[operation.language]['stringUnit']
+            if operation.op == REPLACE:
+                string_unit['value'] = operation.value
+            if operation.state:
+                string_unit['state'] = operation.state
+
+    def render(self, original: bytes) -> bytes:
+        """Encode the catalog with this changeset applied.
+
+        Only the touched entries are decoded and re-encoded; a catalog that is
+        not in Xcode's layout is decoded and rewritten in full instead.
+        """
+        spans = index_entries(original)
+        if spans is not None:
+            changed = self.changed_keys()
+            entries = read_entries(original, spans, changed)
+            self.apply_to_entries(entries)
+            spliced = splice_entries(original, entries, spans)
+            if spliced is not None:
+                return spliced
+
+        data = json.loads(original)
+        self.apply_to_entries(data.setdefault('strings', {}))
+        return format_xcstrings(data).encode('utf-8')
+
+    def save(self, file_path: Path, backup: bool = True) -> bool:
+        """Write the changeset into the catalog file in one pass."""
+        try:
+            original = file_path.read_bytes()
+            content = self.render(original)
+        except Exception as e:
+            print(f"Error saving file: {e}")
+            return False
+        return write_catalog_bytes(content, file_path, backup)
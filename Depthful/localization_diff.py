@@ -0,0 +1,292 @@
+#!/usr/bin/env python3
+"""
+Git-Aware Catalog Diff
+Compares a catalog with its version at a git base ref key by key and
+language by language, then runs the completeness, placeholder and quality
+checks on the added and changed entries only, so a PR gate costs what the
+change costs rather than what the catalog costs
+"""
+
+import argparse
+import json
+import subprocess
+import sys
+from pathlib import Path
+from typing import Dict, Iterable, List, NamedTuple, Optional, Tuple
+
+from localization_catalog import EXPECTED_LANGUAGES, Catalog, analyze_completeness
+from localization_report import (
+    FORMATS,
+    diff_document,
+    diff_record,
+    finding_records,
+    incomplete_record,
+    summary_record,
+    write_json,
+    write_records,
+)
+from localization_writer import index_entries, read_entries
+
+ADDED = 'added'
+CHANGED = 'changed'
+REMOVED = 'removed'
+
+# Findings of analyze_completeness that are reported per (language, key) cell
+CELL_FINDINGS = ('placeholder_mismatches', 'untranslated_copies', 'wrong_script')
+
+
+class GitError(Exception):
+    """git is missing, the catalog is not in a repository or the ref does not exist."""
+
+
+class KeyChange(NamedTuple):
+    """One key that differs from the base, with the languages whose cells differ."""
+    key: str
+    kind: str
+    languages: Tuple[str, ...]
+
+
+def run_git(arguments: List[str], cwd: Path) -> subprocess.CompletedProcess:
+    try:
+        return subprocess.run(['git', *arguments], cwd=cwd, capture_output=True)
+    except OSError as e:
+        raise GitError(f"Could not run git: {e}") from e
+
+
+def read_blob(file_path: Path, ref: str) -> Optional[bytes]:
+    """Contents of file_path at ref, or None if the file did not exist there."""
+    file_path = file_path.resolve()
+    verified = run_git(['rev-parse', '--verify', '--quiet', f'{ref}^{{commit}}'], file_path.parent)
+    if verified.returncode != 0:
+        message = verified.stderr.decode('utf-8', 'replace').strip()
+        raise GitError(message or f"Unknown git ref '{ref}'")
+    # "./name" is resolved relative to the working directory, wherever the repository root is
+    shown = run_git(['show', f'{ref}:./{file_path.name}'], file_path.parent)
+    if shown.returncode != 0:
+        return None
+    return shown.stdout
+
+
+def diff_entries(base: Dict, head: Dict) -> List[KeyChange]:
+    """Key-level diff of two decoded 'strings' objects.
+
+    Unchanged entries are skipped with one dict comparison each; only keys
+    that differ are compared language by language. Added and changed keys
+    come in head order, removed keys after them in base order.
+    """
+    changes = []
+    for key, entry in head.items():
+        old = base.get(key)
+        if old is None:
+            changes.append(KeyChange(key, ADDED, tuple(sorted(entry.get('localizations', ())))))
+        elif old != entry:
+            old_localizations = old.get('localizations', {})
+            localizations = entry.get('localizations', {})
+            languages = sorted(lang for lang in old_localizations.keys() | localizations.keys()
+                               if old_localizations.get(lang) != localizations.get(lang))
+            changes.append(KeyChange(key, CHANGED, tuple(languages)))
+    for key, entry in base.items():
+        if key not in head:
+            changes.append(KeyChange(key, REMOVED, tuple(sorted(entry.get('localizations', ())))))
+    return changes
+
+
+def _touched_cells(changes: Iterable[KeyChange], source_language: str) -> Tuple[set, set]:
+    """Keys whose every cell needs checking, and (key, language) cells that changed.
+
+    Added keys and keys whose source text changed are checked in full, since
+    placeholder parity and copy detection compare every cell with the source.
+    """
+    whole_keys = set()
+    cells = set()
+    for change in changes:
+        if change.kind == ADDED or source_language in change.languages:
+            whole_keys.add(change.key)
+        else:
+            cells.update((change.key, lang) for lang in change.languages)
+    return whole_keys, cells
+
+
+def changed_entries(base_content: Optional[bytes], content: bytes) -> Tuple[Dict, List[KeyChange], Dict[str, Dict]]:
+    """Catalog header, key changes and decoded added/changed entries of content.
+
+    In Xcode's layout every entry is compared as raw bytes and only the
+    entries that differ are decoded, so neither file is parsed in full;
+    other layouts fall back to comparing the decoded trees.
+    """
+    spans = index_entries(content)
+    base_spans = index_entries(base_content) if base_content else []
+    if spans is None or base_spans is None:
+        head = json.loads(content)
+        base = json.loads(base_content) if base_content else {}
+        strings = head.get('strings', {})
+        changes = diff_entries(base.get('strings', {}), strings)
+        return head, changes, {change.key: strings[change.key] for change in changes if change.kind != REMOVED}
+
+    # Everything around the entries is the header with an empty "strings" object
+    header = json.loads(content[:spans[0][1]] + content[spans[-1][2]:])
+    base_index = {key: (start, end) for key, start, end in base_spans}
+    differing = []
+    for key, start, end in spans:
+        base_span = base_index.pop(key, None)
+        if base_span is None or base_content[base_span[0]:base_span[1]] != content[start:end]:
+            differing.append(key)
+    # Keys left in base_index were removed; their entries are decoded to list their languages
+    entries = read_entries(content, spans, differing)
+    base_entries = read_entries(base_content, base_spans, [*differing, *base_index]) if base_spans else {}
+    changes = diff_entries(base_entries, entries)
+    return header, changes, {change.key: entries[change.key] for change in changes if change.kind != REMOVED}
+
+
+def analyze_diff(file_path: Path, base_ref: str,
+                 expected_languages: Iterable[str] = EXPECTED_LANGUAGES,
+                 require_translated: bool = False) -> Optional[Dict]:
+    """Diff the working catalog against base_ref and analyze the changed entries.
+
+    Returns the changes and an analyze_completeness result covering only
+    the added and changed keys, with cell findings limited to the cells
+    that changed; None if the working catalog cannot be read. Raises
+    GitError if the base cannot be read from git.
+    """
+    base_content = read_blob(file_path, base_ref)
+    try:
+        content = file_path.read_bytes()
+        header, changes, entries = changed_entries(base_content, content)
+    except (OSError, ValueError) as e:
+        print(f"Error loading file: {e}")
+        return None
+
+    changed = Catalog.from_data({**header, 'strings': entries}, path=file_path)
+    analysis = analyze_completeness(changed, expected_languages, require_translated)
+
+    whole_keys, cells = _touched_cells(changes, changed.source_language)
+    for finding in CELL_FINDINGS:
+        filtered = {}
+        for lang, keys in analysis[finding].items():
+            kept = [key for key in keys if key in whole_keys or (key, lang) in cells]
+            if kept:
+                filtered[lang] = kept
+        analysis[finding] = filtered
+
+    return {
+        'base': base_ref,
+        'base_exists': base_content is not None,
+        'changes': changes,
+        'analysis': analysis,
+    }
+
+
+def has_issues(diff: Dict) -> bool:
+    """True if a changed entry is incomplete or has a placeholder or quality finding."""
+    analysis = diff['analysis']
+    return bool(analysis['incomplete_keys']) or any(analysis[finding] for finding in CELL_FINDINGS)
+
+
+def print_diff(diff: Dict, limit: int = 20):
+    """Print the changed keys and the problems found in them."""
+    changes = diff['changes']
+    analysis = diff['analysis']
+    counts = {kind: sum(1 for change in changes if change.kind == kind) for kind in (ADDED, CHANGED, REMOVED)}
+    print("=" * 60)
+    print(f"LOCALIZATION DIFF AGAINST {diff['base']}")
+    print("=" * 60)
+    if not diff['base_exists']:
+        print("The catalog does not exist at the base; every key is new")
+    print(f"Added keys: {counts[ADDED]}")
+    print(f"Changed keys: {counts[CHANGED]}")
+    print(f"Removed keys: {counts[REMOVED]}")
+    print(f"Changed cells: {sum(len(change.languages) for change in changes if change.kind != REMOVED)}")
+
+    if changes:
+        print()
+        for change in changes[:limit]:
+            marker = {ADDED: '+', CHANGED: '~', REMOVED: '-'}[change.kind]
+            print(f"  {marker} '{change.key}' [{', '.join(change.languages) or 'no localizations'}]")
+        if len(changes) > limit:
+            print(f"  ... and {len(changes) - limit} more keys")
+
+    if analysis['incomplete_keys']:
+        print()
+        print("INCOMPLETE CHANGED KEYS:")
+        print("-" * 40)
+        for key in analysis['incomplete_keys'][:limit]:
+            missing = analysis['missing_languages'].get(key, [])
+            print(f"  '{key}' -> Missing: {', '.join(missing) or 'none, but not all translated'}")
+        if len(analysis['incomplete_keys']) > limit:
+            print(f"  ... and {len(analysis['incomplete_keys']) - limit} more keys")
+
+    for title, finding in (("FORMAT PLACEHOLDER MISMATCHES:", 'placeholder_mismatches'),
+                           ("UNTRANSLATED COPIES OF THE SOURCE:", 'untranslated_copies'),
+                           ("VALUES IN THE WRONG SCRIPT:", 'wrong_script')):
+        if analysis[finding]:
+            print()
+            print(title)
+            print("-" * 40)
+            for lang, keys in analysis[finding].items():
+                print(f"  {lang}: {', '.join(repr(key) for key in keys[:limit])}"
+                      f"{f' ... and {len(keys) - limit} more' if len(keys) > limit else ''}")
+
+    print()
+    if has_issues(diff):
+        print("❌ Changed entries need attention")
+    else:
+        print("✅ All changed entries are complete")
+
+
+def write_diff_report(output_format: str, file_path: Path, diff: Dict):
+    """Write a diff as one JSON document or as NDJSON records."""
+    if output_format == 'json':
+        write_json(diff_document(file_path, diff))
+        return
+    analysis = diff['analysis']
+    write_records(diff_record(file_path, change) for change in diff['changes'])
+    write_records(incomplete_record(file_path, key, analysis['missing_languages'].get(key, []))
+                  for key in analysis['incomplete_keys'])
+    write_records(finding_records(file_path, analysis))
+    record = summary_record('diff', file_path, analysis)
+    record['base'] = diff['base']
+    write_records([record])
+
+
+def check_diff(file_path: Path, base_ref: str, output_format: str = 'text',
+               require_translated: bool = False) -> int:
+    """Run the diff and report it; returns the exit status for a PR gate.
+
+    0 when every changed entry passes, 1 when one needs attention, 2 when
+    the catalog or its base could not be read.
+    """
+    if not file_path.exists():
+        print(f"Error: File not found at {file_path}", file=sys.stderr)
+        return 2
+    try:
+        diff = analyze_diff(file_path, base_ref, require_translated=require_translated)
+    except GitError as e:
+        print(f"Error: {e}", file=sys.stderr)
+        return 2
+    if diff is None:
+        return 2
+
+    if output_format == 'text':
+        print_diff(diff)
+    else:
+        write_diff_report(output_format, file_path, diff)
+    return 1 if has_issues(diff) else 0
+
+
+def main():
+    """Main function."""
+    parser = argparse.ArgumentParser(description="Check only the keys of Localizable.xcstrings changed since a git ref")
+    parser.add_argument('catalog', nargs='?', type=Path, default=Path(__file__).parent / "Localizable.xcstrings",
+                        help="catalog file (default: Localizable.xcstrings next to this script)")
+    parser.add_argument('--base', default='HEAD',
+                        help="git ref to compare against, e.g. origin/main (default: HEAD)")
+    parser.add_argument('--require-translated', action='store_true',
+                        help="also report changed keys with cells not in the 'translated' state")
+    parser.add_argument('--format', choices=FORMATS, default='text',
+                        help="output format for CI")
+    args = parser.parse_args()
+    sys.exit(check_diff(args.catalog, args.base, args.format, args.require_translated))
+
+
+if __name__ == "__main__":
+    main()
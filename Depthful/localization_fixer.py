@@ -4,13 +4,22 @@ Automatic Localization Fixer for Afternoon App
 Fixes missing translations in Localizable.xcstrings file automatically
 """
 
-import json
+import argparse
+import os
 import sys
 from pathlib import Path
-from typing import Dict, List
+from typing import Dict, List, Optional, Sequence, Tuple
 
-# Expected languages based on the file
-EXPECTED_LANGUAGES = {'ar', 'de', 'es', 'fr', 'hi', 'ja', 'ko', 'pt', 'zh-Hans', 'en'}
+from localization_cache import load_cached_catalog
+from localization_catalog import EXPECTED_LANGUAGES, Catalog, analyze_completeness
+from localization_changeset import Changeset
+from localization_memory import TranslationMemory, load_memory_for
+from localization_report import FORMATS, change_record, fix_record, progress_to_stderr, write_json, write_records
+from localization_store import HUMAN_PROVIDER, TranslationStore, open_store
+from localization_translate import HTTPTranslationProvider, TranslationProvider, translate_cells
+
+# Below this many missing cells the lookups finish before a worker pool starts
+PARALLEL_MIN_CELLS = 2000
 
 # Translation mappings for common UI strings
 TRANSLATION_MAPPINGS = {
@@ -148,160 +157,295 @@ TRANSLATION_MAPPINGS = {
     }
 }
 
-def load_localizations(file_path: Path) -> Dict:
-    """Load the localization file."""
-    try:
-        with open(file_path, 'r', encoding='utf-8') as f:
-            return json.load(f)
-    except Exception as e:
-        print(f"Error loading file: {e}")
-        return {}
+def source_text(key: str, catalog: Catalog) -> str:
+    """English text a key is translated from: its 'en' value, else the key itself."""
+    english_value = catalog.value(key, 'en') if key in catalog else None
+    return english_value if english_value is not None else key
 
-def analyze_completeness(data: Dict) -> Dict:
-    """Analyze the completeness of localizations."""
-    strings = data.get('strings', {})
-    analysis = {
-        'total_keys': len(strings),
-        'complete_keys': 0,
-        'incomplete_keys': [],
-        'missing_languages': {},
-        'should_not_translate': 0,
-        'completion_percentage': 0.0
-    }
+def lookup_translation(key: str, language: str, catalog: Catalog,
+                       memory: Optional[TranslationMemory] = None,
+                       store: Optional[TranslationStore] = None) -> Optional[Tuple[str, str]]:
+    """Known translation for a key and language with the state to record it in, or None.
     
-    for key, value in strings.items():
-        # Skip entries that should not be translated
-        if value.get('shouldTranslate') == False:
-            analysis['should_not_translate'] += 1
+    Curated mappings and exact memory hits are 'translated'. A human
+    translation found only in the shared store (other catalogs and apps)
+    may since have been corrected or deleted there, and a near-variant from
+    the memory is only a suggestion, so both are marked 'needs_review'.
+    """
+    english_value = catalog.value(key, 'en') if key in catalog else None
+    return lookup_language(language, [(key, english_value)], memory, store)[0]
+
+def lookup_language(language: str, cells: Sequence[Tuple[str, Optional[str]]],
+                    memory: Optional[TranslationMemory] = None,
+                    store: Optional[TranslationStore] = None) -> List[Optional[Tuple[str, str]]]:
+    """lookup_translation for every (key, English value) cell of one language.
+    
+    Needs no catalog, so a worker process can fill a language on its own;
+    the store is queried once for the whole column instead of once per cell.
+    """
+    found: List[Optional[Tuple[str, str]]] = []
+    # (position in found, English source) of cells the mappings and exact memory missed
+    pending: List[Tuple[int, str]] = []
+    for key, english_value in cells:
+        # Check if we have a specific translation mapping
+        mapped = TRANSLATION_MAPPINGS.get(key)
+        if mapped is not None and language in mapped:
+            found.append((mapped[language], 'translated'))
             continue
-            
-        localizations = value.get('localizations', {})
-        available_languages = set(localizations.keys())
-        missing_languages = EXPECTED_LANGUAGES - available_languages
         
-        if missing_languages:
-            analysis['incomplete_keys'].append(key)
-            analysis['missing_languages'][key] = list(missing_languages)
-        else:
-            analysis['complete_keys'] += 1
-    
-    # Calculate completion percentage
-    translatable_keys = analysis['total_keys'] - analysis['should_not_translate']
-    if translatable_keys > 0:
-        analysis['completion_percentage'] = (analysis['complete_keys'] / translatable_keys) * 100
+        # For English, return the key itself
+        if language == 'en':
+            found.append((key, 'translated'))
+            continue
+        
+        # For other languages, try to use English value if available
+        if english_value is not None:
+            mapped = TRANSLATION_MAPPINGS.get(english_value)
+            if mapped is not None and language in mapped:
+                found.append((mapped[language], 'translated'))
+                continue
+        
+        # Reuse an existing human translation of the same or a similar English source
+        source = english_value if english_value is not None else key
+        remembered = memory.lookup(source, language) if memory is not None else None
+        found.append(None if remembered is None else (remembered, 'translated'))
+        if remembered is None:
+            pending.append((len(found) - 1, source))
     
-    return analysis
+    if store is not None and pending:
+        stored = store.get_many([source for _, source in pending], language, HUMAN_PROVIDER)
+        for position, source in pending:
+            # The store only ever adds human rows, so it cannot vouch for them
+            if source in stored:
+                found[position] = (stored[source][0], 'needs_review')
+    if memory is not None:
+        for position, source in pending:
+            if found[position] is None:
+                matches = memory.fuzzy_lookup(source, language, limit=1)
+                if matches:
+                    found[position] = (matches[0].target, 'needs_review')
+    return found
 
-def get_translation_value(key: str, language: str, existing_localizations: Dict) -> str:
-    """Get the appropriate translation value for a key and language."""
-    # Check if we have a specific translation mapping
-    if key in TRANSLATION_MAPPINGS and language in TRANSLATION_MAPPINGS[key]:
-        return TRANSLATION_MAPPINGS[key][language]
+# Memory and store of a fill worker process, set once by _init_fill_worker
+_worker_memory: Optional[TranslationMemory] = None
+_worker_store: Optional[TranslationStore] = None
+
+def _init_fill_worker(entries: Optional[Dict[str, Dict[str, str]]], store_path: Optional[Path]):
+    global _worker_memory, _worker_store
+    if entries is not None:
+        _worker_memory = TranslationMemory()
+        _worker_memory.entries = entries
+    # Each worker reads through its own connection; the store runs in WAL mode
+    _worker_store = open_store(store_path) if store_path is not None else None
+
+def _fill_language(language: str, cells: List[Tuple[str, Optional[str]]]) -> List[Optional[Tuple[str, str]]]:
+    return lookup_language(language, cells, _worker_memory, _worker_store)
+
+def lookup_languages(columns: Dict[str, List[str]], catalog: Catalog,
+                     memory: Optional[TranslationMemory] = None,
+                     store: Optional[TranslationStore] = None,
+                     jobs: Optional[int] = None) -> Dict[str, List[Optional[Tuple[str, str]]]]:
+    """lookup_language for each {language: [key, ...]} column, in parallel when it pays off.
     
-    # For English, return the key itself
-    if language == 'en':
-        return key
+    Languages are independent, so each one is filled by a single worker
+    process, largest first. Small fills, and fills with nothing to look up
+    beyond the curated mappings, stay in-process where a pool would only
+    add startup time.
+    """
+    cells = {language: [(key, catalog.value(key, 'en') if key in catalog else None) for key in keys]
+             for language, keys in columns.items()}
+    cell_count = sum(map(len, columns.values()))
+    jobs = min(jobs or os.cpu_count() or 1, len(columns))
+    if jobs <= 1 or cell_count < PARALLEL_MIN_CELLS or (memory is None and store is None):
+        return {language: lookup_language(language, column, memory, store)
+                for language, column in cells.items()}
     
-    # For other languages, try to use English value if available
-    if 'en' in existing_localizations:
-        english_value = existing_localizations['en']['stringUnit']['value']
-        if english_value in TRANSLATION_MAPPINGS and language in TRANSLATION_MAPPINGS[english_value]:
-            return TRANSLATION_MAPPINGS[english_value][language]
-        return english_value
+    from concurrent.futures import ProcessPoolExecutor
+    print(f"Looking up {cell_count} cells in {len(columns)} languages on {jobs} workers...")
+    ordered = sorted(cells, key=lambda language: len(cells[language]), reverse=True)
+    initargs = (memory.entries if memory is not None else None,
+                store.path if store is not None else None)
+    with ProcessPoolExecutor(max_workers=jobs, initializer=_init_fill_worker, initargs=initargs) as pool:
+        futures = {language: pool.submit(_fill_language, language, cells[language]) for language in ordered}
+        return {language: futures[language].result() for language in columns}
+
+def get_translation(key: str, language: str, catalog: Catalog,
+                    memory: Optional[TranslationMemory] = None,
+                    store: Optional[TranslationStore] = None) -> Tuple[str, str]:
+    """Get the translation value for a key and language with the state to record it in."""
+    found = lookup_translation(key, language, catalog, memory, store)
+    if found is not None:
+        return found
     
-    # Fallback to the key itself
-    return key
+    # Fall back to the English value, or the key itself
+    return source_text(key, catalog), 'translated'
+
+def get_translation_value(key: str, language: str, catalog: Catalog,
+                          memory: Optional[TranslationMemory] = None,
+                          store: Optional[TranslationStore] = None) -> str:
+    """Get the appropriate translation value for a key and language."""
+    return get_translation(key, language, catalog, memory, store)[0]
 
-def fix_localizations(data: Dict) -> Dict:
-    """Fix missing localizations in the data."""
-    analysis = analyze_completeness(data)
-    fixed_data = json.loads(json.dumps(data))  # Deep copy
+def fix_localizations(catalog: Catalog, analysis: Optional[Dict] = None,
+                      memory: Optional[TranslationMemory] = None,
+                      provider: Optional[TranslationProvider] = None,
+                      store: Optional[TranslationStore] = None,
+                      jobs: Optional[int] = None) -> Changeset:
+    """Record the missing localizations as a changeset against the catalog.
+    
+    Known translations are looked up per language, on up to `jobs` worker
+    processes (default: one per CPU). Cells with no known translation are
+    sent to the machine-translation provider, if any, in one batch per
+    language and recorded as 'needs_review'; without a provider (or if it
+    fails) they get the English text.
+    """
+    if analysis is None:
+        analysis = analyze_completeness(catalog)
+    changeset = Changeset(catalog)
     
     print(f"Fixing {len(analysis['incomplete_keys'])} incomplete keys...")
     
+    # Missing cells are filled one language at a time; languages do not depend on each other
+    columns: Dict[str, List[str]] = {}
+    for key in analysis['incomplete_keys']:
+        for lang in analysis['missing_languages'].get(key, []):
+            columns.setdefault(lang, []).append(key)
+    
+    # (key, language) -> (value, state), or None while still unknown
+    resolved = {}
+    unresolved: Dict[str, List[str]] = {}
+    for lang, found_column in lookup_languages(columns, catalog, memory, store, jobs).items():
+        for key, found in zip(columns[lang], found_column):
+            if found is None:
+                unresolved.setdefault(lang, []).append(source_text(key, catalog))
+            resolved[(key, lang)] = found
+    
+    machine = {}
+    if provider is not None and unresolved:
+        machine = translate_cells(provider, unresolved, catalog.source_language, store)
+    
     fixed_count = 0
+    review_count = 0
+    machine_count = 0
     for key in analysis['incomplete_keys']:
         missing_languages = analysis['missing_languages'].get(key, [])
         if missing_languages:
-            existing_localizations = fixed_data['strings'][key].get('localizations', {})
-            
-            # Ensure localizations key exists
-            if 'localizations' not in fixed_data['strings'][key]:
-                fixed_data['strings'][key]['localizations'] = {}
-            
             # Add missing translations
             for lang in missing_languages:
-                translation_value = get_translation_value(key, lang, existing_localizations)
-                
-                fixed_data['strings'][key]['localizations'][lang] = {
-                    "stringUnit": {
-                        "state": "translated",
-                        "value": translation_value
-                    }
-                }
+                found = resolved[(key, lang)]
+                if found is None:
+                    source = source_text(key, catalog)
+                    if (source, lang) in machine:
+                        found = (machine[(source, lang)], 'needs_review')
+                        machine_count += 1
+                    else:
+                        found = (source, 'translated')
+                elif found[1] == 'needs_review':
+                    review_count += 1
+                translation_value, state = found
+                changeset.add(key, lang, translation_value, state)
             
             fixed_count += 1
             print(f"Fixed '{key[:50]}{'...' if len(key) > 50 else ''}' -> Added {len(missing_languages)} languages")
     
     print(f"Fixed {fixed_count} keys with missing translations")
-    return fixed_data
-
-def save_fixed_file(data: Dict, file_path: Path, backup: bool = True) -> bool:
-    """Save the fixed localization file."""
-    if backup:
-        backup_path = file_path.with_suffix('.xcstrings.backup')
-        if file_path.exists():
-            import shutil
-            shutil.copy2(file_path, backup_path)
-            print(f"Backup saved to: {backup_path}")
-    
-    try:
-        with open(file_path, 'w', encoding='utf-8') as f:
-            json.dump(data, f, indent=2, ensure_ascii=False)
-        print(f"Fixed file saved to: {file_path}")
-        return True
-    except Exception as e:
-        print(f"Error saving file: {e}")
-        return False
+    if review_count:
+        print(f"{review_count} fuzzy translation-memory matches marked needs_review")
+    if machine_count:
+        print(f"{machine_count} machine translations marked needs_review")
+    return changeset
 
 def main():
     """Main function."""
+    parser = argparse.ArgumentParser(description="Fix missing translations in Localizable.xcstrings")
+    parser.add_argument('--dry-run', action='store_true',
+                        help="print the patch that would be applied without saving")
+    parser.add_argument('--mt-url', default=os.environ.get('LOCALIZATION_MT_URL'),
+                        help="machine-translation endpoint for strings with no known translation "
+                             "(default: $LOCALIZATION_MT_URL)")
+    parser.add_argument('--translation-db', type=Path, default=None,
+                        help="shared SQLite translation store "
+                             "(default: $LOCALIZATION_TRANSLATION_DB or ~/.cache/localization)")
+    parser.add_argument('--no-translation-db', action='store_true',
+                        help="do not read or record translations in the shared store")
+    parser.add_argument('--jobs', '-j', type=int, default=None,
+                        help="worker processes for translation lookups (default: one per CPU)")
+    parser.add_argument('--format', choices=FORMATS, default='text',
+                        help="output format; json and ndjson keep progress messages on stderr")
+    args = parser.parse_args()
+    
     # File path
     file_path = Path(__file__).parent / "Localizable.xcstrings"
+    fix_catalog_file(file_path, args)
+
+def fix_catalog_file(file_path: Path, args):
+    """Run the fix and, for --format json/ndjson, write its records to stdout."""
+    with progress_to_stderr(args.format):
+        initial_analysis, final_analysis, changeset, saved = run_fix(file_path, args)
+    if args.format == 'text':
+        return
     
+    record = fix_record(file_path, initial_analysis, final_analysis, len(changeset), args.dry_run, saved)
+    if args.format == 'json':
+        record['changes'] = [change_record(file_path, operation) for operation in changeset]
+        write_json(record)
+    else:
+        write_records(change_record(file_path, operation) for operation in changeset)
+        write_records([record])
+
+def run_fix(file_path: Path, args) -> Tuple[Dict, Optional[Dict], Changeset, bool]:
+    """Fix the catalog as main's arguments ask, printing progress.
+    
+    Returns the analyses before and after (None when the fix was not
+    applied), the changeset and whether it was saved.
+    """
     if not file_path.exists():
         print(f"Error: File not found at {file_path}")
         sys.exit(1)
     
     print("Loading localization file...")
-    data = load_localizations(file_path)
-    if not data:
+    catalog = load_cached_catalog(file_path)
+    if catalog is None:
         print("Failed to load localization data")
         sys.exit(1)
     
     # Initial analysis
     print("Analyzing current state...")
-    initial_analysis = analyze_completeness(data)
+    initial_analysis = analyze_completeness(catalog)
     print(f"Current completion: {initial_analysis['completion_percentage']:.1f}%")
     print(f"Incomplete keys: {len(initial_analysis['incomplete_keys'])}")
     
     if initial_analysis['completion_percentage'] >= 100.0:
         print("✅ Localizations are already 100% complete!")
-        return
+        return initial_analysis, None, Changeset(catalog), False
     
     # Fix localizations
     print("\nFixing localizations...")
-    fixed_data = fix_localizations(data)
+    memory = load_memory_for([catalog])
+    store = None if args.no_translation_db else open_store(args.translation_db)
+    if store is not None:
+        store.import_memory(memory)
+    provider = HTTPTranslationProvider(args.mt_url) if args.mt_url else None
+    changeset = fix_localizations(catalog, initial_analysis, memory, provider, store, args.jobs)
     
-    # Verify fix
+    if args.dry_run:
+        if args.format == 'text':
+            print("\nPatch (dry run, nothing saved):")
+            print(changeset.format_patch())
+        return initial_analysis, None, changeset, False
+    
+    # Verify fix: the catalog's counters follow every applied cell, so no new pass is needed
     print("\nVerifying fixes...")
-    final_analysis = analyze_completeness(fixed_data)
+    changeset.apply_to_catalog()
+    final_analysis = catalog.completeness().summary()
     print(f"New completion percentage: {final_analysis['completion_percentage']:.1f}%")
-    print(f"Remaining incomplete keys: {len(final_analysis['incomplete_keys'])}")
+    print(f"Remaining incomplete keys: {final_analysis['incomplete_count']}")
     
+    saved = False
     if final_analysis['completion_percentage'] > initial_analysis['completion_percentage']:
         # Save the fixed file
-        if save_fixed_file(fixed_data, file_path):
+        saved = changeset.save(file_path)
+        if saved:
             print("\n✅ Localizations have been fixed!")
             print(f"Completion improved from {initial_analysis['completion_percentage']:.1f}% to {final_analysis['completion_percentage']:.1f}%")
             
@@ -312,14 +456,17 @@ def main():
     else:
         print("No improvement made.")
         
-        # Show remaining issues
-        if final_analysis['incomplete_keys']:
+        # Show remaining issues; only this path needs the key lists again
+        if final_analysis['incomplete_count']:
+            remaining = analyze_completeness(catalog)
             print("\nRemaining incomplete keys:")
-            for key in final_analysis['incomplete_keys'][:5]:
-                missing = final_analysis['missing_languages'].get(key, [])
+            for key in remaining['incomplete_keys'][:5]:
+                missing = remaining['missing_languages'].get(key, [])
                 print(f"  '{key[:50]}{'...' if len(key) > 50 else ''}' -> Missing: {', '.join(missing)}")
-            if len(final_analysis['incomplete_keys']) > 5:
-                print(f"  ... and {len(final_analysis['incomplete_keys']) - 5} more")
+            if len(remaining['incomplete_keys']) > 5:
+                print(f"  ... and {len(remaining['incomplete_keys']) - 5} more")
+    
+    return initial_analysis, final_analysis, changeset, saved
 
 if __name__ == "__main__":
     main()
\ No newline at end of file
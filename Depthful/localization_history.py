@@ -0,0 +1,326 @@
+#!/usr/bin/env python3
+"""
+Localization Completion History
+Walks the git history of a catalog and charts completion per language
+over time. Results are memoized per catalog blob hash, so commits that
+leave the catalog unchanged cost nothing and reruns only analyze new blobs
+"""
+
+import argparse
+import csv
+import html
+import json
+import marshal
+import os
+import sys
+import time
+from pathlib import Path
+from typing import Dict, List, NamedTuple, Optional
+
+from localization_cache import default_cache_dir
+from localization_catalog import EXPECTED_LANGUAGES, Catalog, analyze_completeness
+from localization_diff import GitError, run_git
+from localization_report import SCHEMA_VERSION, write_json
+
+HISTORY_CACHE_NAME = "history.cache"
+# Bump whenever the stored result of a blob changes shape or meaning
+HISTORY_CACHE_FORMAT = 1
+
+# Below this many unseen blobs the analysis runs in-process
+PARALLEL_MIN_BLOBS = 4
+
+HISTORY_FORMATS = ('text', 'csv', 'json')
+
+CHART_WIDTH = 960
+CHART_HEIGHT = 420
+CHART_MARGIN = 48
+CHART_COLORS = ('#1f77b4', '#ff7f0e', '#2ca02c', '#d62728', '#9467bd',
+                '#8c564b', '#e377c2', '#7f7f7f', '#bcbd22', '#17becf')
+
+
+class HistoryPoint(NamedTuple):
+    """One first-parent commit and the catalog blob it contains (None if absent)."""
+    commit: str
+    timestamp: int
+    subject: str
+    blob: Optional[str]
+
+
+def _git_lines(arguments: List[str], cwd: Path) -> List[str]:
+    result = run_git(arguments, cwd)
+    if result.returncode != 0:
+        message = result.stderr.decode('utf-8', 'replace').strip()
+        raise GitError(message or f"git {arguments[0]} failed")
+    return result.stdout.decode('utf-8', 'replace').splitlines()
+
+
+def catalog_history(file_path: Path, ref: str = 'HEAD') -> List[HistoryPoint]:
+    """Every first-parent commit up to ref, oldest first, with the catalog's blob.
+
+    Two git calls cover the whole history: one lists the commits, the other
+    lists only the commits that changed the catalog with their new blob,
+    which the commits in between inherit.
+    """
+    directory = file_path.resolve().parent
+    commits = _git_lines(['log', '--first-parent', '--reverse', '--format=%H%x00%ct%x00%s', ref], directory)
+    # -m shows merges' changes against their first parent
+    changes = _git_lines(['log', '--first-parent', '-m', '--raw', '--no-abbrev', '--no-renames',
+                          '--format=%H', ref, '--', file_path.name], directory)
+    blobs = {}
+    commit = None
+    for line in changes:
+        if line.startswith(':'):
+            # :old_mode new_mode old_blob new_blob status\tpath
+            new_blob = line.split('\t', 1)[0].split()[3]
+            blobs[commit] = None if not new_blob.strip('0') else new_blob
+        elif line:
+            commit = line
+
+    history = []
+    blob = None
+    for line in commits:
+        commit, timestamp, subject = line.split('\x00', 2)
+        blob = blobs.get(commit, blob)
+        history.append(HistoryPoint(commit, int(timestamp), subject, blob))
+    return history
+
+
+def history_cache_path(file_path: Path, cache_dir: Optional[Path] = None) -> Path:
+    return (cache_dir or default_cache_dir(file_path)) / HISTORY_CACHE_NAME
+
+
+def read_history_cache(path: Path) -> Dict[str, Dict]:
+    """Stored results by blob hash, or an empty dict if the cache is unusable."""
+    try:
+        with open(path, 'rb') as f:
+            cache = marshal.load(f)
+    except (OSError, EOFError, ValueError, TypeError):
+        return {}
+    if (not isinstance(cache, dict) or cache.get('format') != HISTORY_CACHE_FORMAT
+            or cache.get('languages') != sorted(EXPECTED_LANGUAGES)):
+        return {}
+    return cache['results']
+
+
+def write_history_cache(path: Path, results: Dict[str, Dict]):
+    tmp_path = path.with_name(f"{path.name}.{os.getpid()}.tmp")
+    try:
+        path.parent.mkdir(parents=True, exist_ok=True)
+        with open(tmp_path, 'wb') as f:
+            marshal.dump({'format': HISTORY_CACHE_FORMAT, 'languages': sorted(EXPECTED_LANGUAGES),
+                          'results': results}, f)
+        os.replace(tmp_path, path)
+    except OSError:
+        try:
+            tmp_path.unlink()
+        except OSError:
+            pass
+
+
+def analyze_blob(directory: str, blob: str) -> Dict:
+    """Completion figures of one catalog blob; unreadable blobs yield an error entry."""
+    result = run_git(['cat-file', 'blob', blob], Path(directory))
+    if result.returncode != 0:
+        return {'error': result.stderr.decode('utf-8', 'replace').strip()}
+    try:
+        catalog = Catalog.from_data(json.loads(result.stdout))
+    except (ValueError, AttributeError) as e:
+        return {'error': f"Invalid catalog: {e}"}
+    analysis = analyze_completeness(catalog, EXPECTED_LANGUAGES)
+    translatable = analysis['total_keys'] - analysis['should_not_translate']
+    return {
+        'total_keys': analysis['total_keys'],
+        'translatable_keys': translatable,
+        'complete_keys': analysis['complete_keys'],
+        'completion_percentage': analysis['completion_percentage'],
+        'true_completion_percentage': analysis['true_completion_percentage'],
+        'language_completion': {lang: (count / translatable) * 100 if translatable else 0.0
+                                for lang, count in analysis['language_coverage'].items()},
+    }
+
+
+def analyze_blobs(directory: Path, blobs: List[str], jobs: Optional[int] = None) -> Dict[str, Dict]:
+    """Analyze blobs in-process, or over a process pool when there are enough of them."""
+    jobs = min(jobs or os.cpu_count() or 1, len(blobs))
+    if jobs > 1 and len(blobs) >= PARALLEL_MIN_BLOBS:
+        from concurrent.futures import ProcessPoolExecutor
+        with ProcessPoolExecutor(max_workers=jobs) as pool:
+            return dict(zip(blobs, pool.map(analyze_blob, [str(directory)] * len(blobs), blobs)))
+    return {blob: analyze_blob(str(directory), blob) for blob in blobs}
+
+
+def completion_history(file_path: Path, ref: str = 'HEAD', jobs: Optional[int] = None,
+                       use_cache: bool = True, cache_dir: Optional[Path] = None) -> List[Dict]:
+    """One row per commit that contains the catalog, oldest first.
+
+    Only blobs missing from the persistent cache are read and analyzed.
+    """
+    history = catalog_history(file_path, ref)
+    cache_path = history_cache_path(file_path, cache_dir)
+    results = read_history_cache(cache_path) if use_cache else {}
+    unseen = list(dict.fromkeys(point.blob for point in history
+                                if point.blob is not None and point.blob not in results))
+    if unseen:
+        print(f"Analyzing {len(unseen)} catalog version(s) "
+              f"({len(results)} cached) across {len(history)} commits...", file=sys.stderr)
+        results.update(analyze_blobs(file_path.resolve().parent, unseen, jobs))
+        if use_cache:
+            write_history_cache(cache_path, results)
+
+    rows = []
+    for point in history:
+        if point.blob is None or 'error' in results[point.blob]:
+            continue
+        rows.append({
+            'commit': point.commit,
+            'timestamp': point.timestamp,
+            'date': time.strftime('%Y-%m-%dT%H:%M:%SZ', time.gmtime(point.timestamp)),
+            'subject': point.subject,
+            'blob': point.blob,
+            **results[point.blob],
+        })
+    return rows
+
+
+def write_csv(rows: List[Dict], stream=None):
+    """One line per commit with overall and per-language completion percentages."""
+    languages = sorted(EXPECTED_LANGUAGES)
+    writer = csv.writer(stream or sys.stdout, lineterminator='\n')
+    writer.writerow(['commit', 'date', 'blob', 'total_keys', 'translatable_keys', 'complete_keys',
+                     'completion_percentage', 'true_completion_percentage', *languages])
+    for row in rows:
+        completion = row['language_completion']
+        writer.writerow([row['commit'], row['date'], row['blob'], row['total_keys'],
+                         row['translatable_keys'], row['complete_keys'],
+                         f"{row['completion_percentage']:.2f}", f"{row['true_completion_percentage']:.2f}",
+                         *(f"{completion.get(lang, 0.0):.2f}" for lang in languages)])
+
+
+def history_document(file_path: Path, rows: List[Dict]) -> Dict:
+    """The time series as one JSON document."""
+    return {
+        'schema': SCHEMA_VERSION,
+        'type': 'history',
+        'path': str(file_path),
+        'points': rows,
+    }
+
+
+def print_history(rows: List[Dict]):
+    """Print the commits where the catalog changed, with overall completion."""
+    print("LOCALIZATION COMPLETION HISTORY")
+    print("=" * 60)
+    blob = None
+    for row in rows:
+        if row['blob'] == blob:
+            continue
+        blob = row['blob']
+        print(f"{row['date'][:10]}  {row['commit'][:10]}  {row['completion_percentage']:6.1f}%  "
+              f"{row['total_keys']:>6} keys  {row['subject'][:40]}")
+    print("=" * 60)
+    if rows:
+        print(f"{len(rows)} commits, {len({row['blob'] for row in rows})} catalog versions")
+
+
+def render_chart(rows: List[Dict], title: str) -> str:
+    """A self-contained HTML page with an SVG line chart of completion per language."""
+    languages = sorted(EXPECTED_LANGUAGES)
+    left, top = CHART_MARGIN, CHART_MARGIN // 2
+    plot_width = CHART_WIDTH - CHART_MARGIN - left
+    plot_height = CHART_HEIGHT - CHART_MARGIN - top
+    if rows:
+        first, last = rows[0]['timestamp'], rows[-1]['timestamp']
+    else:
+        first = last = 0
+    span = max(last - first, 1)
+
+    def x(row):
+        return left + (row['timestamp'] - first) / span * plot_width
+
+    def y(percentage):
+        return top + (100 - percentage) / 100 * plot_height
+
+    def polyline(values, color, width):
+        points = ' '.join(f"{x(row):.1f},{y(value):.1f}" for row, value in zip(rows, values))
+        return (f'<polyline fill="none" stroke="{color}" stroke-width="{width}" '
+                f'stroke-linejoin="round" points="{points}"/>')
+
+    parts = [f'<svg xmlns="http://www.w3.org/2000/svg" width="{CHART_WIDTH}" height="{CHART_HEIGHT}" '
+             f'font-family="-apple-system, Helvetica, sans-serif" font-size="11">']
+    for percentage in range(0, 101, 20):
+        parts.append(f'<line x1="{left}" x2="{left + plot_width}" y1="{y(percentage):.1f}" '
+                     f'y2="{y(percentage):.1f}" stroke="#ddd"/>')
+        parts.append(f'<text x="{left - 6}" y="{y(percentage) + 4:.1f}" text-anchor="end">{percentage}%</text>')
+    if rows:
+        for row, anchor in ((rows[0], 'start'), (rows[-1], 'end')):
+            parts.append(f'<text x="{x(row):.1f}" y="{top + plot_height + 16}" '
+                         f'text-anchor="{anchor}">{row["date"][:10]}</text>')
+        for lang, color in zip(languages, CHART_COLORS * (len(languages) // len(CHART_COLORS) + 1)):
+            parts.append(polyline([row['language_completion'].get(lang, 0.0) for row in rows], color, 1.5))
+        parts.append(polyline([row['completion_percentage'] for row in rows], '#000', 3))
+        for row in rows:
+            tooltip = html.escape(f"{row['date'][:10]} {row['commit'][:10]} "
+                                  f"{row['completion_percentage']:.1f}% {row['subject']}")
+            parts.append(f'<circle cx="{x(row):.1f}" cy="{y(row["completion_percentage"]):.1f}" r="2.5">'
+                         f'<title>{tooltip}</title></circle>')
+    parts.append('</svg>')
+
+    legend = ['<li><span style="background:#000"></span>all languages (complete keys)</li>']
+    legend += [f'<li><span style="background:{color}"></span>{html.escape(lang)}</li>'
+               for lang, color in zip(languages, CHART_COLORS * (len(languages) // len(CHART_COLORS) + 1))]
+    latest = (f"{rows[-1]['completion_percentage']:.1f}% complete at {rows[-1]['commit'][:10]} "
+              f"({rows[-1]['date'][:10]}), {len(rows)} commits") if rows else "No commits contain the catalog"
+    return f"""<!DOCTYPE html>
+<html lang="en">
+<head>
+<meta charset="utf-8">
+<title>{html.escape(title)}</title>
+<style>
+body {{ font-family: -apple-system, Helvetica, sans-serif; margin: 24px; color: #222; }}
+ul {{ list-style: none; padding: 0; display: flex; flex-wrap: wrap; gap: 4px 16px; }}
+li span {{ display: inline-block; width: 12px; height: 12px; margin-right: 4px; vertical-align: middle; }}
+</style>
+</head>
+<body>
+<h1>{html.escape(title)}</h1>
+<p>{html.escape(latest)}</p>
+{''.join(parts)}
+<ul>{''.join(legend)}</ul>
+</body>
+</html>
+"""
+
+
+def main(argv=None):
+    """Main function."""
+    parser = argparse.ArgumentParser(description="Chart localization completion across the git history of a catalog")
+    parser.add_argument('catalog', nargs='?', type=Path, default=Path(__file__).parent / "Localizable.xcstrings",
+                        help="catalog file (default: Localizable.xcstrings next to this script)")
+    parser.add_argument('--ref', default='HEAD', help="last commit to include (default: HEAD)")
+    parser.add_argument('--format', choices=HISTORY_FORMATS, default='text',
+                        help="time series written to stdout")
+    parser.add_argument('--html', type=Path, default=None, help="also write a static HTML chart to this file")
+    parser.add_argument('--jobs', '-j', type=int, default=None, help="worker processes for analysis")
+    parser.add_argument('--no-cache', action='store_true', help="ignore and do not update the per-blob cache")
+    args = parser.parse_args(argv)
+
+    try:
+        rows = completion_history(args.catalog, args.ref, args.jobs, use_cache=not args.no_cache)
+    except GitError as e:
+        print(f"Error: {e}", file=sys.stderr)
+        sys.exit(2)
+
+    if args.format == 'csv':
+        write_csv(rows)
+    elif args.format == 'json':
+        write_json(history_document(args.catalog, rows))
+    else:
+        print_history(rows)
+
+    if args.html is not None:
+        args.html.write_text(render_chart(rows, f"Localization completion: {args.catalog.name}"), encoding='utf-8')
+        print(f"Chart written to {args.html}", file=sys.stderr)
+
+
+if __name__ == "__main__":
+    main()
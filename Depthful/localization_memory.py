@@ -0,0 +1,301 @@
+#!/usr/bin/env python3
+"""
+Translation Memory
+Indexes the human translations already in a catalog by normalized English
+source so the fixers can reuse them for missing cells: exact matches in
+O(1), near-variants through a character-trigram inverted index
+"""
+
+import marshal
+import math
+import os
+import re
+import unicodedata
+from collections import Counter
+from pathlib import Path
+from typing import Dict, Iterable, List, NamedTuple, Optional
+
+from localization_cache import default_cache_dir
+from localization_catalog import STATE_TRANSLATED, Catalog
+
+MEMORY_FILE_NAME = "translation_memory.tm"
+MEMORY_FORMAT = 2
+
+# Minimum trigram Dice similarity for a fuzzy match to be used at all
+FUZZY_THRESHOLD = 0.75
+FUZZY_LIMIT = 5
+
+# Rare trigrams a fuzzy candidate must share with the query to be verified
+PREFIX_SHARED_GRAMS = 4
+
+_WHITESPACE_RE = re.compile(r'\s+')
+
+
+class FuzzyMatch(NamedTuple):
+    """A near-variant source with its translation and similarity in (0, 1]."""
+    score: float
+    source: str
+    target: str
+
+
+def normalize_source(text: str) -> str:
+    """Canonical form used as the exact-match key: NFC, trimmed, single spaces."""
+    return _WHITESPACE_RE.sub(' ', unicodedata.normalize('NFC', text)).strip()
+
+
+def trigrams(text: str) -> frozenset:
+    """Character trigrams of a normalized source, case-folded and space-padded."""
+    padded = f"  {text.casefold()} "
+    return frozenset(padded[i:i + 3] for i in range(len(padded) - 2))
+
+
+class TrigramIndex:
+    """Inverted index from character trigram to the sources containing it.
+
+    Lookups use prefix filtering: a source reaching the Dice threshold must
+    share at least one of the query's rarest trigrams, so only those posting
+    lists are scanned and each surviving candidate is verified exactly. The
+    cost depends on the rare trigrams of the query, not on the memory size.
+    """
+
+    def __init__(self):
+        self.sources: List[str] = []
+        self.grams: List[frozenset] = []
+        self.postings: Dict[str, List[int]] = {}
+
+    def add(self, source: str):
+        grams = trigrams(source)
+        source_id = len(self.sources)
+        self.sources.append(source)
+        self.grams.append(grams)
+        postings = self.postings
+        for gram in grams:
+            ids = postings.get(gram)
+            if ids is None:
+                postings[gram] = [source_id]
+            else:
+                ids.append(source_id)
+
+    def search(self, text: str, threshold: float = FUZZY_THRESHOLD):
+        """Yield (score, source) for every indexed source with Dice >= threshold."""
+        query = trigrams(text)
+        size = len(query)
+        if not size:
+            return
+        # Dice >= t needs an overlap of at least t*|q|/(2-t) and bounds |s|
+        min_overlap = max(1, math.ceil(threshold * size / (2 - threshold)))
+        max_size = (2 - threshold) * size / threshold
+        postings = self.postings
+        rarest = sorted(query, key=lambda gram: len(postings.get(gram, ())))
+        # Any match shares at least `required` of the first size-min_overlap+required
+        # rarest trigrams; requiring a few shared grams prunes far more
+        # candidates than it costs in extra postings scanned
+        required = min(PREFIX_SHARED_GRAMS, min_overlap)
+        counts = Counter()
+        for gram in rarest[:size - min_overlap + required]:
+            ids = postings.get(gram)
+            if ids:
+                counts.update(ids)
+        candidates = [source_id for source_id, count in counts.items() if count >= required]
+
+        grams = self.grams
+        sources = self.sources
+        for source_id in candidates:
+            other = grams[source_id]
+            other_size = len(other)
+            if other_size < min_overlap or other_size > max_size:
+                continue
+            score = 2 * len(query & other) / (size + other_size)
+            if score >= threshold:
+                yield score, sources[source_id]
+
+
+class TranslationMemory:
+    """Index from normalized English source to per-language targets, with exact
+    and fuzzy lookup.
+
+    Each catalog's translations are kept apart and replaced as a whole when
+    the catalog is ingested again, so a corrected or deleted translation
+    leaves the memory with it instead of being proposed forever.
+    """
+
+    def __init__(self):
+        # normalized source -> {language: translation}, merged from every catalog
+        self.entries: Dict[str, Dict[str, str]] = {}
+        # catalog name -> {normalized source: {language: translation}} it contributed
+        self.catalogs: Dict[str, Dict[str, Dict[str, str]]] = {}
+        # catalog path -> (mtime_ns, size) it was last ingested at
+        self.origins: Dict[str, tuple] = {}
+        # Built on the first fuzzy lookup, then kept in step with new sources
+        self._index: Optional[TrigramIndex] = None
+
+    def __len__(self) -> int:
+        return len(self.entries)
+
+    def add(self, source: str, language: str, target: str):
+        """Record a translation that belongs to no catalog; catalogs take precedence."""
+        normalized = normalize_source(source)
+        self.catalogs.setdefault('', {}).setdefault(normalized, {}).setdefault(language, target)
+        self._targets(normalized).setdefault(language, target)
+
+    def _targets(self, normalized: str) -> Dict[str, str]:
+        targets = self.entries.get(normalized)
+        if targets is None:
+            targets = self.entries[normalized] = {}
+            if self._index is not None:
+                self._index.add(normalized)
+        return targets
+
+    def _rebuild(self):
+        """Merge the catalogs' translations into entries; later catalogs win."""
+        entries: Dict[str, Dict[str, str]] = {}
+        for contribution in self.catalogs.values():
+            for normalized, targets in contribution.items():
+                merged = entries.get(normalized)
+                if merged is None:
+                    entries[normalized] = dict(targets)
+                else:
+                    merged.update(targets)
+        self.entries = entries
+        self._index = None
+
+    def lookup(self, source: str, language: str) -> Optional[str]:
+        """Exact-match translation of source into language, if known."""
+        targets = self.entries.get(normalize_source(source))
+        if targets is None:
+            return None
+        return targets.get(language)
+
+    def fuzzy_lookup(self, source: str, language: str, limit: int = FUZZY_LIMIT,
+                     threshold: float = FUZZY_THRESHOLD) -> List[FuzzyMatch]:
+        """Best near-variant translations of source into language, highest score first.
+
+        The exact source itself is excluded; use lookup for that.
+        """
+        if self._index is None:
+            self._index = TrigramIndex()
+            for normalized in self.entries:
+                self._index.add(normalized)
+        normalized = normalize_source(source)
+        matches = []
+        for score, candidate in self._index.search(normalized, threshold):
+            if candidate == normalized:
+                continue
+            target = self.entries[candidate].get(language)
+            if target is not None:
+                matches.append(FuzzyMatch(score, candidate, target))
+        matches.sort(key=lambda match: (-match.score, match.source))
+        return matches[:limit]
+
+    def add_catalog(self, catalog: Catalog,
+                    source_language: Optional[str] = None) -> int:
+        """Ingest every translated, non-copied cell of a catalog; returns cells added.
+
+        A catalog ingested before has its previous translations replaced, and
+        its current values take precedence over other catalogs'.
+        """
+        source_language = source_language or catalog.source_language
+        width = catalog.width
+        source_column = catalog.language_index.get(source_language)
+        columns = [(lang, col) for lang, col in catalog.language_index.items()
+                   if lang != source_language]
+        states = catalog.states
+        values = catalog.values
+        contribution: Dict[str, Dict[str, str]] = {}
+        added = 0
+        for row, key in enumerate(catalog.keys):
+            if not catalog.should_translate[row]:
+                continue
+            base = row * width
+            source = values[base + source_column] if source_column is not None else None
+            if source is None:
+                source = key
+            if not source:
+                continue
+            targets = None
+            for lang, col in columns:
+                cell = base + col
+                target = values[cell]
+                # Copies of the source are placeholders, not translations
+                if states[cell] == STATE_TRANSLATED and target and target != source:
+                    if targets is None:
+                        targets = contribution.setdefault(normalize_source(source), {})
+                    if lang not in targets:
+                        targets[lang] = target
+                        added += 1
+
+        name = str(catalog.path) if catalog.path is not None else f'<catalog {len(self.catalogs)}>'
+        # Re-inserting moves the catalog last, so its values win in _rebuild
+        self.catalogs.pop(name, None)
+        self.catalogs[name] = contribution
+        self._rebuild()
+        return added
+
+    def update_from_catalog(self, catalog: Catalog) -> bool:
+        """Re-ingest a catalog only if its file changed since it was last ingested."""
+        origin = None
+        if catalog.path is not None:
+            try:
+                stat = os.stat(catalog.path)
+                origin = (stat.st_mtime_ns, stat.st_size)
+            except OSError:
+                pass
+            if origin is not None and self.origins.get(str(catalog.path)) == origin:
+                return False
+        self.add_catalog(catalog)
+        if origin is not None:
+            self.origins[str(catalog.path)] = origin
+        return True
+
+
+def memory_path(catalog_path: Path, cache_dir: Optional[Path] = None) -> Path:
+    return (cache_dir or default_cache_dir(catalog_path)) / MEMORY_FILE_NAME
+
+
+def load_memory(path: Path) -> TranslationMemory:
+    """Load a persisted translation memory, or an empty one."""
+    memory = TranslationMemory()
+    try:
+        with open(path, 'rb') as f:
+            stored = marshal.load(f)
+    except (OSError, EOFError, ValueError, TypeError):
+        return memory
+    if isinstance(stored, dict) and stored.get('format') == MEMORY_FORMAT:
+        memory.entries = stored['entries']
+        memory.catalogs = stored['catalogs']
+        memory.origins = stored['origins']
+    return memory
+
+
+def save_memory(memory: TranslationMemory, path: Path) -> bool:
+    """Persist a translation memory atomically."""
+    tmp_path = path.with_name(f"{path.name}.{os.getpid()}.tmp")
+    try:
+        path.parent.mkdir(parents=True, exist_ok=True)
+        with open(tmp_path, 'wb') as f:
+            marshal.dump({'format': MEMORY_FORMAT, 'entries': memory.entries,
+                          'catalogs': memory.catalogs, 'origins': memory.origins}, f)
+        os.replace(tmp_path, path)
+        return True
+    except OSError:
+        try:
+            tmp_path.unlink()
+        except OSError:
+            pass
+        return False
+
+
+def load_memory_for(catalogs: Iterable[Catalog], cache_dir: Optional[Path] = None) -> TranslationMemory:
+    """Load the memory stored next to the first catalog and bring it up to date with all of them."""
+    catalogs = list(catalogs)
+    if not catalogs or catalogs[0].path is None:
+        memory = TranslationMemory()
+        for catalog in catalogs:
+            memory.add_catalog(catalog)
+        return memory
+    path = memory_path(catalogs[0].path, cache_dir)
+    memory = load_memory(path)
+    changed = [memory.update_from_catalog(catalog) for catalog in catalogs]
+    if any(changed):
+        save_memory(memory, path)
+    return memory
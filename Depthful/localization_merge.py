@@ -0,0 +1,304 @@
+#!/usr/bin/env python3
+"""
+Semantic Catalog Merge Driver
+Three-way merges .xcstrings files key by key and language by language for
+git, so branches that touch different keys, cells or fields of a cell never
+conflict; only a value changed differently on both sides is reported
+"""
+
+import argparse
+import json
+import subprocess
+import sys
+from pathlib import Path
+from typing import Dict, List, NamedTuple, Optional, Tuple
+
+from localization_report import FORMATS, conflict_record, write_json, write_records
+from localization_writer import atomic_write, format_xcstrings, splice_entries, xcode_sort_key
+
+DRIVER_NAME = 'xcstrings'
+ATTRIBUTES_LINE = f'*.xcstrings merge={DRIVER_NAME}'
+
+
+class Conflict(NamedTuple):
+    """A value changed differently on both sides; the merge kept `resolved`.
+
+    field is 'entry' for a whole key, 'localization' for one language cell
+    or a dotted path inside it such as 'stringUnit.value' (then language is
+    set), or the name of an entry or catalog field.
+    """
+    key: Optional[str]
+    field: str
+    language: Optional[str]
+    base: object
+    ours: object
+    theirs: object
+    resolved: object
+
+
+def merge_value(base, ours, theirs) -> Tuple[object, bool]:
+    """Three-way merge of one value, None meaning absent; returns (value, conflicted).
+
+    A side that left the value as it was in base takes the other side's
+    change. On a conflict ours wins, except that an edit wins over a deletion
+    so no translation is silently lost.
+    """
+    if ours == theirs:
+        return ours, False
+    if base == ours:
+        return theirs, False
+    if base == theirs:
+        return ours, False
+    return (ours if ours is not None else theirs), True
+
+
+def merge_cell(key: str, language: str, base, ours, theirs, conflicts: List[Conflict],
+               field: str = 'localization'):
+    """Merge one localization cell, descending into objects changed on both sides.
+
+    A stringUnit whose state changed on one side and value on the other
+    merges cleanly; only a field changed differently on both sides, such as
+    'stringUnit.value', is reported as a conflict.
+    """
+    merged, conflicted = merge_value(base, ours, theirs)
+    if not conflicted:
+        return merged
+    if not (isinstance(ours, dict) and isinstance(theirs, dict) and isinstance(base, (dict, type(None)))):
+        conflicts.append(Conflict(key, field, language, base, ours, theirs, merged))
+        return merged
+
+    # Added on both sides is merged like an edit of an empty object
+    base = base or {}
+    merged = {}
+    for name in sorted(base.keys() | ours.keys() | theirs.keys()):
+        value = merge_cell(key, language, base.get(name), ours.get(name), theirs.get(name), conflicts,
+                           name if field == 'localization' else f'{field}.{name}')
+        if value is not None:
+            merged[name] = value
+    return merged
+
+
+def merge_entry(key: str, base: Optional[Dict], ours: Optional[Dict], theirs: Optional[Dict],
+                conflicts: List[Conflict]) -> Optional[Dict]:
+    """Merge one key's entry field by field, and its localizations language by language."""
+    if base is None or ours is None or theirs is None:
+        # Added on both sides is merged like an edit of an empty entry; a
+        # deletion against an edit keeps the edited entry
+        if ours is None or theirs is None:
+            merged, conflicted = merge_value(base, ours, theirs)
+            if conflicted:
+                conflicts.append(Conflict(key, 'entry', None, base, ours, theirs, merged))
+            return merged
+        base = {}
+
+    merged = {}
+    for field in sorted(base.keys() | ours.keys() | theirs.keys()):
+        if field == 'localizations':
+            continue
+        value, conflicted = merge_value(base.get(field), ours.get(field), theirs.get(field))
+        if conflicted:
+            conflicts.append(Conflict(key, field, None, base.get(field), ours.get(field),
+                                      theirs.get(field), value))
+        if value is not None:
+            merged[field] = value
+
+    base_cells = base.get('localizations', {})
+    our_cells = ours.get('localizations', {})
+    their_cells = theirs.get('localizations', {})
+    cells = {}
+    for language in sorted(base_cells.keys() | our_cells.keys() | their_cells.keys()):
+        cell = merge_cell(key, language, base_cells.get(language), our_cells.get(language),
+                          their_cells.get(language), conflicts)
+        if cell is not None:
+            cells[language] = cell
+    if cells or ('localizations' in ours and 'localizations' in theirs):
+        merged['localizations'] = cells
+    return merged
+
+
+def merge_catalogs(base: Dict, ours: Dict, theirs: Dict) -> Tuple[Dict, Dict[str, Optional[Dict]], List[Conflict]]:
+    """Three-way merge of decoded catalogs.
+
+    Returns the merged catalog, the keys whose merged entry differs from
+    ours (None for a removed key) and the conflicts. Each entry is compared
+    once per side, so the merge is linear in the size of the catalogs;
+    only keys changed on both sides are merged field by field.
+    """
+    conflicts: List[Conflict] = []
+    merged = {}
+    for field in sorted(base.keys() | ours.keys() | theirs.keys()):
+        if field == 'strings':
+            continue
+        value, conflicted = merge_value(base.get(field), ours.get(field), theirs.get(field))
+        if conflicted:
+            conflicts.append(Conflict(None, field, None, base.get(field), ours.get(field),
+                                      theirs.get(field), value))
+        if value is not None:
+            merged[field] = value
+
+    base_strings = base.get('strings', {})
+    our_strings = ours.get('strings', {})
+    their_strings = theirs.get('strings', {})
+    changes: Dict[str, Optional[Dict]] = {}
+    for key, their_entry in their_strings.items():
+        our_entry = our_strings.get(key)
+        if their_entry == our_entry:
+            continue
+        base_entry = base_strings.get(key)
+        if base_entry == their_entry:
+            continue
+        if base_entry == our_entry:
+            changes[key] = their_entry
+            continue
+        entry = merge_entry(key, base_entry, our_entry, their_entry, conflicts)
+        if entry != our_entry:
+            changes[key] = entry
+    # Keys theirs removed
+    for key, base_entry in base_strings.items():
+        if key in their_strings or key not in our_strings:
+            continue
+        our_entry = our_strings[key]
+        if our_entry == base_entry:
+            changes[key] = None
+        else:
+            merge_entry(key, base_entry, our_entry, None, conflicts)
+
+    strings = {key: entry for key, entry in our_strings.items() if changes.get(key, entry) is not None}
+    strings.update((key, entry) for key, entry in changes.items() if entry is not None)
+    merged['strings'] = strings
+    return merged, changes, conflicts
+
+
+def render_merge(our_content: bytes, merged: Dict, changes: Dict[str, Optional[Dict]],
+                 header_changed: bool) -> bytes:
+    """Encode the merge result in Xcode's format.
+
+    Only the entries that differ from ours are spliced into our file, so
+    the result diffs cleanly against it; a catalog that is not in Xcode's
+    layout, or whose header changed, is rewritten whole with keys in
+    Xcode's order. A spliced result that does not decode back to the merge
+    is also rewritten whole rather than written out corrupted.
+    """
+    if not header_changed:
+        if not changes:
+            return our_content
+        spliced = splice_entries(our_content, changes)
+        if spliced is not None:
+            try:
+                if json.loads(spliced) == merged:
+                    return spliced
+            except ValueError:
+                pass
+    strings = merged.get('strings', {})
+    ordered = dict(sorted(strings.items(), key=lambda item: xcode_sort_key(item[0])))
+    return format_xcstrings({**merged, 'strings': ordered}).encode('utf-8')
+
+
+def merge_files(base_path: Path, ours_path: Path,
+                theirs_path: Path) -> Tuple[bytes, Dict[str, Optional[Dict]], List[Conflict]]:
+    """Merge three catalog files; returns the merged bytes, the changes made to ours and conflicts."""
+    our_content = ours_path.read_bytes()
+    # An empty base means the file was added on both branches
+    base_content = base_path.read_bytes()
+    base = json.loads(base_content) if base_content.strip() else {}
+    ours = json.loads(our_content)
+    theirs = json.loads(theirs_path.read_bytes())
+
+    merged, changes, conflicts = merge_catalogs(base, ours, theirs)
+    header = {field: value for field, value in merged.items() if field != 'strings'}
+    header_changed = header != {field: value for field, value in ours.items() if field != 'strings'}
+    return render_merge(our_content, merged, changes, header_changed), changes, conflicts
+
+
+def print_conflicts(path: str, conflicts: List[Conflict]):
+    """Describe each conflict the way git describes conflicting files."""
+    for conflict in conflicts:
+        where = repr(conflict.key) if conflict.key is not None else 'catalog'
+        if conflict.language is not None:
+            where += f" [{conflict.language}]"
+            if conflict.field != 'localization':
+                where += f" ({conflict.field})"
+        elif conflict.field != 'entry':
+            where += f" ({conflict.field})"
+        print(f"CONFLICT ({DRIVER_NAME}): {where} changed on both sides in {path}; kept "
+              f"{'ours' if conflict.resolved == conflict.ours else 'theirs'}")
+
+
+def install_driver(directory: Path) -> bool:
+    """Register the driver in the repository's git config and .gitattributes."""
+    toplevel = subprocess.run(['git', 'rev-parse', '--show-toplevel'], cwd=directory,
+                              capture_output=True, text=True)
+    if toplevel.returncode != 0:
+        print(f"Error: {directory} is not inside a git repository", file=sys.stderr)
+        return False
+    root = Path(toplevel.stdout.strip())
+    # git runs drivers from the top of the work tree, so a relative path works in every clone
+    script = Path(__file__).resolve().relative_to(root.resolve()).as_posix()
+    for name, value in (('name', "Semantic .xcstrings merge"),
+                        ('driver', f'python3 "{script}" %O %A %B %P')):
+        subprocess.run(['git', 'config', f'merge.{DRIVER_NAME}.{name}', value], cwd=root, check=True)
+
+    attributes = root / '.gitattributes'
+    lines = attributes.read_text(encoding='utf-8').splitlines() if attributes.exists() else []
+    if ATTRIBUTES_LINE not in lines:
+        with open(attributes, 'a', encoding='utf-8') as f:
+            if lines and not attributes.read_text(encoding='utf-8').endswith('\n'):
+                f.write('\n')
+            f.write(ATTRIBUTES_LINE + '\n')
+        print(f"Added '{ATTRIBUTES_LINE}' to {attributes}")
+    print(f"Registered merge driver '{DRIVER_NAME}' for {root}")
+    return True
+
+
+def run_merge(base_path: Path, ours_path: Path, theirs_path: Path,
+              path: Optional[str] = None, output_format: str = 'text') -> int:
+    """Merge theirs into ours in place, as git expects of a merge driver.
+
+    Returns 0 for a clean merge, 1 when conflicts were resolved in favour of
+    one side (git then marks the file as conflicted) and 2 when a version
+    could not be read, in which case ours is left untouched.
+    """
+    path = path or str(ours_path)
+    try:
+        content, changes, conflicts = merge_files(base_path, ours_path, theirs_path)
+    except (OSError, ValueError) as e:
+        print(f"Error: cannot merge {path}: {e}", file=sys.stderr)
+        return 2
+    atomic_write(content, ours_path)
+    removed = sum(entry is None for entry in changes.values())
+    taken = len(changes) - removed
+
+    records = [conflict_record(path, conflict) for conflict in conflicts]
+    if output_format == 'json':
+        write_json({'path': path, 'merged_keys': taken, 'removed_keys': removed, 'conflicts': records})
+    elif output_format == 'ndjson':
+        write_records(records)
+    else:
+        print_conflicts(path, conflicts)
+        print(f"Merged {path}: {taken} key(s) from theirs, {removed} removed, {len(conflicts)} conflict(s)")
+    return 1 if conflicts else 0
+
+
+def main(argv=None):
+    """Main function."""
+    parser = argparse.ArgumentParser(description="Three-way merge driver for .xcstrings catalogs. "
+                                                 "git calls it as: localization_merge.py %O %A %B %P")
+    parser.add_argument('base', nargs='?', type=Path, help="common ancestor version (%%O)")
+    parser.add_argument('ours', nargs='?', type=Path, help="current version, overwritten with the result (%%A)")
+    parser.add_argument('theirs', nargs='?', type=Path, help="other branch's version (%%B)")
+    parser.add_argument('path', nargs='?', default=None, help="path of the file in the repository (%%P)")
+    parser.add_argument('--format', choices=FORMATS, default='text',
+                        help="how conflicts are reported on stdout")
+    parser.add_argument('--install', action='store_true',
+                        help="register this driver for *.xcstrings in the current repository")
+    args = parser.parse_args(argv)
+
+    if args.install:
+        sys.exit(0 if install_driver(Path.cwd()) else 2)
+    if args.theirs is None:
+        parser.error("base, ours and theirs are required")
+    sys.exit(run_merge(args.base, args.ours, args.theirs, args.path, args.format))
+
+
+if __name__ == "__main__":
+    main()
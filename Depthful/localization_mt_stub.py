@@ -0,0 +1,94 @@
+#!/usr/bin/env python3
+"""
+Machine Translation Stub Server
+Local stand-in for a translation backend speaking the JSON protocol of
+HTTPTranslationProvider; it tags each text with its target language and
+can inject failures to exercise retries
+"""
+
+import argparse
+import json
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Tuple
+
+
+class StubTranslationServer(ThreadingHTTPServer):
+    """Translates "text" into "[de] text"; the first fail_first requests get a 503."""
+    daemon_threads = True
+
+    def __init__(self, address: Tuple[str, int], fail_first: int = 0):
+        super().__init__(address, StubTranslationHandler)
+        self.fail_first = fail_first
+        self.requests = []
+        self.lock = threading.Lock()
+
+    @property
+    def url(self) -> str:
+        host, port = self.server_address[:2]
+        return f"http://{host}:{port}/translate"
+
+
+class StubTranslationHandler(BaseHTTPRequestHandler):
+    server: StubTranslationServer
+
+    def do_POST(self):
+        length = int(self.headers.get('Content-Length') or 0)
+        try:
+            payload = json.loads(self.rfile.read(length))
+            target = payload['target']
+            texts = payload['texts']
+        except (ValueError, KeyError, TypeError):
+            self._respond(400, {'error': 'expected {"source", "target", "texts"}'})
+            return
+
+        with self.server.lock:
+            self.server.requests.append((target, len(texts)))
+            failing = self.server.fail_first > 0
+            if failing:
+                self.server.fail_first -= 1
+        if failing:
+            self._respond(503, {'error': 'injected failure'})
+            return
+        self._respond(200, {'translations': [f"[{target}] {text}" for text in texts]})
+
+    def _respond(self, status: int, body: dict):
+        data = json.dumps(body, ensure_ascii=False).encode('utf-8')
+        self.send_response(status)
+        self.send_header('Content-Type', 'application/json; charset=utf-8')
+        self.send_header('Content-Length', str(len(data)))
+        self.end_headers()
+        self.wfile.write(data)
+
+    def log_message(self, format, *args):
+        pass
+
+
+def start_stub_server(host: str = '127.0.0.1', port: int = 0,
+                      fail_first: int = 0) -> StubTranslationServer:
+    """Start a stub server on a background thread; port 0 picks a free port."""
+    server = StubTranslationServer((host, port), fail_first=fail_first)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Run a local machine-translation stub server")
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--port', type=int, default=8765)
+    parser.add_argument('--fail-first', type=int, default=0,
+                        help="answer the first N requests with HTTP 503")
+    args = parser.parse_args()
+
+    server = StubTranslationServer((args.host, args.port), fail_first=args.fail_first)
+    print(f"Stub translation server listening on {server.url}")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+
+
+if __name__ == "__main__":
+    main()
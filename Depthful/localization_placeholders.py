@@ -0,0 +1,78 @@
+#!/usr/bin/env python3
+"""
+Format Placeholder Parity
+Parses printf-style specifiers (including positional %1$@ forms) so every
+localization can be checked against its source: String(format:) crashes
+or garbles output when a translation drops, adds or retypes an argument
+"""
+
+import re
+from typing import List, Optional, Tuple
+
+# %[position$][flags][width][.precision][length]conversion, or a literal %%
+_SPECIFIER_RE = re.compile(r"""
+    %(?:
+        (?P<literal>%)
+      | (?:(?P<position>[1-9][0-9]*)\$)?
+        [-+ #0']*
+        (?:[0-9]+|\*)?
+        (?:\.(?:[0-9]+|\*))?
+        (?P<length>hh|h|ll|l|q|L|z|t|j)?
+        (?P<conversion>[@dDiuUxXoOfFeEgGaAcCsSp])
+    )
+""", re.VERBOSE)
+
+# Spellings that format the same argument type
+_LENGTH_ALIASES = {'q': 'll', 'l': 'll'}
+_CONVERSION_ALIASES = {'i': 'd', 'D': 'd', 'U': 'u', 'O': 'o'}
+
+Signature = Tuple[Tuple[int, str], ...]
+
+
+def format_signature(text: str) -> Signature:
+    """(argument position, normalized type) for each specifier, ordered by position.
+
+    Sequential specifiers are numbered from 1 as printf consumes them, so
+    "%@ %lld" and "%2$lld %1$@" have the same signature.
+    """
+    arguments = []
+    next_position = 1
+    for match in _SPECIFIER_RE.finditer(text):
+        if match.group('literal'):
+            continue
+        position = match.group('position')
+        if position is None:
+            position = next_position
+            next_position += 1
+        else:
+            position = int(position)
+        length = match.group('length') or ''
+        conversion = match.group('conversion')
+        arguments.append((position, _LENGTH_ALIASES.get(length, length)
+                          + _CONVERSION_ALIASES.get(conversion, conversion)))
+    arguments.sort()
+    return tuple(arguments)
+
+
+def describe_signature(signature: Signature) -> str:
+    """Readable form of a signature, e.g. '%1$@ %2$lld'."""
+    return ' '.join(f"%{position}${conversion}" for position, conversion in signature) or '(none)'
+
+
+def mismatched_cells(source: str, values: List[Optional[str]]) -> List[int]:
+    """Indexes of the values whose format arguments differ from source's; None is skipped."""
+    raw_source = _SPECIFIER_RE.findall(source) if '%' in source else []
+    signature = None
+    mismatched = []
+    for i, value in enumerate(values):
+        if value is None:
+            continue
+        raw_value = _SPECIFIER_RE.findall(value) if '%' in value else []
+        # Identical specifiers in identical order, the common case, need no normalizing
+        if raw_value == raw_source:
+            continue
+        if signature is None:
+            signature = format_signature(source)
+        if format_signature(value) != signature:
+            mismatched.append(i)
+    return mismatched
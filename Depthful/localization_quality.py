@@ -0,0 +1,120 @@
+#!/usr/bin/env python3
+"""
+Translation Quality Checks
+Finds cells that are not really translated: copies of the source text and
+values written in the wrong script for their locale. Each check runs over
+a whole language column at once with C-level primitives and returns a
+packed per-key bit mask, like the completeness columns
+"""
+
+import functools
+import operator
+import re
+from typing import Dict, List, Optional, Sequence, Tuple
+
+# Codepoint ranges of the script each locale is expected to be written in
+SCRIPT_RANGES: Dict[str, Tuple[Tuple[int, int], ...]] = {
+    'ar': ((0x0600, 0x06FF), (0x0750, 0x077F), (0x08A0, 0x08FF),
+           (0xFB50, 0xFDFF), (0xFE70, 0xFEFF)),
+    'hi': ((0x0900, 0x097F), (0xA8E0, 0xA8FF)),
+    'ko': ((0x1100, 0x11FF), (0x3130, 0x318F), (0xA960, 0xA97F),
+           (0xAC00, 0xD7AF), (0xD7B0, 0xD7FF)),
+    'ja': ((0x3040, 0x309F), (0x30A0, 0x30FF), (0x31F0, 0x31FF), (0xFF66, 0xFF9F),
+           (0x3400, 0x4DBF), (0x4E00, 0x9FFF), (0xF900, 0xFAFF)),
+    'zh-Hans': ((0x3400, 0x4DBF), (0x4E00, 0x9FFF), (0xF900, 0xFAFF),
+                (0x20000, 0x2A6DF)),
+}
+
+# Cells are joined with this separator so a column is scanned as one string
+_SEPARATOR = '\x00'
+
+
+def _character_class(ranges: Sequence[Tuple[int, int]]) -> str:
+    return ''.join(f'\\U{start:08x}-\\U{end:08x}' for start, end in ranges)
+
+
+def _segment_pattern(forbidden: str, required: str) -> 're.Pattern':
+    """Match a whole separator-delimited segment that contains a `required`
+    character and no `forbidden` one.
+
+    Every match starts at a literal separator, which lets the regex engine
+    jump between segments. The lookahead's class excludes `required`, so a
+    segment is scanned at most twice and never retried at every split.
+    `forbidden` appears once: compiling a class of large codepoint ranges
+    walks every codepoint in Python, about a millisecond for CJK.
+    """
+    return re.compile(
+        f'{_SEPARATOR}(?=[^{_SEPARATOR}{required}]*[{required}])[^{_SEPARATOR}{forbidden}]*'
+        f'(?={_SEPARATOR})')
+
+
+# Compiled on first use: the codepoint classes take milliseconds to compile,
+# which every tool importing the catalog would otherwise pay at startup
+@functools.lru_cache(maxsize=None)
+def _wrong_script_pattern(language: str) -> Optional['re.Pattern']:
+    """A value written in the wrong script has Latin letters and no character
+    of the locale's own script; values without letters (numbers, symbols) pass."""
+    ranges = SCRIPT_RANGES.get(language)
+    if ranges is None:
+        return None
+    return _segment_pattern(_character_class(ranges), 'A-Za-z')
+
+
+@functools.lru_cache(maxsize=None)
+def _no_letters_pattern() -> 're.Pattern':
+    """Sources with no letters at all ("2025.12.1", "•") are legitimately copied."""
+    # The alternatives are disjoint single characters, so a segment has one
+    # way to match and a failed one is given back a character at a time
+    return re.compile(f'{_SEPARATOR}(?:[^\\w{_SEPARATOR}]|[\\d_])*(?={_SEPARATOR})')
+
+
+def _bits_from_rows(rows: List[int], count: int) -> int:
+    flags = bytearray(count)
+    for row in rows:
+        flags[row] = 1
+    return int.from_bytes(flags, 'big')
+
+
+def _matching_segments(pattern: 're.Pattern', texts: Sequence[Optional[str]]) -> List[int]:
+    """Indexes of the texts whose whole value matches pattern.
+
+    None is scanned as the text 'None'; callers mask absent cells out.
+    """
+    joined = _SEPARATOR + _SEPARATOR.join(map(str, texts)) + _SEPARATOR
+    if joined.count(_SEPARATOR) != len(texts) + 1:
+        # A value containing the separator would shift every later row. It is
+        # neither a letter nor a word character, so a space classifies the same
+        joined = _SEPARATOR + _SEPARATOR.join(str(text).replace(_SEPARATOR, ' ') for text in texts) + _SEPARATOR
+    rows = []
+    row = 0
+    position = 0
+    for match in pattern.finditer(joined):
+        start = match.start()
+        row += joined.count(_SEPARATOR, position, start)
+        position = start
+        rows.append(row)
+    return rows
+
+
+def copy_bits(column: Sequence[Optional[str]], source: Sequence[Optional[str]]) -> int:
+    """One byte per key set where the column value equals the source value."""
+    return int.from_bytes(bytes(map(operator.eq, column, source)), 'big')
+
+
+def wrong_script_bits(language: str, column: Sequence[Optional[str]]) -> int:
+    """One byte per key set where the value is not written in the locale's script.
+
+    Locales without an entry in SCRIPT_RANGES are never flagged; absent
+    cells may be flagged and must be masked by the caller.
+    """
+    pattern = _wrong_script_pattern(language)
+    if pattern is None:
+        return 0
+    return _bits_from_rows(_matching_segments(pattern, column), len(column))
+
+
+def letter_bits(texts: Sequence[Optional[str]]) -> int:
+    """One byte per key set where the text contains at least one letter."""
+    count = len(texts)
+    no_letters = _bits_from_rows(_matching_segments(_no_letters_pattern(), texts), count)
+    return int.from_bytes(b'\x01' * count, 'big') & ~no_letters
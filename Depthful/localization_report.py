@@ -0,0 +1,200 @@
+#!/usr/bin/env python3
+"""
+Machine-Readable Reports
+Stable JSON and NDJSON records for the status, analysis and fix tools, so
+CI and dashboards read numbers instead of scraping the emoji reports
+"""
+
+from __future__ import annotations
+
+import contextlib
+import sys
+from pathlib import Path
+
+# Only for annotations: status reports should load neither typing nor the writer stack
+TYPE_CHECKING = False
+if TYPE_CHECKING:
+    from typing import Dict, Iterable, Iterator, List, Optional, TextIO
+
+    from localization_changeset import Operation
+    from localization_diff import KeyChange
+    from localization_merge import Conflict
+
+# Bump when a field is renamed, removed or changes meaning; adding fields is compatible
+SCHEMA_VERSION = 1
+
+FORMATS = ('text', 'json', 'ndjson')
+
+
+def summary_record(tool: str, file_path: Path, analysis: Dict) -> Dict:
+    """Catalog-wide counters.
+
+    true_complete_keys and true_completion_percentage are left out when the
+    analysis did not check values, as for very large catalogs that status
+    counts from a stream.
+    """
+    translatable = analysis['total_keys'] - analysis['should_not_translate']
+    record = {
+        'schema': SCHEMA_VERSION,
+        'type': 'summary',
+        'tool': tool,
+        'path': str(file_path),
+        'total_keys': analysis['total_keys'],
+        'translatable_keys': translatable,
+        'should_not_translate': analysis['should_not_translate'],
+        'complete_keys': analysis['complete_keys'],
+        'incomplete_keys': translatable - analysis['complete_keys'],
+        'completion_percentage': analysis['completion_percentage'],
+        'true_complete_keys': analysis.get('true_complete_keys'),
+        'true_completion_percentage': analysis.get('true_completion_percentage'),
+        'language_coverage': analysis['language_coverage'],
+        'state_counts': analysis['state_counts'],
+    }
+    if 'true_complete_keys' not in analysis:
+        del record['true_complete_keys'], record['true_completion_percentage']
+    return record
+
+
+def incomplete_record(file_path: Path, key: str, missing_languages: List[str]) -> Dict:
+    """One incomplete key; missing_languages is empty when only its states are incomplete."""
+    return {
+        'schema': SCHEMA_VERSION,
+        'type': 'incomplete_key',
+        'path': str(file_path),
+        'key': key,
+        'missing_languages': missing_languages,
+    }
+
+
+# Per-language findings of analyze_completeness written as finding records
+FINDING_KINDS = ('placeholder_mismatches', 'untranslated_copies', 'wrong_script')
+
+
+def finding_records(file_path: Path, analysis: Dict) -> Iterator[Dict]:
+    """One record per (kind, language, key) finding of an analysis."""
+    for kind in FINDING_KINDS:
+        for language, keys in analysis.get(kind, {}).items():
+            for key in keys:
+                yield {
+                    'schema': SCHEMA_VERSION,
+                    'type': 'finding',
+                    'kind': kind,
+                    'path': str(file_path),
+                    'key': key,
+                    'language': language,
+                }
+
+
+def change_record(file_path: Path, operation: 'Operation') -> Dict:
+    """One cell written by a fix."""
+    return {
+        'schema': SCHEMA_VERSION,
+        'type': 'change',
+        'path': str(file_path),
+        'op': operation.op,
+        'key': operation.key,
+        'language': operation.language,
+        'value': operation.value,
+        'state': operation.state,
+    }
+
+
+def fix_record(file_path: Path, before: Dict, after: Optional[Dict], change_count: int,
+               dry_run: bool, saved: bool) -> Dict:
+    """Outcome of a fix run; after is None when the fix was not verified."""
+    return {
+        'schema': SCHEMA_VERSION,
+        'type': 'fix',
+        'path': str(file_path),
+        'dry_run': dry_run,
+        'change_count': change_count,
+        'saved': saved,
+        'completion_before': before['completion_percentage'],
+        'completion_after': after['completion_percentage'] if after is not None else None,
+    }
+
+
+def diff_record(file_path: Path, change: 'KeyChange') -> Dict:
+    """One key added, changed or removed since the diff's base."""
+    return {
+        'schema': SCHEMA_VERSION,
+        'type': 'diff',
+        'path': str(file_path),
+        'key': change.key,
+        'change': change.kind,
+        'languages': list(change.languages),
+    }
+
+
+def diff_document(file_path: Path, diff: Dict) -> Dict:
+    """Changed keys plus the analysis of the added and changed ones, for --format json."""
+    document = analysis_document('diff', file_path, diff['analysis'])
+    document['base'] = diff['base']
+    document['changes'] = [diff_record(file_path, change) for change in diff['changes']]
+    return document
+
+
+def conflict_record(path: str, conflict: 'Conflict') -> Dict:
+    """One value a merge found changed differently on both sides.
+
+    key is null for catalog-level fields, language is set for a single
+    localization cell, and resolved is the value the merge kept.
+    """
+    return {
+        'schema': SCHEMA_VERSION,
+        'type': 'conflict',
+        'path': path,
+        'key': conflict.key,
+        'field': conflict.field,
+        'language': conflict.language,
+        'base': conflict.base,
+        'ours': conflict.ours,
+        'theirs': conflict.theirs,
+        'resolved': conflict.resolved,
+    }
+
+
+def analysis_document(tool: str, file_path: Path, analysis: Dict) -> Dict:
+    """Summary plus the per-key findings of a full analysis, for --format json."""
+    document = summary_record(tool, file_path, analysis)
+    document['incomplete'] = [
+        {'key': key, 'missing_languages': analysis['missing_languages'].get(key, [])}
+        for key in analysis['incomplete_keys']
+    ]
+    for kind in FINDING_KINDS:
+        document[kind] = analysis.get(kind, {})
+    return document
+
+
+def write_json(document: Dict, stream: Optional[TextIO] = None):
+    """Write one pretty-printed JSON document."""
+    # Imported here and below: a text status check never encodes JSON
+    import json
+    stream = stream or sys.stdout
+    json.dump(document, stream, ensure_ascii=False, indent=2)
+    stream.write('\n')
+
+
+def write_records(records: Iterable[Dict], stream: Optional[TextIO] = None):
+    """Write records as NDJSON, one compact object per line, as they are produced."""
+    import json
+    stream = stream or sys.stdout
+    for record in records:
+        stream.write(json.dumps(record, ensure_ascii=False, separators=(',', ':')))
+        stream.write('\n')
+
+
+def ndjson_writer(stream: Optional[TextIO] = None):
+    """Callback writing each record it receives as one NDJSON line."""
+    stream = stream or sys.stdout
+    return lambda record: write_records([record], stream)
+
+
+@contextlib.contextmanager
+def progress_to_stderr(output_format: str):
+    """Keep the tools' progress messages out of stdout when it carries JSON."""
+    if output_format == 'text':
+        yield
+        return
+    with contextlib.redirect_stdout(sys.stderr):
+        yield
@@ -0,0 +1,505 @@
+#!/usr/bin/env python3
+"""
+Swift Localization Call-Site Scanner
+Tokenizes the app's Swift sources and indexes every localization key to the
+file:line call sites that use it, so keys used in code but missing from the
+catalog (and catalog keys no longer referenced) can be reported
+"""
+
+import hashlib
+import marshal
+import os
+import re
+import sys
+from pathlib import Path
+from typing import Dict, Iterable, Iterator, List, NamedTuple, Optional, Tuple
+
+from localization_cache import CACHE_DIR_NAME, load_cached_catalog
+from localization_catalog import Catalog
+
+# SwiftUI initializers and modifiers whose first unlabeled String literal
+# argument is a LocalizedStringKey
+LOCALIZED_INITIALIZERS = {
+    'Text', 'Button', 'Label', 'Toggle', 'Section', 'TextField', 'SecureField',
+    'Picker', 'Menu', 'Link', 'NavigationLink', 'Stepper', 'DatePicker',
+    'ProgressView', 'ContentUnavailableView', 'LocalizedStringKey',
+    'navigationTitle', 'alert', 'confirmationDialog', 'help', 'accessibilityLabel',
+}
+
+# Call-site kinds
+KIND_SWIFTUI = 'swiftui'
+KIND_LOCALIZED = 'localized'
+KIND_LOCALIZED_WITH = 'localized(with:)'
+KIND_NSLOCALIZED = 'NSLocalizedString'
+KIND_STRING_LOCALIZED = 'String(localized:)'
+
+# Placeholder Xcode uses for an interpolated value of unknown type
+INTERPOLATION_PLACEHOLDER = '%@'
+
+# Files below this count are scanned in-process; a pool costs more to start
+PARALLEL_MIN_FILES = 8
+
+SKIPPED_DIRECTORIES = {'build', 'DerivedData', 'Pods', 'Carthage', '.build'}
+
+# Per-file fingerprint cache kept in the catalog cache directory
+SCAN_CACHE_NAME = "swift_scan.cache"
+SCAN_CACHE_FORMAT = 1
+
+_TOKEN_RE = re.compile(r'''
+    (?P<newline>\n)
+  | (?P<space>[ \t\r\f]+)
+  | (?P<line_comment>//[^\n]*)
+  | (?P<block_comment>/\*)
+  | (?P<string>(?P<hashes>\#*)(?P<quotes>"""|"))
+  | (?P<ident>`?[A-Za-z_][A-Za-z0-9_]*`?)
+  | (?P<number>[0-9][0-9_.a-zA-Z]*)
+  | (?P<punct>.)
+''', re.VERBOSE | re.DOTALL)
+
+_SIMPLE_ESCAPES = {'n': '\n', 't': '\t', 'r': '\r', '0': '\0', '"': '"', "'": "'", '\\': '\\'}
+
+
+class StringLiteral(NamedTuple):
+    """Decoded string literal; interpolations are replaced by a placeholder."""
+    text: str
+    interpolated: bool
+
+
+class Token(NamedTuple):
+    kind: str
+    value: object
+    line: int
+
+
+class CallSite(NamedTuple):
+    """Location of one localization call in the Swift sources."""
+    file: str
+    line: int
+    kind: str
+
+
+def _skip_interpolation(source: str, pos: int) -> int:
+    """Return the offset just past the ')' closing an interpolation opened before pos."""
+    depth = 1
+    length = len(source)
+    while pos < length:
+        char = source[pos]
+        if char == '(':
+            depth += 1
+        elif char == ')':
+            depth -= 1
+            if depth == 0:
+                return pos + 1
+        elif char == '"' or char == '#':
+            match = _TOKEN_RE.match(source, pos)
+            if match and match.lastgroup == 'string':
+                _, pos = _read_string(source, match.end(), len(match.group('hashes')),
+                                      match.group('quotes') == '"""')
+                continue
+        pos += 1
+    raise ValueError("Unterminated string interpolation")
+
+
+def _read_string(source: str, pos: int, hashes: int, multiline: bool) -> Tuple[StringLiteral, int]:
+    """Read a literal body starting after its opening delimiter.
+
+    Returns the decoded literal and the offset after the closing delimiter.
+    """
+    terminator = ('"""' if multiline else '"') + '#' * hashes
+    escape = '\\' + '#' * hashes
+    parts = []
+    interpolated = False
+    length = len(source)
+    while True:
+        if pos >= length:
+            raise ValueError("Unterminated string literal")
+        if source.startswith(terminator, pos):
+            end = pos + len(terminator)
+            break
+        if source.startswith(escape, pos):
+            pos += len(escape)
+            char = source[pos] if pos < length else ''
+            if char == '(':
+                pos = _skip_interpolation(source, pos + 1)
+                parts.append(('interpolation', ''))
+                interpolated = True
+            elif char == 'u' and source.startswith('{', pos + 1):
+                close = source.index('}', pos)
+                parts.append(('text', chr(int(source[pos + 2:close], 16))))
+                pos = close + 1
+            elif char == '\n' and multiline:
+                # Line continuation
+                parts.append(('continuation', ''))
+                pos += 1
+            else:
+                parts.append(('text', _SIMPLE_ESCAPES.get(char, char)))
+                pos += 1
+            continue
+        if not multiline and source[pos] == '\n':
+            raise ValueError("Unterminated string literal")
+        parts.append(('raw', source[pos]))
+        pos += 1
+
+    if multiline:
+        parts = _strip_multiline_indentation(parts)
+    text = ''.join(INTERPOLATION_PLACEHOLDER if kind == 'interpolation' else value
+                   for kind, value in parts)
+    return StringLiteral(text, interpolated), end
+
+
+def _strip_multiline_indentation(parts: List[Tuple[str, str]]) -> List[Tuple[str, str]]:
+    """Apply Swift's multiline rules: drop the first and last line breaks and
+    the closing delimiter's indentation from every line."""
+    raw = ''.join(value if kind == 'raw' else '\x00' for kind, value in parts)
+    last_break = raw.rfind('\n')
+    indent = len(raw) - last_break - 1 if last_break != -1 else 0
+    out = []
+    at_line_start = True
+    column = 0
+    for kind, value in parts:
+        if kind == 'continuation' or (kind == 'raw' and value == '\n'):
+            # A continuation joins the lines but still starts an indented line
+            if kind == 'raw':
+                out.append((kind, value))
+            at_line_start = True
+            column = 0
+            continue
+        if at_line_start and kind == 'raw' and value in ' \t' and column < indent:
+            column += 1
+            continue
+        at_line_start = False
+        out.append((kind, value))
+    # The body starts after the opening line break and ends before the closing line
+    while out and out[0] == ('raw', '\n'):
+        out.pop(0)
+        break
+    while out and out[-1][0] == 'raw' and out[-1][1] in ' \t':
+        out.pop()
+    if out and out[-1] == ('raw', '\n'):
+        out.pop()
+    return out
+
+
+def tokenize(source: str) -> Iterator[Token]:
+    """Yield identifier, string, number and punctuation tokens with line numbers."""
+    pos = 0
+    line = 1
+    length = len(source)
+    while pos < length:
+        match = _TOKEN_RE.match(source, pos)
+        kind = match.lastgroup
+        if kind == 'newline':
+            line += 1
+            pos = match.end()
+        elif kind in ('space', 'line_comment'):
+            pos = match.end()
+        elif kind == 'block_comment':
+            depth = 1
+            pos = match.end()
+            while depth and pos < length:
+                if source.startswith('/*', pos):
+                    depth += 1
+                    pos += 2
+                elif source.startswith('*/', pos):
+                    depth -= 1
+                    pos += 2
+                else:
+                    if source[pos] == '\n':
+                        line += 1
+                    pos += 1
+        elif kind == 'string':
+            literal, end = _read_string(source, match.end(), len(match.group('hashes')),
+                                        match.group('quotes') == '"""')
+            yield Token('string', literal, line)
+            line += source.count('\n', pos, end)
+            pos = end
+        else:
+            yield Token(kind, match.group(kind), line)
+            pos = match.end()
+
+
+def extract_keys(source: str) -> List[Tuple[str, int, str, bool]]:
+    """Return (key, line, kind, interpolated) for every localization call in a Swift source."""
+    tokens = list(tokenize(source))
+    found = []
+    count = len(tokens)
+
+    def value_at(i):
+        return tokens[i].value if 0 <= i < count else None
+
+    for i, token in enumerate(tokens):
+        if token.kind != 'string':
+            continue
+        literal = token.value
+
+        # "key".localized / "key".localized(with: ...)
+        if value_at(i + 1) == '.' and value_at(i + 2) == 'localized':
+            kind = KIND_LOCALIZED
+            if value_at(i + 3) == '(' and value_at(i + 4) == 'with':
+                kind = KIND_LOCALIZED_WITH
+            found.append((literal.text, token.line, kind, literal.interpolated))
+            continue
+
+        # The literal must be a whole argument of the call
+        if value_at(i + 1) not in (',', ')'):
+            continue
+        if value_at(i - 1) == ':':
+            if value_at(i - 2) == 'localized' and value_at(i - 3) == '(' and value_at(i - 4) == 'String':
+                found.append((literal.text, token.line, KIND_STRING_LOCALIZED, literal.interpolated))
+            continue
+        if value_at(i - 1) != '(':
+            continue
+        callee = value_at(i - 2)
+        if callee == 'NSLocalizedString':
+            found.append((literal.text, token.line, KIND_NSLOCALIZED, literal.interpolated))
+        elif callee in LOCALIZED_INITIALIZERS:
+            found.append((literal.text, token.line, KIND_SWIFTUI, literal.interpolated))
+    return found
+
+
+def scan_content(content: bytes, name: str = '<source>') -> List[Tuple[str, int, str, bool]]:
+    """Extract localization calls from raw Swift source bytes; undecodable sources yield nothing."""
+    try:
+        return extract_keys(content.decode('utf-8'))
+    except (UnicodeDecodeError, ValueError) as e:
+        print(f"Warning: could not scan {name}: {e}", file=sys.stderr)
+        return []
+
+
+def scan_file(file_path: Path) -> List[Tuple[str, int, str, bool]]:
+    """Extract localization calls from one Swift file; unreadable files yield nothing."""
+    try:
+        content = Path(file_path).read_bytes()
+    except OSError as e:
+        print(f"Warning: could not scan {file_path}: {e}", file=sys.stderr)
+        return []
+    return scan_content(content, str(file_path))
+
+
+def find_swift_files(root: Path) -> List[Path]:
+    """All .swift files below root, skipping build output and hidden directories."""
+    files = []
+    for directory, subdirectories, filenames in os.walk(root):
+        subdirectories[:] = sorted(name for name in subdirectories
+                                   if not name.startswith('.') and name not in SKIPPED_DIRECTORIES)
+        files.extend(Path(directory) / name for name in sorted(filenames) if name.endswith('.swift'))
+    return files
+
+
+class UsageIndex:
+    """Map of localization key -> call sites across a set of Swift files."""
+
+    def __init__(self, root: Optional[Path] = None):
+        self.root = root
+        self.sites: Dict[str, List[CallSite]] = {}
+        self.interpolated = set()
+        # Files whose fingerprint changed and were read / distinct contents actually parsed
+        self.scanned_files = 0
+        self.parsed_files = 0
+
+    def add(self, key: str, site: CallSite, interpolated: bool = False):
+        self.sites.setdefault(key, []).append(site)
+        if interpolated:
+            self.interpolated.add(key)
+
+    def add_file_results(self, file_path: Path, results: Iterable[Tuple[str, int, str, bool]]):
+        name = str(file_path.relative_to(self.root)) if self.root else str(file_path)
+        for key, line, kind, interpolated in results:
+            self.add(key, CallSite(name, line, kind), interpolated)
+
+    def __len__(self) -> int:
+        return len(self.sites)
+
+    def __contains__(self, key: str) -> bool:
+        return key in self.sites
+
+
+def scan_cache_path(root: Path, cache_dir: Optional[Path] = None) -> Path:
+    return (cache_dir or root / CACHE_DIR_NAME) / SCAN_CACHE_NAME
+
+
+def _read_scan_cache(path: Path) -> Dict:
+    try:
+        with open(path, 'rb') as f:
+            cache = marshal.load(f)
+    except (OSError, EOFError, ValueError, TypeError):
+        return {}
+    if not isinstance(cache, dict) or cache.get('format') != SCAN_CACHE_FORMAT:
+        return {}
+    return cache
+
+
+def _write_scan_cache(path: Path, cache: Dict):
+    tmp_path = path.with_name(f"{path.name}.{os.getpid()}.tmp")
+    try:
+        path.parent.mkdir(parents=True, exist_ok=True)
+        with open(tmp_path, 'wb') as f:
+            marshal.dump(cache, f)
+        os.replace(tmp_path, path)
+    except OSError:
+        try:
+            tmp_path.unlink()
+        except OSError:
+            pass
+
+
+def _scan_contents(contents: List[bytes], names: List[str], jobs: int) -> List[List[Tuple[str, int, str, bool]]]:
+    """Scan sources in-process, or over a process pool when there are enough of them."""
+    if jobs > 1 and len(contents) >= PARALLEL_MIN_FILES:
+        from concurrent.futures import ProcessPoolExecutor
+        with ProcessPoolExecutor(max_workers=jobs) as pool:
+            return list(pool.map(scan_content, contents, names,
+                                 chunksize=max(1, len(contents) // (jobs * 4))))
+    return [scan_content(content, name) for content, name in zip(contents, names)]
+
+
+def scan_sources(root: Path, files: Optional[List[Path]] = None,
+                 jobs: Optional[int] = None, use_cache: bool = True,
+                 cache_dir: Optional[Path] = None) -> UsageIndex:
+    """Scan Swift sources into a usage index.
+
+    A per-file (mtime, size, hash) fingerprint cache means only files whose
+    fingerprint changed are read; results are stored per content hash, so
+    byte-identical copies of a file are scanned once.
+    """
+    if files is None:
+        files = find_swift_files(root)
+    index = UsageIndex(root)
+    jobs = jobs or os.cpu_count() or 1
+
+    cache_path = scan_cache_path(root, cache_dir)
+    cache = _read_scan_cache(cache_path) if use_cache else {}
+    fingerprints = cache.get('files', {})
+    results = cache.get('results', {})
+
+    new_fingerprints = {}
+    digests = {}
+    pending = {}
+    for file_path in files:
+        name = str(file_path)
+        try:
+            stat = os.stat(file_path)
+        except OSError as e:
+            print(f"Warning: could not scan {file_path}: {e}", file=sys.stderr)
+            continue
+        cached = fingerprints.get(name)
+        if cached and cached[0] == stat.st_mtime_ns and cached[1] == stat.st_size and cached[2] in results:
+            digest = cached[2]
+        else:
+            try:
+                content = Path(file_path).read_bytes()
+            except OSError as e:
+                print(f"Warning: could not scan {file_path}: {e}", file=sys.stderr)
+                continue
+            digest = hashlib.blake2b(content, digest_size=16).hexdigest()
+            if digest not in results:
+                pending.setdefault(digest, (content, name))
+            index.scanned_files += 1
+        new_fingerprints[name] = (stat.st_mtime_ns, stat.st_size, digest)
+        digests[file_path] = digest
+
+    if pending:
+        pending_digests = list(pending)
+        scanned = _scan_contents([pending[d][0] for d in pending_digests],
+                                 [pending[d][1] for d in pending_digests], jobs)
+        results.update(zip(pending_digests, scanned))
+        index.parsed_files = len(pending_digests)
+
+    for file_path, digest in digests.items():
+        index.add_file_results(file_path, results[digest])
+
+    if use_cache and (pending or new_fingerprints != fingerprints):
+        live = set(digests.values())
+        _write_scan_cache(cache_path, {
+            'format': SCAN_CACHE_FORMAT,
+            'files': new_fingerprints,
+            'results': {digest: found for digest, found in results.items() if digest in live},
+        })
+    return index
+
+
+def _interpolation_pattern(key: str) -> re.Pattern:
+    """Regex matching catalog keys Xcode would generate for an interpolated literal."""
+    specifier = r'%(?:\d+\$)?[-+ #0]*\d*(?:\.\d+)?(?:hh|h|ll|l|q|z|t|j)?[@dDiuUxXoOfFeEgGcCsSpaA]'
+    return re.compile(specifier.join(re.escape(part) for part in key.split(INTERPOLATION_PLACEHOLDER)))
+
+
+def compare_with_catalog(index: UsageIndex, catalog: Catalog) -> Dict:
+    """Cross-reference code usage with catalog keys."""
+    catalog_keys = set(catalog.keys)
+    referenced = set()
+    missing_from_catalog = []
+
+    for key in index.sites:
+        if key in catalog_keys:
+            referenced.add(key)
+            continue
+        # Pure interpolations such as Text("\(count)") have nothing to translate
+        if not any(char.isalpha() for char in key.replace(INTERPOLATION_PLACEHOLDER, '')):
+            continue
+        if key in index.interpolated:
+            pattern = _interpolation_pattern(key)
+            matches = {candidate for candidate in catalog_keys if pattern.fullmatch(candidate)}
+            if matches:
+                referenced.update(matches)
+                continue
+        missing_from_catalog.append(key)
+
+    unreferenced = [key for key in catalog.keys
+                    if key and key not in referenced and catalog.translatable(key)]
+    return {
+        'used_keys': len(index),
+        'missing_from_catalog': sorted(missing_from_catalog),
+        'unreferenced_keys': unreferenced,
+    }
+
+
+def print_usage_report(usage: Dict, index: UsageIndex, limit: int = 20):
+    """Print the code-usage cross reference."""
+    print("=" * 60)
+    print("CODE USAGE REPORT")
+    print("=" * 60)
+    print(f"Keys used in Swift code: {usage['used_keys']}")
+    print(f"Used in code but missing from catalog: {len(usage['missing_from_catalog'])}")
+    print(f"Catalog keys not referenced by a literal: {len(usage['unreferenced_keys'])}")
+
+    if usage['missing_from_catalog']:
+        print("\nMISSING FROM CATALOG:")
+        print("-" * 40)
+        for key in usage['missing_from_catalog'][:limit]:
+            sites = ', '.join(f"{site.file}:{site.line}" for site in index.sites[key][:3])
+            print(f"  {key[:60]!r} ({sites})")
+        if len(usage['missing_from_catalog']) > limit:
+            print(f"  ... and {len(usage['missing_from_catalog']) - limit} more keys")
+
+    if usage['unreferenced_keys']:
+        print("\nNOT REFERENCED IN CODE:")
+        print("-" * 40)
+        for key in usage['unreferenced_keys'][:limit]:
+            print(f"  {key[:60]!r}")
+        if len(usage['unreferenced_keys']) > limit:
+            print(f"  ... and {len(usage['unreferenced_keys']) - limit} more keys")
+
+
+def report_usage(root: Path, file_path: Optional[Path] = None, jobs: Optional[int] = None):
+    """Scan root and compare the keys found with the catalog, if it exists.
+
+    file_path defaults to Localizable.xcstrings in root.
+    """
+    file_path = file_path or root / "Localizable.xcstrings"
+    print(f"Scanning Swift sources in {root}...")
+    index = scan_sources(root, jobs=jobs)
+    print(f"Rescanned {index.scanned_files} changed file(s), parsed {index.parsed_files} new source(s)")
+    catalog = load_cached_catalog(file_path) if file_path.exists() else None
+    if catalog is None:
+        print(f"Found {len(index)} localization keys in code")
+        return
+    print_usage_report(compare_with_catalog(index, catalog), index)
+
+
+def main():
+    """Main function."""
+    report_usage(Path(sys.argv[1]) if len(sys.argv) > 1 else Path(__file__).parent)
+
+if __name__ == "__main__":
+    main()
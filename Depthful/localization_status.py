@@ -4,44 +4,93 @@ Quick Localization Status Checker for Afternoon App
 Shows current localization completion status
 """
 
-import json
+from __future__ import annotations
+
+import sys
 from pathlib import Path
 
-def check_localization_status():
-    """Check and display localization status."""
-    file_path = Path(__file__).parent / "Localizable.xcstrings"
+from localization_cache import load_cached_catalog
+from localization_catalog import EXPECTED_LANGUAGES, analyze_completeness
+from localization_report import (
+    FORMATS,
+    incomplete_record,
+    ndjson_writer,
+    progress_to_stderr,
+    summary_record,
+    write_json,
+)
+
+# Annotations only, as in localization_catalog
+TYPE_CHECKING = False
+if TYPE_CHECKING:
+    from typing import Callable, Dict, Iterable, List, Optional
+
+# Catalogs larger than this are streamed instead of parsed into a Catalog
+STREAMING_THRESHOLD_BYTES = 64 << 20
+
+def check_localization_status(output_format: str = 'text', file_path: Optional[Path] = None,
+                              true_completion: bool = False) -> bool:
+    """Check and display localization status; False if the catalog could not be read.
     
-    if not file_path.exists():
-        print("❌ Localizable.xcstrings file not found")
-        return
+    true_completion also checks every value for copies of the source and
+    text in the wrong script, which costs more than the rest of the check.
+    """
+    file_path = file_path or Path(__file__).parent / "Localizable.xcstrings"
     
-    try:
-        with open(file_path, 'r', encoding='utf-8') as f:
-            data = json.load(f)
-    except Exception as e:
-        print(f"❌ Error loading file: {e}")
-        return
+    # Records go to the real stdout even while progress is sent to stderr
+    emit = ndjson_writer()
+    on_incomplete = None
+    if output_format == 'ndjson':
+        def on_incomplete(key, missing_languages):
+            emit(incomplete_record(file_path, key, missing_languages))
     
-    strings = data.get('strings', {})
-    expected_languages = {'ar', 'de', 'es', 'fr', 'hi', 'ja', 'ko', 'pt', 'zh-Hans', 'en'}
+    with progress_to_stderr(output_format):
+        analysis = load_status(file_path, EXPECTED_LANGUAGES, on_incomplete, true_completion)
+    if analysis is None:
+        return False
     
-    total_keys = len(strings)
-    should_not_translate = 0
-    complete_keys = 0
+    if output_format == 'text':
+        print_status(analysis, EXPECTED_LANGUAGES)
+    elif output_format == 'json':
+        write_json(summary_record('status', file_path, analysis))
+    else:
+        emit(summary_record('status', file_path, analysis))
+    return True
+
+def load_status(file_path: Path, expected_languages: Iterable[str],
+                on_incomplete: Optional[Callable[[str, List[str]], None]] = None,
+                check_values: bool = False) -> Optional[Dict]:
+    """Completeness counters for the catalog, or None after reporting an error.
     
-    for key, value in strings.items():
-        if value.get('shouldTranslate') == False:
-            should_not_translate += 1
-            continue
-        
-        localizations = value.get('localizations', {})
-        available_languages = set(localizations.keys())
-        
-        if expected_languages.issubset(available_languages):
-            complete_keys += 1
+    on_incomplete receives each incomplete key as the catalog is analyzed.
+    check_values adds the true completion fields; streamed catalogs never
+    have them.
+    """
+    if not file_path.exists():
+        print(f"❌ {file_path} not found")
+        return None
     
-    translatable_keys = total_keys - should_not_translate
-    completion_percentage = (complete_keys / translatable_keys * 100) if translatable_keys > 0 else 0
+    # Very large merged catalogs are counted from a stream in bounded memory
+    if file_path.stat().st_size > STREAMING_THRESHOLD_BYTES:
+        from localization_stream import stream_completeness
+        try:
+            return stream_completeness(file_path, expected_languages, on_incomplete)
+        except (OSError, ValueError) as e:
+            print(f"❌ Error loading file: {e}")
+            return None
+    catalog = load_cached_catalog(file_path)
+    if catalog is None:
+        print("❌ Failed to load localization data")
+        return None
+    return analyze_completeness(catalog, expected_languages, on_incomplete=on_incomplete,
+                                check_values=check_values)
+
+def print_status(analysis: Dict, expected_languages: Iterable[str]):
+    """Print the human-readable status report."""
+    total_keys = analysis['total_keys']
+    translatable_keys = total_keys - analysis['should_not_translate']
+    complete_keys = analysis['complete_keys']
+    completion_percentage = analysis['completion_percentage']
     
     print("📱 Afternoon App - Localization Status")
     print("=" * 40)
@@ -49,6 +98,10 @@ def check_localization_status():
     print(f"Translatable: {translatable_keys}")
     print(f"Complete: {complete_keys}")
     print(f"Completion: {completion_percentage:.1f}%")
+    # Only present when asked for, and never for a streamed catalog
+    if 'true_completion_percentage' in analysis:
+        print(f"True completion: {analysis['true_completion_percentage']:.1f}% "
+              f"(excluding copies of the source and wrong-script values)")
     print()
     
     if completion_percentage >= 100.0:
@@ -61,7 +114,7 @@ def check_localization_status():
         print("🔴 Needs work. Run localization_fixer.py to improve.")
     
     print()
-    print("Supported languages:")
+    print("Language coverage:")
     for lang_code in sorted(expected_languages):
         lang_names = {
             'ar': '🇸🇦 Arabic',
@@ -75,7 +128,27 @@ def check_localization_status():
             'zh-Hans': '🇨🇳 Chinese (Simplified)',
             'en': '🇺🇸 English'
         }
-        print(f"  {lang_names.get(lang_code, lang_code)}")
+        covered = analysis['language_coverage'].get(lang_code, 0)
+        percentage = (covered / translatable_keys) * 100 if translatable_keys else 0.0
+        print(f"  {lang_names.get(lang_code, lang_code)}: {percentage:.1f}% ({covered}/{translatable_keys})")
+
+def main(argv=None):
+    """Main function."""
+    # Imported here: callers of check_localization_status do not need them
+    import argparse
+    from localization import HelpFormatter
+    
+    parser = argparse.ArgumentParser(description="Show localization completion status",
+                                     formatter_class=HelpFormatter)
+    parser.add_argument('catalog', nargs='?', type=Path, default=None,
+                        help="catalog file (default: Localizable.xcstrings next to this script)")
+    parser.add_argument('--format', choices=FORMATS, default='text',
+                        help="output format; json and ndjson keep progress messages on stderr")
+    parser.add_argument('--true-completion', action='store_true',
+                        help="also count copies of the source and wrong-script values as incomplete")
+    args = parser.parse_args(argv)
+    if not check_localization_status(args.format, args.catalog, args.true_completion):
+        sys.exit(1)
 
 if __name__ == "__main__":
-    check_localization_status()
\ No newline at end of file
+    main()
\ No newline at end of file
@@ -0,0 +1,193 @@
+#!/usr/bin/env python3
+"""
+Shared Translation Store
+SQLite database of translation decisions keyed by normalized source,
+language and provider, shared by every catalog, branch and sibling app on
+the machine so repeated fixes only cost lookups
+"""
+
+import hashlib
+import json
+import os
+import sqlite3
+import time
+from collections import OrderedDict
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional, Tuple
+
+from localization_memory import TranslationMemory, normalize_source
+
+STORE_FILE_NAME = "translations.sqlite3"
+STORE_SCHEMA_VERSION = 1
+
+# Provider key under which human translations from catalogs are stored
+HUMAN_PROVIDER = 'catalog'
+
+LRU_CAPACITY = 8192
+
+# SQLite's default limit on bound parameters is 999 on older builds
+_LOOKUP_CHUNK = 900
+
+# Distinguishes "known to be absent" from "not cached" in the LRU
+_ABSENT = object()
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS translations (
+    source TEXT NOT NULL,
+    language TEXT NOT NULL,
+    provider TEXT NOT NULL,
+    target TEXT NOT NULL,
+    state TEXT NOT NULL,
+    updated REAL NOT NULL,
+    PRIMARY KEY (source, language, provider)
+) WITHOUT ROWID;
+CREATE TABLE IF NOT EXISTS meta (
+    name TEXT PRIMARY KEY,
+    value TEXT NOT NULL
+) WITHOUT ROWID;
+"""
+
+_UPSERT = """
+INSERT INTO translations (source, language, provider, target, state, updated)
+VALUES (?, ?, ?, ?, ?, ?)
+ON CONFLICT (source, language, provider)
+DO UPDATE SET target = excluded.target, state = excluded.state, updated = excluded.updated
+"""
+
+
+def default_store_path() -> Path:
+    """$LOCALIZATION_TRANSLATION_DB, else a per-user cache shared by every app."""
+    override = os.environ.get('LOCALIZATION_TRANSLATION_DB')
+    if override:
+        return Path(override).expanduser()
+    cache_home = os.environ.get('XDG_CACHE_HOME') or Path.home() / '.cache'
+    return Path(cache_home) / 'localization' / STORE_FILE_NAME
+
+
+class TranslationStore:
+    """SQLite translation cache with an in-memory LRU in front of it.
+
+    The database runs in WAL mode so concurrent fixers for different apps
+    can read while one of them writes. Writes are batched by put_many into
+    a single transaction.
+    """
+
+    def __init__(self, path: Path, capacity: int = LRU_CAPACITY):
+        self.path = path
+        self.capacity = capacity
+        self._lru: "OrderedDict[Tuple[str, str, str], object]" = OrderedDict()
+        path.parent.mkdir(parents=True, exist_ok=True)
+        self.connection = sqlite3.connect(str(path), timeout=30)
+        self.connection.execute('PRAGMA journal_mode=WAL')
+        self.connection.execute('PRAGMA synchronous=NORMAL')
+        with self.connection:
+            self.connection.executescript(_SCHEMA)
+            self.connection.execute(
+                'INSERT OR IGNORE INTO meta (name, value) VALUES (?, ?)',
+                ('schema_version', str(STORE_SCHEMA_VERSION)))
+
+    def close(self):
+        self.connection.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+    def _remember(self, cache_key: Tuple[str, str, str], value):
+        lru = self._lru
+        lru[cache_key] = value
+        lru.move_to_end(cache_key)
+        if len(lru) > self.capacity:
+            lru.popitem(last=False)
+
+    def get(self, source: str, language: str, provider: str) -> Optional[Tuple[str, str]]:
+        """(target, state) recorded for a source, language and provider, if any."""
+        cache_key = (normalize_source(source), language, provider)
+        value = self._lru.get(cache_key)
+        if value is not None:
+            self._lru.move_to_end(cache_key)
+            return None if value is _ABSENT else value
+        row = self.connection.execute(
+            'SELECT target, state FROM translations WHERE source = ? AND language = ? AND provider = ?',
+            cache_key).fetchone()
+        self._remember(cache_key, _ABSENT if row is None else (row[0], row[1]))
+        return None if row is None else (row[0], row[1])
+
+    def get_many(self, sources: Iterable[str], language: str,
+                 provider: str) -> Dict[str, Tuple[str, str]]:
+        """Bulk get: {source: (target, state)} for the sources that are stored."""
+        found = {}
+        missing: Dict[str, List[str]] = {}
+        for source in sources:
+            normalized = normalize_source(source)
+            value = self._lru.get((normalized, language, provider))
+            if value is None:
+                missing.setdefault(normalized, []).append(source)
+            elif value is not _ABSENT:
+                found[source] = value
+
+        normalized_sources = list(missing)
+        for start in range(0, len(normalized_sources), _LOOKUP_CHUNK):
+            chunk = normalized_sources[start:start + _LOOKUP_CHUNK]
+            placeholders = ','.join('?' * len(chunk))
+            rows = self.connection.execute(
+                f'SELECT source, target, state FROM translations '
+                f'WHERE language = ? AND provider = ? AND source IN ({placeholders})',
+                [language, provider, *chunk]).fetchall()
+            hits = {source: (target, state) for source, target, state in rows}
+            for normalized in chunk:
+                value = hits.get(normalized)
+                self._remember((normalized, language, provider), _ABSENT if value is None else value)
+                if value is not None:
+                    for source in missing[normalized]:
+                        found[source] = value
+        return found
+
+    def put(self, source: str, language: str, provider: str, target: str,
+            state: str = 'translated'):
+        self.put_many([(source, language, provider, target, state)])
+
+    def put_many(self, rows: Iterable[Tuple[str, str, str, str, str]]) -> int:
+        """Upsert (source, language, provider, target, state) rows in one transaction."""
+        now = time.time()
+        batch = []
+        for source, language, provider, target, state in rows:
+            normalized = normalize_source(source)
+            batch.append((normalized, language, provider, target, state, now))
+            self._remember((normalized, language, provider), (target, state))
+        if batch:
+            with self.connection:
+                self.connection.executemany(_UPSERT, batch)
+        return len(batch)
+
+    def import_memory(self, memory: TranslationMemory) -> int:
+        """Store a translation memory's human translations, unless they already are.
+
+        The memory's catalog origins are recorded, so an unchanged set of
+        catalogs is skipped without touching the translations table. Rows
+        are only ever upserted, never removed with their catalog, which is
+        why the fixer proposes store-only hits for review.
+        """
+        origins = json.dumps(sorted(memory.origins.items())).encode('utf-8')
+        name = f'memory:{hashlib.sha256(origins).hexdigest()}'
+        if self.connection.execute('SELECT 1 FROM meta WHERE name = ?', (name,)).fetchone():
+            return 0
+        count = self.put_many((source, language, HUMAN_PROVIDER, target, 'translated')
+                              for source, targets in memory.entries.items()
+                              for language, target in targets.items())
+        with self.connection:
+            self.connection.execute('INSERT OR REPLACE INTO meta (name, value) VALUES (?, ?)',
+                                    (name, str(time.time())))
+        return count
+
+
+def open_store(path: Optional[Path] = None) -> Optional[TranslationStore]:
+    """Open the shared store, or return None (with a message) if it is unusable."""
+    path = path or default_store_path()
+    try:
+        return TranslationStore(path)
+    except (OSError, sqlite3.Error) as e:
+        print(f"Translation store unavailable ({path}): {e}")
+        return None
@@ -0,0 +1,243 @@
+#!/usr/bin/env python3
+"""
+Streaming Localization Catalog Parser
+Walks an .xcstrings file chunk by chunk and yields one record per
+(key, language) cell without materializing the JSON tree or decoding
+translated value strings, so status checks run in bounded memory
+"""
+
+import json
+import re
+from pathlib import Path
+from typing import Callable, Dict, Iterable, Iterator, List, NamedTuple, Optional, TextIO, Tuple
+
+from localization_catalog import (
+    EXPECTED_LANGUAGES,
+    HISTOGRAM_STATES,
+    STATE_CODES,
+    STATE_MISSING,
+    STATE_OTHER,
+    STATE_VARIATIONS,
+)
+
+CHUNK_SIZE = 1 << 20
+
+_TOKEN_RE = re.compile(r'''
+    [ \t\r\n]*
+    (?:
+        (?P<string>"[^"\\]*(?:\\.[^"\\]*)*")
+      | (?P<punct>[{}\[\]:,])
+      | (?P<literal>true|false|null|-?[0-9][0-9.eE+-]*)
+    )
+''', re.VERBOSE | re.DOTALL)
+_WHITESPACE_RE = re.compile(r'[ \t\r\n]*')
+
+# Event names produced by iter_events
+START_MAP, END_MAP, START_ARRAY, END_ARRAY, KEY, STRING, LITERAL = (
+    'start_map', 'end_map', 'start_array', 'end_array', 'key', 'string', 'literal')
+
+
+class CellRecord(NamedTuple):
+    """One localization cell; language and state are None for keys with no localizations.
+
+    state is None for a localization without a stringUnit (variations) and
+    '' for a stringUnit that has no state.
+    """
+    key: str
+    should_translate: bool
+    language: Optional[str]
+    state: Optional[str]
+
+
+def _decode_string(token: str) -> str:
+    if '\\' not in token:
+        return token[1:-1]
+    return json.loads(token)
+
+
+def iter_tokens(stream: TextIO, chunk_size: int = CHUNK_SIZE) -> Iterator[Tuple[str, str]]:
+    """Yield (kind, raw token) pairs, reading the stream in fixed-size chunks.
+
+    Only a token that straddles a chunk boundary is carried over, so memory
+    is bounded by the chunk size plus the longest single string in the file.
+    """
+    buffer = ''
+    eof = False
+    match_token = _TOKEN_RE.match
+    while True:
+        if not eof:
+            chunk = stream.read(chunk_size)
+            eof = not chunk
+            buffer += chunk
+        pos = 0
+        end = len(buffer)
+        while pos < end:
+            match = match_token(buffer, pos)
+            if match is None:
+                pos = _WHITESPACE_RE.match(buffer, pos).end()
+                if pos < end and eof:
+                    raise ValueError(f"Invalid JSON near: {buffer[pos:pos + 40]!r}")
+                break
+            # A literal touching the end of the buffer may continue in the next chunk
+            if match.end() == end and match.lastgroup == 'literal' and not eof:
+                break
+            kind = match.lastgroup
+            yield kind, match.group(kind)
+            pos = match.end()
+        buffer = buffer[pos:]
+        if eof:
+            if buffer.strip():
+                raise ValueError(f"Unexpected end of file near: {buffer[:40]!r}")
+            return
+
+
+def iter_events(stream: TextIO, chunk_size: int = CHUNK_SIZE) -> Iterator[Tuple[str, str]]:
+    """Yield SAX-style (event, raw value) pairs; strings are left undecoded."""
+    # One entry per open container: True for objects, False for arrays
+    containers = []
+    expect_key = False
+    for kind, token in iter_tokens(stream, chunk_size):
+        if kind == 'string':
+            if expect_key:
+                expect_key = False
+                yield KEY, token
+            else:
+                yield STRING, token
+        elif kind == 'literal':
+            yield LITERAL, token
+        elif token == ',':
+            expect_key = containers[-1]
+        elif token == ':':
+            continue
+        elif token == '{':
+            containers.append(True)
+            expect_key = True
+            yield START_MAP, token
+        elif token == '[':
+            containers.append(False)
+            yield START_ARRAY, token
+        else:
+            containers.pop()
+            yield (END_MAP if token == '}' else END_ARRAY), token
+
+
+def iter_cells(file_path: Path, chunk_size: int = CHUNK_SIZE) -> Iterator[CellRecord]:
+    """Yield a CellRecord per localization of every key in an .xcstrings file.
+
+    Xcode writes shouldTranslate after localizations, so the cells of one key
+    are held back until its object closes; nothing else is retained.
+    """
+    with open(file_path, 'r', encoding='utf-8') as f:
+        yield from _walk_catalog(iter_events(f, chunk_size))
+
+
+def _walk_catalog(events: Iterable[Tuple[str, str]]) -> Iterator[CellRecord]:
+    # Keys of the open containers; the root object and arrays contribute None
+    path = []
+    pending_key = None
+    key = None
+    should_translate = True
+    cells: Dict[str, Optional[str]] = {}
+
+    for event, token in events:
+        depth = len(path)
+        if event == KEY:
+            pending_key = _decode_string(token)
+            if depth == 2 and path[1] == 'strings':
+                key = pending_key
+                should_translate = True
+                cells = {}
+            elif depth == 4 and path[3] == 'localizations' and path[1] == 'strings':
+                cells[pending_key] = None
+            continue
+
+        if event == START_MAP or event == START_ARRAY:
+            if (depth == 5 and pending_key == 'stringUnit'
+                    and path[3] == 'localizations' and path[1] == 'strings'):
+                cells[path[4]] = ''
+            path.append(pending_key)
+            pending_key = None
+            continue
+
+        if event == END_MAP or event == END_ARRAY:
+            path.pop()
+            if depth == 3 and path[1] == 'strings':
+                if cells:
+                    for language, state in cells.items():
+                        yield CellRecord(key, should_translate, language, state)
+                else:
+                    yield CellRecord(key, should_translate, None, None)
+            continue
+
+        # Scalar value for pending_key
+        if depth == 3 and pending_key == 'shouldTranslate' and path[1] == 'strings':
+            should_translate = token != 'false'
+        elif (depth == 6 and pending_key == 'state' and path[5] == 'stringUnit'
+                and path[3] == 'localizations' and path[1] == 'strings'):
+            cells[path[4]] = _decode_string(token)
+        pending_key = None
+
+
+def stream_completeness(file_path: Path,
+                        expected_languages: Iterable[str] = EXPECTED_LANGUAGES,
+                        on_incomplete: Optional[Callable[[str, List[str]], None]] = None) -> Dict:
+    """Count-only completeness analysis computed from the cell stream.
+
+    Returns the counters of analyze_completeness without the per-key lists,
+    so memory stays flat regardless of catalog size. The value strings are
+    never decoded, so the quality checks cannot run: true_complete_keys and
+    true_completion_percentage are absent, and state_counts has no
+    untranslated_copies or wrong_script columns, as in
+    CompletenessCounters.summary(). on_incomplete, if given, receives each
+    incomplete key and its missing languages.
+    """
+    expected_languages = frozenset(expected_languages)
+    analysis = {
+        'total_keys': 0,
+        'complete_keys': 0,
+        'should_not_translate': 0,
+        'completion_percentage': 0.0,
+        'language_coverage': dict.fromkeys(sorted(expected_languages), 0),
+        'state_counts': {},
+    }
+    coverage = analysis['language_coverage']
+    histograms = {lang: [0] * (STATE_OTHER + 1) for lang in coverage}
+
+    current_key = None
+    current_translatable = True
+    found = {}
+
+    def finish_key():
+        analysis['total_keys'] += 1
+        if not current_translatable:
+            analysis['should_not_translate'] += 1
+            return
+        if found.keys() >= expected_languages:
+            analysis['complete_keys'] += 1
+        elif on_incomplete is not None:
+            on_incomplete(current_key, sorted(expected_languages - found.keys()))
+        for lang in found.keys() & expected_languages:
+            coverage[lang] += 1
+            state = found[lang]
+            histograms[lang][STATE_VARIATIONS if state is None else STATE_CODES.get(state, STATE_OTHER)] += 1
+
+    for record in iter_cells(file_path):
+        if record.key != current_key:
+            if current_key is not None:
+                finish_key()
+            current_key = record.key
+            current_translatable = record.should_translate
+            found = {}
+        if record.language is not None:
+            found[record.language] = record.state
+    if current_key is not None:
+        finish_key()
+
+    translatable_keys = analysis['total_keys'] - analysis['should_not_translate']
+    if translatable_keys > 0:
+        analysis['completion_percentage'] = (analysis['complete_keys'] / translatable_keys) * 100
+    for lang, counts in histograms.items():
+        counts[STATE_MISSING] = translatable_keys - coverage[lang]
+        analysis['state_counts'][lang] = {**{name: counts[code] for name, code in HISTOGRAM_STATES},
+                                          'missing': counts[STATE_MISSING]}
+    return analysis
@@ -0,0 +1,177 @@
+#!/usr/bin/env python3
+"""
+Machine Translation Providers
+Batches every missing (source, language) cell into one request per
+language, sends the batches concurrently with bounded in-flight requests
+and retry/backoff, and records results in the shared translation store
+so reruns cost nothing
+"""
+
+import abc
+import asyncio
+import json
+import random
+import urllib.error
+import urllib.request
+from typing import Dict, Iterable, List, Optional, Tuple
+
+from localization_store import TranslationStore
+
+MAX_IN_FLIGHT = 4
+MAX_RETRIES = 3
+BACKOFF_SECONDS = 0.5
+REQUEST_TIMEOUT_SECONDS = 60
+
+# State recorded for machine output, which nobody has reviewed yet
+MACHINE_STATE = 'needs_review'
+
+# HTTP statuses worth retrying; anything else is a permanent failure
+RETRYABLE_STATUSES = frozenset({408, 425, 429, 500, 502, 503, 504})
+
+
+class TranslationError(Exception):
+    """A provider request failed; retryable errors may succeed when repeated."""
+
+    def __init__(self, message: str, retryable: bool = False):
+        super().__init__(message)
+        self.retryable = retryable
+
+
+class TranslationProvider(abc.ABC):
+    """Interface for machine-translation backends.
+
+    translate_batch receives every text for one target language at once and
+    returns the translations in the same order. name and version identify
+    cached results, so bump version whenever the backend's output changes.
+    """
+    name = 'provider'
+    version = '1'
+    # Larger batches for one language are split into several requests
+    max_batch_size = 1000
+
+    @property
+    def key(self) -> str:
+        """Provider column of the translation store."""
+        return f"{self.name}/{self.version}"
+
+    @abc.abstractmethod
+    async def translate_batch(self, texts: List[str], source_language: str,
+                              target_language: str) -> List[str]:
+        """Translations of texts into target_language, in the same order."""
+
+
+class HTTPTranslationProvider(TranslationProvider):
+    """Provider speaking a minimal JSON protocol over HTTP.
+
+    POST {"source": "en", "target": "de", "texts": [...]} to the endpoint,
+    receive {"translations": [...]}. localization_mt_stub implements it.
+    """
+    name = 'http'
+
+    def __init__(self, endpoint: str, version: str = '1',
+                 timeout: float = REQUEST_TIMEOUT_SECONDS, max_batch_size: int = 1000):
+        self.endpoint = endpoint
+        self.version = version
+        self.timeout = timeout
+        self.max_batch_size = max_batch_size
+
+    async def translate_batch(self, texts: List[str], source_language: str,
+                              target_language: str) -> List[str]:
+        payload = {'source': source_language, 'target': target_language, 'texts': texts}
+        # urllib blocks, so each request runs on the default thread pool
+        result = await asyncio.to_thread(self._post, payload)
+        translations = result.get('translations') if isinstance(result, dict) else None
+        if not isinstance(translations, list) or len(translations) != len(texts):
+            raise TranslationError(f"Malformed response for {target_language}")
+        return [str(translation) for translation in translations]
+
+    def _post(self, payload: Dict) -> Dict:
+        request = urllib.request.Request(
+            self.endpoint,
+            data=json.dumps(payload, ensure_ascii=False).encode('utf-8'),
+            headers={'Content-Type': 'application/json; charset=utf-8'},
+            method='POST')
+        try:
+            with urllib.request.urlopen(request, timeout=self.timeout) as response:
+                return json.loads(response.read())
+        except urllib.error.HTTPError as e:
+            raise TranslationError(f"HTTP {e.code} from {self.endpoint}",
+                                   retryable=e.code in RETRYABLE_STATUSES) from e
+        except (urllib.error.URLError, TimeoutError, ConnectionError) as e:
+            raise TranslationError(f"Request to {self.endpoint} failed: {e}", retryable=True) from e
+        except ValueError as e:
+            raise TranslationError(f"Invalid JSON from {self.endpoint}: {e}") from e
+
+
+async def _send_batch(provider: TranslationProvider, semaphore: asyncio.Semaphore,
+                      texts: List[str], source_language: str, target_language: str,
+                      retries: int, backoff: float) -> List[str]:
+    attempt = 0
+    while True:
+        async with semaphore:
+            try:
+                return await provider.translate_batch(texts, source_language, target_language)
+            except TranslationError as e:
+                if not e.retryable or attempt >= retries:
+                    raise
+        # Exponential backoff with jitter, outside the semaphore so the slot is free
+        await asyncio.sleep(backoff * (2 ** attempt) * (0.5 + random.random()))
+        attempt += 1
+
+
+async def translate_cells_async(provider: TranslationProvider,
+                                cells: Dict[str, Iterable[str]],
+                                source_language: str = 'en',
+                                store: Optional[TranslationStore] = None,
+                                max_in_flight: int = MAX_IN_FLIGHT,
+                                retries: int = MAX_RETRIES,
+                                backoff: float = BACKOFF_SECONDS) -> Dict[Tuple[str, str], str]:
+    """Translate {language: [source, ...]} and return {(source, language): translation}.
+
+    Results already in the store are served without a request; the rest is
+    deduplicated and sent as one batch per language (split at
+    provider.max_batch_size). A language whose batch keeps failing is left
+    out of the result.
+    """
+    results: Dict[Tuple[str, str], str] = {}
+    batches: List[Tuple[str, List[str]]] = []
+    for language, sources in cells.items():
+        sources = list(dict.fromkeys(sources))
+        stored = store.get_many(sources, language, provider.key) if store is not None else {}
+        pending = []
+        for source in sources:
+            if source in stored:
+                results[(source, language)] = stored[source][0]
+            else:
+                pending.append(source)
+        size = max(1, provider.max_batch_size)
+        for start in range(0, len(pending), size):
+            batches.append((language, pending[start:start + size]))
+
+    if not batches:
+        return results
+
+    semaphore = asyncio.Semaphore(max(1, max_in_flight))
+    outcomes = await asyncio.gather(
+        *(_send_batch(provider, semaphore, texts, source_language, language, retries, backoff)
+          for language, texts in batches),
+        return_exceptions=True)
+
+    rows = []
+    for (language, texts), outcome in zip(batches, outcomes):
+        if isinstance(outcome, BaseException):
+            print(f"Machine translation failed for {language}: {outcome}")
+            continue
+        for source, translation in zip(texts, outcome):
+            results[(source, language)] = translation
+            rows.append((source, language, provider.key, translation, MACHINE_STATE))
+    if store is not None:
+        store.put_many(rows)
+    return results
+
+
+def translate_cells(provider: TranslationProvider, cells: Dict[str, Iterable[str]],
+                    source_language: str = 'en', store: Optional[TranslationStore] = None,
+                    **options) -> Dict[Tuple[str, str], str]:
+    """Synchronous wrapper around translate_cells_async."""
+    return asyncio.run(translate_cells_async(provider, cells, source_language, store, **options))
@@ -0,0 +1,312 @@
+#!/usr/bin/env python3
+"""
+Xcode-Compatible Catalog Writer
+Serializes .xcstrings data byte-for-byte the way Xcode does and splices
+only the changed key blocks into the original file contents
+"""
+
+import json
+import os
+import re
+import shutil
+import stat
+import tempfile
+from bisect import bisect_right
+from json.encoder import encode_basestring
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional, Tuple
+
+INDENT = '  '
+
+# Number of .xcstrings.backup generations kept next to the catalog
+BACKUP_GENERATIONS = 3
+
+# Inside an Xcode-formatted catalog every key of the "strings" object starts
+# a line indented by exactly four spaces; nested lines are indented further
+# and string values never contain raw newlines
+_STRINGS_KEY_RE = re.compile(rb'^    ("(?:[^"\\\n]|\\.)*") : ', re.MULTILINE)
+_STRINGS_END = b'\n  }'
+
+
+def _encode_string(value: str) -> str:
+    # What json.dumps(value, ensure_ascii=False) returns, without building an encoder per call
+    return encode_basestring(value)
+
+
+def format_value(value, level: int = 0) -> str:
+    """Encode a JSON value with Xcode's layout: sorted object keys, two-space
+    indent, ' : ' separators and an empty line inside empty containers."""
+    if isinstance(value, dict):
+        return _format_object(sorted(value.items()), level)
+    if isinstance(value, list):
+        inner = INDENT * (level + 1)
+        if not value:
+            return '[\n\n' + INDENT * level + ']'
+        items = [inner + format_value(item, level + 1) for item in value]
+        return '[\n' + ',\n'.join(items) + '\n' + INDENT * level + ']'
+    if isinstance(value, str):
+        return _encode_string(value)
+    return json.dumps(value)
+
+
+def _format_object(items: Iterable[Tuple[str, object]], level: int) -> str:
+    inner = INDENT * (level + 1)
+    members = [inner + _encode_string(key) + ' : ' + format_value(item, level + 1)
+               for key, item in items]
+    if not members:
+        return '{\n\n' + INDENT * level + '}'
+    return '{\n' + ',\n'.join(members) + '\n' + INDENT * level + '}'
+
+
+def format_xcstrings(data: Dict) -> str:
+    """Serialize a whole catalog exactly as Xcode writes it (no trailing newline).
+
+    Every object is key-sorted except "strings", whose order is Xcode's own
+    and is kept as given.
+    """
+    items = []
+    for key, value in sorted(data.items()):
+        if key == 'strings' and isinstance(value, dict):
+            entries = [format_entry(string_key, entry) for string_key, entry in value.items()]
+            if entries:
+                value = '{\n' + ',\n'.join(entries) + '\n' + INDENT + '}'
+            else:
+                value = '{\n\n' + INDENT + '}'
+            items.append(INDENT + _encode_string(key) + ' : ' + value)
+        else:
+            items.append(INDENT + _encode_string(key) + ' : ' + format_value(value, 1))
+    if not items:
+        return '{\n\n}'
+    return '{\n' + ',\n'.join(items) + '\n}'
+
+
+def format_entry(key: str, entry: Dict) -> str:
+    """Serialize one member of the "strings" object, including its indentation."""
+    return INDENT * 2 + _encode_string(key) + ' : ' + format_value(entry, 2)
+
+
+def xcode_sort_key(key: str) -> List[Tuple[int, int, str]]:
+    """Approximation of Xcode's key order: punctuation before numbers (compared
+    numerically) before letters (compared case-insensitively)."""
+    parts = []
+    for match in re.finditer(r'\d+|\D', key):
+        token = match.group()
+        if token.isdigit():
+            parts.append((1, int(token), ''))
+        elif token.isalpha():
+            parts.append((2, 0, token.casefold()))
+        else:
+            parts.append((0, 0, token))
+    return parts
+
+
+def index_entries(content: bytes) -> Optional[List[Tuple[str, int, int]]]:
+    """Locate every (key, start, end) block of the "strings" object.
+
+    Returns None when the content is not in Xcode's layout, in which case
+    callers have to fall back to a full rewrite.
+    """
+    spans = []
+    starts = [(match.group(1), match.start()) for match in _STRINGS_KEY_RE.finditer(content)]
+    if not starts:
+        return None
+    for (raw_key, start), (_, next_start) in zip(starts, starts[1:]):
+        if content[next_start - 2:next_start] != b',\n':
+            return None
+        spans.append((json.loads(raw_key), start, next_start - 2))
+    raw_key, start = starts[-1]
+    end = content.find(_STRINGS_END, start)
+    if end == -1:
+        return None
+    spans.append((json.loads(raw_key), start, end))
+    return spans
+
+
+def read_entries(content: bytes, spans: List[Tuple[str, int, int]],
+                 keys: Iterable[str]) -> Dict[str, Dict]:
+    """Decode just the requested entries from Xcode-formatted catalog bytes."""
+    wanted = set(keys)
+    entries = {}
+    for key, start, end in spans:
+        if key in wanted:
+            value_start = _STRINGS_KEY_RE.match(content, start).end()
+            entries[key] = json.loads(content[value_start:end])
+    return entries
+
+
+def splice_entries(content: bytes, changes: Dict[str, Optional[Dict]],
+                   spans: Optional[List[Tuple[str, int, int]]] = None) -> Optional[bytes]:
+    """Apply per-key changes to Xcode-formatted catalog bytes.
+
+    changes maps a key to its new entry (replacing or inserting it) or to
+    None (removing it). Only the changed blocks are encoded; everything else
+    is copied from the original buffer. Returns None if the content is not
+    in Xcode's layout or the catalog would end up empty. spans, if the
+    caller already has them from index_entries, saves indexing again.
+    """
+    if spans is None:
+        spans = index_entries(content)
+    if spans is None:
+        return None
+    positions = {key: i for i, (key, _, _) in enumerate(spans)}
+    if len(positions) != len(spans):
+        return None
+
+    replaced = {}
+    removed = set()
+    inserted = []
+    for key, entry in changes.items():
+        if key in positions:
+            i = positions[key]
+            if entry is None:
+                removed.add(i)
+            else:
+                replaced[i] = format_entry(key, entry).encode('utf-8')
+        elif entry is not None:
+            inserted.append(key)
+
+    if len(removed) == len(spans):
+        return None
+
+    # New keys go before the first existing key that sorts after them
+    insertions: Dict[int, List[bytes]] = {}
+    if inserted:
+        sort_keys = [xcode_sort_key(key) for key, _, _ in spans]
+        for key in sorted(inserted, key=xcode_sort_key):
+            i = bisect_right(sort_keys, xcode_sort_key(key))
+            insertions.setdefault(i, []).append(format_entry(key, changes[key]).encode('utf-8'))
+
+    # Rejoin the surviving blocks so runs of removals, including one at the
+    # end, never leave a separator behind
+    blocks = []
+    for i, (_, start, end) in enumerate(spans):
+        blocks.extend(insertions.get(i, ()))
+        if i in replaced:
+            blocks.append(replaced[i])
+        elif i not in removed:
+            blocks.append(content[start:end])
+    blocks.extend(insertions.get(len(spans), ()))
+    return b''.join((content[:spans[0][1]], b',\n'.join(blocks), content[spans[-1][2]:]))
+
+
+def render_catalog(data: Dict, original: Optional[bytes] = None,
+                   changed_keys: Optional[Iterable[str]] = None) -> bytes:
+    """Encode a catalog for writing, splicing only changed_keys into original when possible."""
+    if original is not None and changed_keys is not None:
+        strings = data.get('strings', {})
+        changes = {key: strings.get(key) for key in changed_keys}
+        spliced = splice_entries(original, changes)
+        if spliced is not None:
+            return spliced
+    return format_xcstrings(data).encode('utf-8')
+
+
+def backup_path_for(file_path: Path, generation: int = 0) -> Path:
+    """Path of a backup generation; 0 is the most recent."""
+    suffix = '.xcstrings.backup' if generation == 0 else f'.xcstrings.backup.{generation}'
+    return file_path.with_suffix(suffix)
+
+
+def rotate_backups(file_path: Path, generations: int = BACKUP_GENERATIONS) -> Optional[Path]:
+    """Shift existing backups down one generation and back up the current file.
+
+    Saves replace the catalog by rename and never modify it in place, so a
+    hardlink to the current file is a complete, zero-copy backup. A copy is
+    made only where hardlinks are unsupported.
+    """
+    if generations < 1 or not file_path.exists():
+        return None
+
+    oldest = backup_path_for(file_path, generations - 1)
+    try:
+        oldest.unlink()
+    except FileNotFoundError:
+        pass
+    for generation in range(generations - 2, -1, -1):
+        try:
+            os.replace(backup_path_for(file_path, generation),
+                       backup_path_for(file_path, generation + 1))
+        except FileNotFoundError:
+            pass
+
+    backup_path = backup_path_for(file_path)
+    try:
+        os.link(file_path, backup_path)
+    except OSError:
+        shutil.copy2(file_path, backup_path)
+    return backup_path
+
+
+def atomic_write(content: bytes, file_path: Path):
+    """Replace a file's contents atomically.
+
+    The data goes to a temporary file in the same directory, is fsynced and
+    then renamed over the target, so readers such as a concurrent Xcode build
+    see either the old or the new catalog, never a truncated one.
+    """
+    directory = file_path.parent
+    fd, tmp_name = tempfile.mkstemp(prefix=f'.{file_path.name}.', suffix='.tmp', dir=directory)
+    try:
+        with os.fdopen(fd, 'wb') as f:
+            f.write(content)
+            f.flush()
+            os.fsync(f.fileno())
+        try:
+            os.chmod(tmp_name, stat.S_IMODE(os.stat(file_path).st_mode))
+        except FileNotFoundError:
+            pass
+        os.replace(tmp_name, file_path)
+    except BaseException:
+        try:
+            os.unlink(tmp_name)
+        except OSError:
+            pass
+        raise
+
+    # Persist the rename itself
+    try:
+        dir_fd = os.open(directory, os.O_RDONLY)
+    except OSError:
+        return
+    try:
+        os.fsync(dir_fd)
+    except OSError:
+        pass
+    finally:
+        os.close(dir_fd)
+
+
+def write_catalog_bytes(content: bytes, file_path: Path, backup: bool = True,
+                        generations: int = BACKUP_GENERATIONS) -> bool:
+    """Atomically write encoded catalog contents, rotating backups of the previous file."""
+    try:
+        if backup:
+            backup_path = rotate_backups(file_path, generations)
+            if backup_path is not None:
+                print(f"Backup saved to: {backup_path}")
+        atomic_write(content, file_path)
+        print(f"Fixed file saved to: {file_path}")
+        return True
+    except Exception as e:
+        print(f"Error saving file: {e}")
+        return False
+
+
+def save_fixed_file(data: Dict, file_path: Path, backup: bool = True,
+                    changed_keys: Optional[Iterable[str]] = None) -> bool:
+    """Save the fixed localization file.
+
+    When changed_keys is given, only those entries are re-encoded and
+    spliced into the current file contents; otherwise the whole catalog is
+    rewritten. Output always uses Xcode's formatting.
+    """
+    original = None
+    if file_path.exists():
+        original = file_path.read_bytes()
+
+    try:
+        content = render_catalog(data, original, changed_keys)
+    except Exception as e:
+        print(f"Error saving file: {e}")
+        return False
+    return write_catalog_bytes(content, file_path, backup)
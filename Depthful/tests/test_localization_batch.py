@@ -0,0 +1,155 @@
+"""
+Batch Runner Tests
+Catalog discovery, per-catalog results and totals, failure records for
+catalogs that do not load, and the fix mode's confirmation rules
+"""
+
+import contextlib
+import io
+import json
+import sys
+import tempfile
+import unittest
+from pathlib import Path
+from unittest import mock
+
+from localization_batch import aggregate, discover_catalogs, main, run_batch
+from localization_writer import format_xcstrings
+
+
+def unit(value, state='translated'):
+    return {'stringUnit': {'state': state, 'value': value}}
+
+
+def catalog(**strings):
+    return {'sourceLanguage': 'en', 'version': '1.0', 'strings': strings}
+
+
+# Two of three keys have German; the third is only in English
+APP = catalog(
+    Save={'localizations': {'en': unit('Save'), 'de': unit('Speichern')}},
+    Open={'localizations': {'en': unit('Open'), 'de': unit('Öffnen')}},
+    Close={'localizations': {'en': unit('Close')}},
+)
+WIDGET = catalog(Refresh={'localizations': {'en': unit('Refresh'), 'ja': unit('更新')}})
+
+
+class BatchTestCase(unittest.TestCase):
+
+    def setUp(self):
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        self.root = Path(directory.name)
+
+    def write(self, name, data):
+        path = self.root / name
+        path.parent.mkdir(parents=True, exist_ok=True)
+        path.write_text(format_xcstrings(data), encoding='utf-8')
+        return path
+
+
+class DiscoverCatalogsTest(BatchTestCase):
+
+    def test_directories_are_searched_recursively_skipping_build_output(self):
+        app = self.write('App/Localizable.xcstrings', APP)
+        plist = self.write('App/InfoPlist.xcstrings', WIDGET)
+        self.write('App/build/Localizable.xcstrings', APP)
+        self.write('.git/Localizable.xcstrings', APP)
+        self.write('App/Notes.json', APP)
+        self.assertEqual(discover_catalogs([str(self.root)]), [plist, app])
+
+    def test_files_and_globs_are_deduplicated(self):
+        app = self.write('App/Localizable.xcstrings', APP)
+        widget = self.write('Widget/Localizable.xcstrings', WIDGET)
+        found = discover_catalogs([str(app), str(self.root / '*' / '*.xcstrings'), str(self.root / 'App')])
+        self.assertEqual(found, [app, widget])
+        self.assertEqual(discover_catalogs([str(self.root / 'Missing' / '*.xcstrings')]), [])
+
+
+class RunBatchTest(BatchTestCase):
+
+    def test_status_holds_each_catalog_to_its_own_languages(self):
+        app = self.write('App/Localizable.xcstrings', APP)
+        widget = self.write('Widget/Localizable.xcstrings', WIDGET)
+        results = run_batch('status', [app, widget], jobs=1)
+        self.assertEqual([(result['path'], result['languages'], result['complete_keys'])
+                          for result in results],
+                         [(str(app), ['de', 'en'], 2), (str(widget), ['en', 'ja'], 1)])
+
+        totals = aggregate(results)
+        self.assertEqual((totals['catalogs'], totals['failed'], totals['translatable_keys'],
+                          totals['complete_keys']), (2, 0, 4, 3))
+        self.assertEqual(totals['completion_percentage'], 75.0)
+
+    def test_given_languages_apply_to_every_catalog(self):
+        widget = self.write('Widget/Localizable.xcstrings', WIDGET)
+        [result] = run_batch('analyze', [widget], jobs=1, languages=['en', 'ja', 'de'])
+        self.assertEqual(result['incomplete_keys'], 1)
+        self.assertEqual(result['missing_counts'], {1: 1})
+
+    def test_unreadable_catalog_becomes_a_failure_record(self):
+        app = self.write('App/Localizable.xcstrings', APP)
+        broken = self.root / 'Broken.xcstrings'
+        broken.write_text('{"strings" :', encoding='utf-8')
+        results = run_batch('status', [broken, app], jobs=1)
+        self.assertEqual([result['path'] for result in results], [str(broken), str(app)])
+        self.assertNotIn('total_keys', results[0])
+        self.assertTrue(results[0]['error'])
+        totals = aggregate(results)
+        self.assertEqual((totals['catalogs'], totals['failed'], totals['total_keys']), (2, 1, 3))
+
+    def test_fix_dry_run_leaves_the_catalog_untouched(self):
+        app = self.write('App/Localizable.xcstrings', APP)
+        original = app.read_bytes()
+        [result] = run_batch('fix', [app], jobs=1, dry_run=True, use_store=False)
+        self.assertEqual((result['added_cells'], result['saved']), (1, False))
+        self.assertEqual(result['fixed_completion_percentage'], 100.0)
+        self.assertEqual(app.read_bytes(), original)
+
+    def test_fix_saves_the_added_cells(self):
+        app = self.write('App/Localizable.xcstrings', APP)
+        [result] = run_batch('fix', [app], jobs=1, use_store=False)
+        self.assertEqual((result['added_cells'], result['saved']), (1, True))
+        saved = json.loads(app.read_text(encoding='utf-8'))
+        self.assertEqual(sorted(saved['strings']['Close']['localizations']), ['de', 'en'])
+
+
+class MainTest(BatchTestCase):
+
+    def run_main(self, *arguments):
+        stdout, stderr = io.StringIO(), io.StringIO()
+        with mock.patch.object(sys, 'argv', ['localization_batch.py', *arguments]), \
+                mock.patch.object(sys, 'stdin', io.StringIO('y\n')), \
+                contextlib.redirect_stdout(stdout), contextlib.redirect_stderr(stderr):
+            try:
+                main()
+                status = 0
+            except SystemExit as e:
+                status = e.code
+        return status, stdout.getvalue(), stderr.getvalue()
+
+    def test_fix_without_a_terminal_refuses_to_prompt(self):
+        app = self.write('App/Localizable.xcstrings', APP)
+        original = app.read_bytes()
+        status, _, errors = self.run_main('fix', str(self.root), '--no-translation-db')
+        self.assertEqual(status, 2)
+        self.assertIn("--yes or --dry-run", errors)
+        self.assertEqual(app.read_bytes(), original)
+
+    def test_ndjson_writes_a_record_per_catalog_then_the_totals(self):
+        self.write('App/Localizable.xcstrings', APP)
+        self.write('Widget/Localizable.xcstrings', WIDGET)
+        status, output, _ = self.run_main('status', str(self.root), '--jobs', '1', '--format', 'ndjson')
+        self.assertEqual(status, 0)
+        records = [json.loads(line) for line in output.splitlines()]
+        self.assertEqual([record['type'] for record in records], ['catalog', 'catalog', 'batch_summary'])
+        self.assertEqual(records[-1]['complete_keys'], 3)
+
+    def test_no_catalogs_exits_1(self):
+        status, output, _ = self.run_main('status', str(self.root))
+        self.assertEqual(status, 1)
+        self.assertIn("no .xcstrings catalogs found", output)
+
+
+if __name__ == "__main__":
+    unittest.main()
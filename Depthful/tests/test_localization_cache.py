@@ -0,0 +1,101 @@
+"""
+Catalog Snapshot Tests
+Snapshots must load the same model as a parse, be reused while the file is
+unchanged (even with a new mtime) and be dropped when it changes
+"""
+
+import contextlib
+import io
+import os
+import tempfile
+import unittest
+from pathlib import Path
+from unittest import mock
+
+import localization_cache
+from localization_cache import SNAPSHOT_MAGIC, clear_cache, load_cached_catalog, snapshot_path
+from localization_catalog import Catalog
+from localization_writer import format_xcstrings
+
+
+def unit(value, state='translated'):
+    return {'stringUnit': {'state': state, 'value': value}}
+
+
+DATA = {'sourceLanguage': 'en', 'version': '1.0', 'strings': {
+    '%lld items': {'localizations': {'en': unit('%lld items'), 'de': unit('%@ Einträge', 'needs_review')}},
+    'Hello': {'extractionState': 'manual', 'localizations': {'en': unit('Hello'), 'ja': unit('こんにちは')}},
+    'Logo': {'shouldTranslate': False},
+}}
+
+
+def model(catalog):
+    return (catalog.source_language, catalog.version, catalog.keys, catalog.languages,
+            bytes(catalog.should_translate), catalog.extraction_states, bytes(catalog.states),
+            catalog.values, catalog.placeholder_errors)
+
+
+class SnapshotTest(unittest.TestCase):
+
+    def setUp(self):
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        self.path = Path(directory.name) / "Localizable.xcstrings"
+        self.write(DATA)
+
+    def write(self, data):
+        self.path.write_text(format_xcstrings(data), encoding='utf-8')
+
+    def load(self):
+        with contextlib.redirect_stdout(io.StringIO()):
+            return load_cached_catalog(self.path)
+
+    def test_snapshot_loads_the_parsed_model(self):
+        parsed = self.load()
+        self.assertTrue(snapshot_path(self.path).exists())
+        with mock.patch.object(localization_cache.Catalog, 'from_data', side_effect=AssertionError):
+            cached = self.load()
+        self.assertEqual(model(cached), model(parsed))
+        self.assertEqual(model(cached), model(Catalog.from_data(DATA, path=self.path)))
+        self.assertEqual(cached.path, self.path)
+
+    def test_touched_file_with_the_same_content_reuses_the_snapshot(self):
+        self.load()
+        stat = self.path.stat()
+        os.utime(self.path, ns=(stat.st_atime_ns, stat.st_mtime_ns + 10**9))
+        with mock.patch.object(localization_cache.Catalog, 'from_data', side_effect=AssertionError):
+            self.assertEqual(self.load().keys, list(DATA['strings']))
+        # The snapshot was re-stamped, so the next load does not even hash
+        with mock.patch.object(localization_cache, 'content_hash', side_effect=AssertionError):
+            self.load()
+
+    def test_changed_file_is_parsed_again(self):
+        self.load()
+        changed = {**DATA, 'strings': {**DATA['strings'], 'Bye': {'localizations': {'en': unit('Bye')}}}}
+        self.write(changed)
+        self.assertIn('Bye', self.load())
+
+    def test_damaged_or_outdated_snapshots_are_ignored(self):
+        self.load()
+        snapshot = snapshot_path(self.path)
+        for content in (b'', b'garbage', SNAPSHOT_MAGIC + b'\xff\x00'):
+            snapshot.write_bytes(content)
+            self.assertEqual(self.load().keys, list(DATA['strings']))
+        with mock.patch.object(localization_cache, 'SNAPSHOT_FORMAT', localization_cache.SNAPSHOT_FORMAT + 1):
+            self.assertIsNone(localization_cache.read_snapshot(self.path))
+
+    def test_unreadable_catalog_returns_none(self):
+        self.path.write_text('{"strings" :', encoding='utf-8')
+        self.assertIsNone(self.load())
+        self.path.unlink()
+        self.assertIsNone(self.load())
+
+    def test_clear_cache(self):
+        self.load()
+        clear_cache(self.path)
+        self.assertFalse(snapshot_path(self.path).exists())
+        clear_cache(self.path)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,219 @@
+"""
+Catalog Engine Tests
+Parsing into the dense state matrix, cell edits that grow it, and the
+completeness analysis and per-edit counters every tool reports from
+"""
+
+import unittest
+
+from localization_catalog import (
+    EXPECTED_LANGUAGES,
+    STATE_MISSING,
+    STATE_NEEDS_REVIEW,
+    STATE_OTHER,
+    STATE_TRANSLATED,
+    STATE_VARIATIONS,
+    Catalog,
+    analyze_completeness,
+)
+
+# A translation per expected language, in the script the quality checks expect
+GREETINGS = {
+    'ar': 'مرحبا', 'de': 'Hallo', 'en': 'Hello', 'es': 'Hola', 'fr': 'Bonjour', 'hi': 'नमस्ते',
+    'ja': 'こんにちは', 'ko': '안녕하세요', 'pt': 'Olá', 'zh-Hans': '你好',
+}
+
+
+def unit(value, state='translated'):
+    return {'stringUnit': {'state': state, 'value': value}}
+
+
+def catalog(**strings):
+    return Catalog.from_data({'sourceLanguage': 'en', 'version': '1.0', 'strings': strings})
+
+
+def complete(without=(), **overrides):
+    """An entry with every expected language, minus without, with values overridden."""
+    return {'localizations': {lang: unit(value) for lang, value in {**GREETINGS, **overrides}.items()
+                              if lang not in without}}
+
+
+class ParseTest(unittest.TestCase):
+
+    def setUp(self):
+        self.catalog = catalog(
+            Hello=complete(),
+            Items={'localizations': {
+                'en': unit('%lld items'),
+                'de': {'variations': {'plural': {'other': unit('%lld Einträge')}}},
+                'fr': unit('%lld éléments', 'needs_review'),
+                'it': {'stringUnit': {'value': 'Elementi'}},
+            }},
+            Logo={'shouldTranslate': False, 'extractionState': 'manual'},
+        )
+
+    def test_expected_languages_come_first_and_others_follow(self):
+        self.assertEqual(self.catalog.languages, sorted(EXPECTED_LANGUAGES) + ['it'])
+        self.assertEqual(self.catalog.keys, ['Hello', 'Items', 'Logo'])
+        self.assertEqual(len(self.catalog.states), 3 * self.catalog.width)
+
+    def test_cells_keep_their_state_and_value(self):
+        self.assertEqual(self.catalog.state_code('Hello', 'ja'), STATE_TRANSLATED)
+        self.assertEqual(self.catalog.value('Hello', 'ja'), 'こんにちは')
+        self.assertEqual(self.catalog.state_code('Items', 'de'), STATE_VARIATIONS)
+        self.assertEqual(self.catalog.state_code('Items', 'fr'), STATE_NEEDS_REVIEW)
+        self.assertEqual(self.catalog.state('Items', 'fr'), 'needs_review')
+        self.assertEqual(self.catalog.state_code('Items', 'it'), STATE_OTHER)
+        self.assertIsNone(self.catalog.state('Items', 'ja'))
+        self.assertIsNone(self.catalog.value('Items', 'no-such-language'))
+
+    def test_key_queries(self):
+        self.assertFalse(self.catalog.translatable('Logo'))
+        self.assertEqual(self.catalog.extraction_states, [None, None, 'manual'])
+        self.assertEqual(self.catalog.available_languages('Items'), ['de', 'en', 'fr', 'it'])
+        self.assertEqual(self.catalog.missing_languages('Items', {'en', 'de', 'ja'}), ['ja'])
+        self.assertTrue(self.catalog.is_fully_translated('Hello'))
+        self.assertFalse(self.catalog.is_fully_translated('Items'))
+        self.assertEqual(self.catalog.source_value('Logo'), 'Logo')
+
+
+class EditTest(unittest.TestCase):
+
+    def test_new_language_and_key_widen_the_matrix_without_moving_cells(self):
+        model = catalog(Hello=complete())
+        model.set_cell('Hello', 'it', 'translated', 'Ciao')
+        model.set_cell('Bye', 'de', 'new', 'Tschüss')
+        self.assertEqual(model.width, len(EXPECTED_LANGUAGES) + 1)
+        self.assertEqual(len(model.states), 2 * model.width)
+        self.assertEqual(model.value('Hello', 'ja'), 'こんにちは')
+        self.assertEqual(model.value('Hello', 'it'), 'Ciao')
+        self.assertEqual(model.state('Bye', 'de'), 'new')
+        self.assertEqual(model.state_code('Bye', 'it'), STATE_MISSING)
+
+    def test_placeholder_errors_follow_edits(self):
+        model = catalog(Items={'localizations': {'en': unit('%lld items'), 'de': unit('%lld Einträge')}})
+        self.assertEqual(model.placeholder_errors, set())
+        model.set_cell('Items', 'de', 'translated', '%@ Einträge')
+        self.assertEqual(model.placeholder_errors, {(0, model.language_index['de'])})
+        model.set_cell('Items', 'en', 'translated', '%@ items')
+        self.assertEqual(model.placeholder_errors, set())
+
+
+class AnalyzeCompletenessTest(unittest.TestCase):
+
+    def setUp(self):
+        self.catalog = catalog(
+            Hello=complete(),
+            Bye=complete(without={'de'}, ja='Goodbye'),
+            Review={'localizations': {**complete()['localizations'], 'fr': unit('Bonjour', 'needs_review')}},
+            Logo={'shouldTranslate': False},
+        )
+
+    def test_counts_and_missing_languages(self):
+        analysis = analyze_completeness(self.catalog)
+        self.assertEqual((analysis['total_keys'], analysis['should_not_translate']), (4, 1))
+        self.assertEqual(analysis['complete_keys'], 2)
+        self.assertEqual(analysis['incomplete_keys'], ['Bye'])
+        self.assertEqual(analysis['missing_languages'], {'Bye': ['de']})
+        self.assertEqual(analysis['missing_counts'], {1: ['Bye']})
+        self.assertEqual(analysis['language_coverage']['de'], 2)
+        self.assertAlmostEqual(analysis['completion_percentage'], 200 / 3)
+        self.assertEqual(analysis['state_counts']['fr']['needs_review'], 1)
+        self.assertEqual(analysis['state_counts']['de']['missing'], 1)
+
+    def test_require_translated_also_reports_unreviewed_keys(self):
+        analysis = analyze_completeness(self.catalog, require_translated=True)
+        self.assertEqual(analysis['incomplete_keys'], ['Bye', 'Review'])
+        self.assertNotIn('Review', analysis['missing_languages'])
+
+    def test_value_checks_feed_true_completion(self):
+        analysis = analyze_completeness(self.catalog)
+        self.assertEqual(analysis['wrong_script'], {'ja': ['Bye']})
+        self.assertEqual(analysis['untranslated_copies'], {})
+        self.assertEqual(analysis['true_complete_keys'], 2)
+        self.assertEqual(analysis['state_counts']['ja']['wrong_script'], 1)
+
+        copied = catalog(Hello=complete(de='Hello'))
+        analysis = analyze_completeness(copied)
+        self.assertEqual(analysis['untranslated_copies'], {'de': ['Hello']})
+        self.assertEqual((analysis['complete_keys'], analysis['true_complete_keys']), (1, 0))
+
+    def test_value_checks_can_be_skipped(self):
+        analysis = analyze_completeness(self.catalog, check_values=False)
+        self.assertEqual(analysis['complete_keys'], 2)
+        for field in ('wrong_script', 'untranslated_copies', 'true_complete_keys', 'true_completion_percentage'):
+            self.assertNotIn(field, analysis)
+        self.assertNotIn('wrong_script', analysis['state_counts']['ja'])
+
+    def test_on_incomplete_streams_keys_instead_of_listing_them(self):
+        seen = []
+        analysis = analyze_completeness(self.catalog, on_incomplete=lambda key, missing: seen.append((key, missing)))
+        self.assertEqual(seen, [('Bye', ['de'])])
+        self.assertEqual(analysis['incomplete_keys'], [])
+
+    def test_plain_json_trees_are_accepted(self):
+        data = {'sourceLanguage': 'en', 'strings': {'Hello': complete()}}
+        self.assertEqual(analyze_completeness(data)['complete_keys'], 1)
+
+
+class CompletenessCountersTest(unittest.TestCase):
+    """Counters kept current by edits must equal a recount from scratch."""
+
+    def setUp(self):
+        self.catalog = catalog(
+            Hello=complete(),
+            Bye=complete(without={'de', 'fr'}),
+            Logo={'shouldTranslate': False, 'localizations': {'en': unit('Logo')}},
+        )
+        self.counters = self.catalog.completeness()
+
+    def assertMatchesRecount(self, require_translated=False):
+        kept = self.counters.summary(require_translated)
+        self.catalog.counters = None
+        recounted = self.catalog.completeness().summary(require_translated)
+        self.counters = self.catalog.counters
+        self.assertEqual(kept, recounted)
+
+    def test_initial_summary(self):
+        summary = self.counters.summary()
+        self.assertEqual((summary['total_keys'], summary['complete_keys'], summary['incomplete_count']), (3, 1, 1))
+        self.assertEqual(summary['language_coverage']['de'], 1)
+        self.assertEqual(summary['state_counts']['en'], {'translated': 2, 'new': 0, 'needs_review': 0, 'stale': 0,
+                                                          'variations': 0, 'other': 0, 'missing': 0})
+
+    def test_filling_a_key_completes_it(self):
+        self.catalog.set_cell('Bye', 'de', 'translated', 'Tschüss')
+        self.assertEqual(self.counters.complete, 1)
+        self.catalog.set_cell('Bye', 'fr', 'new', 'Au revoir')
+        summary = self.counters.summary()
+        self.assertEqual(summary['complete_keys'], 2)
+        self.assertEqual(summary['state_counts']['fr']['new'], 1)
+        self.assertEqual(self.counters.summary(require_translated=True)['complete_keys'], 1)
+        self.assertMatchesRecount()
+        self.assertMatchesRecount(require_translated=True)
+
+    def test_state_changes_and_new_keys(self):
+        self.catalog.set_cell('Hello', 'ja', 'needs_review')
+        self.assertEqual(self.counters.summary(require_translated=True)['complete_keys'], 0)
+        self.catalog.set_cell('Hello', 'ja', 'translated')
+        self.catalog.set_cell('Later', 'en', 'translated', 'Later')
+        self.catalog.set_cell('Hidden', 'en', 'translated', 'Hidden')
+        summary = self.counters.summary()
+        self.assertEqual((summary['total_keys'], summary['incomplete_count']), (5, 3))
+        self.assertMatchesRecount()
+        self.assertMatchesRecount(require_translated=True)
+
+    def test_untranslatable_keys_are_not_counted(self):
+        self.catalog.set_cell('Logo', 'de', 'translated', 'Logo')
+        self.assertEqual(self.counters.summary()['state_counts']['de']['translated'], 1)
+        self.assertMatchesRecount()
+
+    def test_other_expected_languages_get_fresh_counters(self):
+        counters = self.catalog.completeness({'en', 'ja'})
+        self.assertIsNot(counters, self.counters)
+        self.assertEqual(counters.summary()['complete_keys'], 2)
+        self.assertIs(self.catalog.completeness({'ja', 'en'}), counters)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,112 @@
+"""
+Changeset Tests
+Operation checks, the preview patch, and rendering a changeset into catalog
+bytes equal to a full re-encode of the edited catalog
+"""
+
+import contextlib
+import copy
+import io
+import json
+import tempfile
+import unittest
+from pathlib import Path
+
+from localization_catalog import Catalog
+from localization_changeset import ADD, Changeset, Operation
+from localization_writer import format_xcstrings
+
+
+def unit(value, state='translated'):
+    return {'stringUnit': {'state': state, 'value': value}}
+
+
+DATA = {'sourceLanguage': 'en', 'version': '1.0', 'strings': {
+    'Bye': {'localizations': {'en': unit('Bye'), 'de': unit('Tschüs', 'needs_review')}},
+    'Hello': {'localizations': {'en': unit('Hello'), 'de': unit('Hallo')}},
+    'Items': {'localizations': {'en': unit('Items'),
+                                'de': {'variations': {'plural': {'other': unit('Einträge')}}}}},
+}}
+
+
+class ChangesetTest(unittest.TestCase):
+
+    def setUp(self):
+        self.catalog = Catalog.from_data(copy.deepcopy(DATA))
+        self.changeset = Changeset(self.catalog)
+
+    def edit(self):
+        self.changeset.add('Hello', 'fr', 'Bonjour')
+        self.changeset.replace('Bye', 'de', 'Tschüss', 'translated')
+        self.changeset.set_state('Hello', 'de', 'needs_review')
+        self.changeset.add('New', 'en', 'New', 'new')
+
+    def expected_data(self):
+        data = copy.deepcopy(DATA)
+        strings = data['strings']
+        strings['Hello']['localizations']['fr'] = unit('Bonjour')
+        strings['Bye']['localizations']['de'] = unit('Tschüss')
+        strings['Hello']['localizations']['de']['stringUnit']['state'] = 'needs_review'
+        strings['New'] = {'localizations': {'en': unit('New', 'new')}}
+        return data
+
+    def test_operations_must_fit_the_base_catalog(self):
+        with self.assertRaises(ValueError):
+            self.changeset.add('Hello', 'de', 'Hallo')
+        with self.assertRaises(ValueError):
+            self.changeset.replace('Hello', 'fr', 'Bonjour')
+        with self.assertRaises(ValueError):
+            self.changeset.set_state('Items', 'de', 'translated')
+        with self.assertRaises(ValueError):
+            self.changeset.set_state('Missing', 'en', 'translated')
+        self.assertEqual(len(self.changeset), 0)
+
+    def test_operations_are_kept_in_order(self):
+        self.edit()
+        self.assertEqual(len(self.changeset), 4)
+        self.assertEqual(list(self.changeset)[0], Operation(ADD, 'Hello', 'fr', 'Bonjour', 'translated'))
+        self.assertEqual(self.changeset.changed_keys(), ['Hello', 'Bye', 'New'])
+
+    def test_patch_describes_each_operation(self):
+        self.edit()
+        self.assertEqual(self.changeset.format_patch().splitlines(), [
+            '+ [fr] "Hello" = "Bonjour" (translated)',
+            '~ [de] "Bye" = "Tschüss" (translated) (was "Tschüs")',
+            '= [de] "Hello" state: translated -> needs_review',
+            '+ [en] "New" = "New" (new)',
+        ])
+
+    def test_apply_to_catalog_updates_the_model(self):
+        self.edit()
+        self.changeset.apply_to_catalog()
+        self.assertEqual(self.catalog.value('Hello', 'fr'), 'Bonjour')
+        self.assertEqual(self.catalog.state('Hello', 'de'), 'needs_review')
+        self.assertEqual((self.catalog.value('Bye', 'de'), self.catalog.state('Bye', 'de')),
+                         ('Tschüss', 'translated'))
+        self.assertEqual(self.catalog.state('New', 'en'), 'new')
+
+    def test_render_equals_a_full_encode(self):
+        self.edit()
+        expected = self.expected_data()
+        rendered = self.changeset.render(format_xcstrings(DATA).encode('utf-8'))
+        self.assertEqual(json.loads(rendered), expected)
+        self.assertEqual(rendered, format_xcstrings(expected).encode('utf-8'))
+
+    def test_render_rewrites_other_layouts_in_full(self):
+        self.edit()
+        rendered = self.changeset.render(json.dumps(DATA).encode('utf-8'))
+        self.assertEqual(rendered, format_xcstrings(self.expected_data()).encode('utf-8'))
+
+    def test_save_writes_the_rendered_catalog(self):
+        self.edit()
+        with tempfile.TemporaryDirectory() as directory:
+            path = Path(directory) / "Localizable.xcstrings"
+            path.write_text(format_xcstrings(DATA), encoding='utf-8')
+            with contextlib.redirect_stdout(io.StringIO()):
+                self.assertTrue(self.changeset.save(path, backup=False))
+            self.assertEqual(json.loads(path.read_bytes()), self.expected_data())
+            self.assertEqual([child.name for child in Path(directory).iterdir()], [path.name])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,134 @@
+"""
+Catalog Diff Tests
+check_diff against a scratch git repository: exit code 0 when the changed
+keys pass, 1 when one needs attention and 2 when nothing can be compared
+"""
+
+import contextlib
+import io
+import json
+import os
+import shutil
+import subprocess
+import tempfile
+import unittest
+from pathlib import Path
+
+from localization_catalog import EXPECTED_LANGUAGES
+from localization_diff import ADDED, CHANGED, REMOVED, analyze_diff, check_diff
+from localization_writer import format_xcstrings
+
+# A translation per expected language, in the script its checks expect
+GREETINGS = {
+    'ar': 'مرحبا', 'de': 'Hallo', 'en': 'Hello', 'es': 'Hola', 'fr': 'Bonjour', 'hi': 'नमस्ते',
+    'ja': 'こんにちは', 'ko': '안녕하세요', 'pt': 'Olá', 'zh-Hans': '你好',
+}
+
+
+def complete_entry(greetings):
+    return {'localizations': {lang: {'stringUnit': {'state': 'translated', 'value': value}}
+                              for lang, value in greetings.items()}}
+
+
+@unittest.skipIf(shutil.which('git') is None, "git is not installed")
+class CheckDiffTest(unittest.TestCase):
+
+    def setUp(self):
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        self.root = Path(directory.name)
+        self.catalog = self.root / "Localizable.xcstrings"
+        self.strings = {'Hello': complete_entry(GREETINGS)}
+        self.write()
+        self.git('init', '-q')
+        self.git('add', self.catalog.name)
+        self.git('commit', '-q', '-m', 'Add catalog')
+
+    def git(self, *arguments):
+        environment = {**os.environ, 'GIT_AUTHOR_NAME': 'Test', 'GIT_AUTHOR_EMAIL': 'test@example.com',
+                       'GIT_COMMITTER_NAME': 'Test', 'GIT_COMMITTER_EMAIL': 'test@example.com'}
+        subprocess.run(['git', *arguments], cwd=self.root, env=environment, check=True,
+                       capture_output=True)
+
+    def write(self):
+        data = {'sourceLanguage': 'en', 'version': '1.0', 'strings': self.strings}
+        self.catalog.write_text(format_xcstrings(data), encoding='utf-8')
+
+    def check(self, base='HEAD', output_format='text'):
+        output = io.StringIO()
+        with contextlib.redirect_stdout(output), contextlib.redirect_stderr(io.StringIO()):
+            status = check_diff(self.catalog, base, output_format)
+        return status, output.getvalue()
+
+    def test_unchanged_catalog_exits_0(self):
+        self.assertEqual(self.check()[0], 0)
+
+    def test_complete_new_key_exits_0(self):
+        self.strings['Goodbye'] = complete_entry({**GREETINGS, 'en': 'Goodbye', 'de': 'Tschüss'})
+        self.write()
+        status, output = self.check()
+        self.assertEqual(status, 0)
+        self.assertIn("Added keys: 1", output)
+
+    def test_incomplete_new_key_exits_1(self):
+        self.strings['Goodbye'] = complete_entry({'en': 'Goodbye', 'de': 'Tschüss'})
+        self.write()
+        status, output = self.check(output_format='json')
+        self.assertEqual(status, 1)
+        document = json.loads(output)
+        self.assertEqual([item['key'] for item in document['incomplete']], ['Goodbye'])
+        self.assertEqual(document['incomplete'][0]['missing_languages'],
+                         sorted(EXPECTED_LANGUAGES - {'en', 'de'}))
+
+    def test_changed_cell_in_the_wrong_script_exits_1(self):
+        self.strings['Hello'] = complete_entry({**GREETINGS, 'ja': 'Konnichiwa'})
+        self.write()
+        status, output = self.check(output_format='ndjson')
+        self.assertEqual(status, 1)
+        records = [json.loads(line) for line in output.splitlines()]
+        findings = [(record['kind'], record['language'], record['key'])
+                    for record in records if record['type'] == 'finding']
+        self.assertEqual(findings, [('wrong_script', 'ja', 'Hello')])
+
+    def test_issue_outside_the_change_is_not_reported(self):
+        self.strings['Legacy'] = complete_entry({'en': 'Legacy'})
+        self.write()
+        self.git('commit', '-q', '-am', 'Add an incomplete key')
+        self.strings['Hello'] = complete_entry({**GREETINGS, 'de': 'Servus'})
+        self.write()
+        self.assertEqual(self.check()[0], 0)
+
+    def test_changes_are_classified(self):
+        self.strings['Goodbye'] = complete_entry({'en': 'Goodbye'})
+        self.write()
+        self.git('commit', '-q', '-am', 'Add Goodbye')
+        self.strings = {'Goodbye': complete_entry({'en': 'Goodbye', 'de': 'Tschüss'}),
+                        'Thanks': complete_entry({'en': 'Thanks'})}
+        self.write()
+        diff = analyze_diff(self.catalog, 'HEAD')
+        self.assertEqual([(change.key, change.kind, change.languages) for change in diff['changes']],
+                         [('Goodbye', CHANGED, ('de',)), ('Thanks', ADDED, ('en',)),
+                          ('Hello', REMOVED, tuple(sorted(GREETINGS)))])
+
+    def test_unknown_ref_exits_2(self):
+        self.assertEqual(self.check(base='no-such-ref')[0], 2)
+
+    def test_missing_catalog_exits_2(self):
+        self.catalog.unlink()
+        self.assertEqual(self.check()[0], 2)
+
+    def test_unreadable_catalog_exits_2(self):
+        self.catalog.write_text('{"strings" :', encoding='utf-8')
+        self.assertEqual(self.check()[0], 2)
+
+    def test_catalog_new_since_the_base_is_checked_in_full(self):
+        self.git('mv', self.catalog.name, 'Old.xcstrings')
+        self.git('commit', '-q', '-m', 'Rename')
+        self.write()
+        status, output = self.check()
+        self.assertEqual(status, 0)
+        self.assertIn("does not exist at the base", output)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,119 @@
+"""
+Completion History Tests
+The per-commit time series of a catalog in a scratch git repository, its
+per-blob cache, and the CSV and HTML outputs
+"""
+
+import contextlib
+import csv
+import io
+import os
+import shutil
+import subprocess
+import tempfile
+import unittest
+from pathlib import Path
+from unittest import mock
+
+import localization_history
+from localization_catalog import EXPECTED_LANGUAGES
+from localization_history import completion_history, main, render_chart, write_csv
+from localization_writer import format_xcstrings
+
+# A translation per expected language, in the script its checks expect
+GREETINGS = {
+    'ar': 'مرحبا', 'de': 'Hallo', 'en': 'Hello', 'es': 'Hola', 'fr': 'Bonjour', 'hi': 'नमस्ते',
+    'ja': 'こんにちは', 'ko': '안녕하세요', 'pt': 'Olá', 'zh-Hans': '你好',
+}
+
+
+def entry(greetings):
+    return {'localizations': {lang: {'stringUnit': {'state': 'translated', 'value': value}}
+                              for lang, value in greetings.items()}}
+
+
+@unittest.skipIf(shutil.which('git') is None, "git is not installed")
+class CompletionHistoryTest(unittest.TestCase):
+
+    def setUp(self):
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        self.root = Path(directory.name)
+        self.catalog = self.root / "Localizable.xcstrings"
+        self.cache_dir = self.root / "cache"
+        self.git('init', '-q')
+
+        # Half complete, then a commit that leaves the catalog alone, then complete
+        self.commit({'Hello': entry(GREETINGS), 'Bye': entry({'en': 'Bye', 'de': 'Tschüss'})}, 'Add catalog')
+        (self.root / 'README').write_text('readme', encoding='utf-8')
+        self.git('add', 'README')
+        self.git('commit', '-q', '-m', 'Add readme')
+        self.commit({'Hello': entry(GREETINGS), 'Bye': entry({**GREETINGS, 'en': 'Bye'})}, 'Translate <Bye>')
+
+    def git(self, *arguments):
+        environment = {**os.environ, 'GIT_AUTHOR_NAME': 'Test', 'GIT_AUTHOR_EMAIL': 'test@example.com',
+                       'GIT_COMMITTER_NAME': 'Test', 'GIT_COMMITTER_EMAIL': 'test@example.com'}
+        subprocess.run(['git', *arguments], cwd=self.root, env=environment, check=True,
+                       capture_output=True)
+
+    def commit(self, strings, subject):
+        data = {'sourceLanguage': 'en', 'version': '1.0', 'strings': strings}
+        self.catalog.write_text(format_xcstrings(data), encoding='utf-8')
+        self.git('add', self.catalog.name)
+        self.git('commit', '-q', '-m', subject)
+
+    def history(self, **options):
+        with contextlib.redirect_stderr(io.StringIO()):
+            return completion_history(self.catalog, cache_dir=self.cache_dir, **options)
+
+    def test_one_row_per_commit_oldest_first(self):
+        rows = self.history()
+        self.assertEqual([row['subject'] for row in rows], ['Add catalog', 'Add readme', 'Translate <Bye>'])
+        self.assertEqual([row['completion_percentage'] for row in rows], [50.0, 50.0, 100.0])
+        self.assertEqual(rows[0]['blob'], rows[1]['blob'])
+        self.assertEqual(rows[0]['language_completion']['de'], 100.0)
+        self.assertEqual(rows[0]['language_completion']['ja'], 50.0)
+
+    def test_cached_blobs_are_not_analyzed_again(self):
+        first = self.history()
+        with mock.patch.object(localization_history, 'analyze_blobs', side_effect=AssertionError):
+            self.assertEqual(self.history(), first)
+
+        self.commit({'Hello': entry(GREETINGS)}, 'Remove Bye')
+        with mock.patch.object(localization_history, 'analyze_blobs',
+                               wraps=localization_history.analyze_blobs) as analyze:
+            rows = self.history()
+        self.assertEqual(len(analyze.call_args[0][1]), 1)
+        self.assertEqual(rows[-1]['total_keys'], 1)
+
+    def test_commits_without_the_catalog_are_skipped(self):
+        self.git('rm', '-q', self.catalog.name)
+        self.git('commit', '-q', '-m', 'Remove catalog')
+        self.commit({'Hello': entry({'en': 'Hello'})}, 'Restore catalog')
+        rows = self.history(use_cache=False)
+        self.assertEqual([row['subject'] for row in rows],
+                         ['Add catalog', 'Add readme', 'Translate <Bye>', 'Restore catalog'])
+
+    def test_csv_has_a_column_per_expected_language(self):
+        stream = io.StringIO()
+        write_csv(self.history(), stream)
+        table = list(csv.DictReader(io.StringIO(stream.getvalue())))
+        self.assertEqual(len(table), 3)
+        self.assertTrue(EXPECTED_LANGUAGES <= set(table[0]))
+        self.assertEqual([row['completion_percentage'] for row in table], ['50.00', '50.00', '100.00'])
+
+    def test_chart_escapes_commit_subjects(self):
+        page = render_chart(self.history(), 'Completion & more')
+        self.assertIn('<title>Completion &amp; more</title>', page)
+        self.assertIn('Translate &lt;Bye&gt;', page)
+        self.assertNotIn('<Bye>', page)
+        self.assertIn('No commits contain the catalog', render_chart([], 'Empty'))
+
+    def test_unknown_ref_exits_2(self):
+        with contextlib.redirect_stderr(io.StringIO()), self.assertRaises(SystemExit) as raised:
+            main([str(self.catalog), '--ref', 'no-such-ref', '--no-cache'])
+        self.assertEqual(raised.exception.code, 2)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,109 @@
+"""
+Translation Memory Tests
+Exact and fuzzy lookups, and re-ingesting a catalog after its translations
+were corrected or deleted
+"""
+
+import tempfile
+import unittest
+from pathlib import Path
+
+from localization_catalog import Catalog
+from localization_memory import TranslationMemory, load_memory, save_memory
+
+
+def unit(value, state='translated'):
+    return {'stringUnit': {'state': state, 'value': value}}
+
+
+def catalog(path, **strings):
+    return Catalog.from_data({'sourceLanguage': 'en', 'version': '1.0', 'strings': strings},
+                             path=Path(path))
+
+
+APP = {
+    'Save': {'localizations': {'en': unit('Save'), 'de': unit('Speichern'), 'fr': unit('Enregistrer')}},
+    'Delete entry': {'localizations': {'en': unit('Delete entry'), 'de': unit('Eintrag löschen')}},
+    'Cancel': {'localizations': {'en': unit('Cancel'), 'de': unit('Cancel'), 'fr': unit('Annuler', 'new')}},
+    'Internal': {'shouldTranslate': False, 'localizations': {'de': unit('Intern')}},
+}
+
+
+class LookupTest(unittest.TestCase):
+
+    def setUp(self):
+        self.memory = TranslationMemory()
+        self.added = self.memory.add_catalog(catalog('/app/Localizable.xcstrings', **APP))
+
+    def test_exact_lookup_normalizes_whitespace(self):
+        self.assertEqual(self.memory.lookup('Save', 'de'), 'Speichern')
+        self.assertEqual(self.memory.lookup('  Delete   entry ', 'de'), 'Eintrag löschen')
+        self.assertIsNone(self.memory.lookup('Save', 'ja'))
+        self.assertIsNone(self.memory.lookup('Open', 'de'))
+
+    def test_copies_untranslated_states_and_untranslatable_keys_are_skipped(self):
+        self.assertEqual(self.added, 3)
+        self.assertIsNone(self.memory.lookup('Cancel', 'de'))
+        self.assertIsNone(self.memory.lookup('Cancel', 'fr'))
+        self.assertIsNone(self.memory.lookup('Internal', 'de'))
+
+    def test_fuzzy_lookup_finds_near_variants_but_not_the_source_itself(self):
+        matches = self.memory.fuzzy_lookup('Delete entries', 'de')
+        self.assertEqual([(match.source, match.target) for match in matches],
+                         [('Delete entry', 'Eintrag löschen')])
+        self.assertGreater(matches[0].score, 0.5)
+        self.assertEqual(self.memory.fuzzy_lookup('Delete entry', 'de'), [])
+
+    def test_added_translations_yield_to_catalogs(self):
+        self.memory.add('Save', 'de', 'Sichern')
+        self.memory.add('Open', 'de', 'Öffnen')
+        self.assertEqual(self.memory.lookup('Save', 'de'), 'Speichern')
+        self.assertEqual(self.memory.lookup('Open', 'de'), 'Öffnen')
+
+
+class ReingestTest(unittest.TestCase):
+
+    def setUp(self):
+        self.memory = TranslationMemory()
+        self.memory.add_catalog(catalog('/app/Localizable.xcstrings', **APP))
+
+    def test_corrected_translation_replaces_the_stored_one(self):
+        corrected = dict(APP, Save={'localizations': {'en': unit('Save'), 'de': unit('Sichern')}})
+        self.memory.add_catalog(catalog('/app/Localizable.xcstrings', **corrected))
+        self.assertEqual(self.memory.lookup('Save', 'de'), 'Sichern')
+        # The French cell was deleted from the catalog, so it leaves the memory
+        self.assertIsNone(self.memory.lookup('Save', 'fr'))
+
+    def test_deleted_key_is_forgotten_and_no_longer_fuzzy_matched(self):
+        self.assertTrue(self.memory.fuzzy_lookup('Delete entries', 'de'))
+        remaining = {key: entry for key, entry in APP.items() if key != 'Delete entry'}
+        self.memory.add_catalog(catalog('/app/Localizable.xcstrings', **remaining))
+        self.assertIsNone(self.memory.lookup('Delete entry', 'de'))
+        self.assertEqual(self.memory.fuzzy_lookup('Delete entries', 'de'), [])
+
+    def test_other_catalogs_keep_their_translations(self):
+        widget = {'Save': {'localizations': {'en': unit('Save'), 'de': unit('Sichern'), 'ja': unit('保存')}}}
+        self.memory.add_catalog(catalog('/widget/Localizable.xcstrings', **widget))
+        # The latest ingested catalog wins where both have a translation
+        self.assertEqual(self.memory.lookup('Save', 'de'), 'Sichern')
+        self.memory.add_catalog(catalog('/app/Localizable.xcstrings', **APP))
+        self.assertEqual(self.memory.lookup('Save', 'de'), 'Speichern')
+        self.assertEqual(self.memory.lookup('Save', 'ja'), '保存')
+
+        self.memory.add_catalog(catalog('/widget/Localizable.xcstrings'))
+        self.assertIsNone(self.memory.lookup('Save', 'ja'))
+        self.assertEqual(self.memory.lookup('Save', 'fr'), 'Enregistrer')
+
+    def test_reingest_survives_a_save_and_load(self):
+        with tempfile.TemporaryDirectory() as directory:
+            path = Path(directory) / 'memory'
+            self.assertTrue(save_memory(self.memory, path))
+            loaded = load_memory(path)
+        self.assertEqual(loaded.lookup('Save', 'de'), 'Speichern')
+        loaded.add_catalog(catalog('/app/Localizable.xcstrings'))
+        self.assertIsNone(loaded.lookup('Save', 'de'))
+        self.assertEqual(len(loaded), 0)
+
+
+if __name__ == "__main__":
+    unittest.main()
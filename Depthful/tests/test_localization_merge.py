@@ -0,0 +1,185 @@
+"""
+Merge Driver Tests
+Three-way merges of decoded catalogs and of catalog files, including the
+exit codes git sees from run_merge
+"""
+
+import contextlib
+import io
+import json
+import tempfile
+import unittest
+from pathlib import Path
+
+from localization_merge import merge_catalogs, run_merge
+from localization_writer import format_xcstrings
+
+
+def unit(value, state='translated'):
+    return {'stringUnit': {'state': state, 'value': value}}
+
+
+def catalog(**strings):
+    return {'sourceLanguage': 'en', 'version': '1.0', 'strings': strings}
+
+
+BASE = catalog(
+    Hello={'localizations': {'en': unit('Hello'), 'de': unit('Hallo'), 'fr': unit('Salut', 'new')}},
+    Bye={'localizations': {'en': unit('Bye'), 'de': unit('Tschüss')}},
+)
+
+
+def edit(data, key, language, **fields):
+    data = json.loads(json.dumps(data))
+    data['strings'][key]['localizations'][language]['stringUnit'].update(fields)
+    return data
+
+
+class MergeCatalogsTest(unittest.TestCase):
+
+    def test_unchanged_sides_merge_to_base(self):
+        merged, changes, conflicts = merge_catalogs(BASE, BASE, BASE)
+        self.assertEqual(merged, BASE)
+        self.assertEqual(changes, {})
+        self.assertEqual(conflicts, [])
+
+    def test_change_on_one_side_is_taken(self):
+        theirs = edit(BASE, 'Hello', 'de', value='Guten Tag')
+        merged, changes, conflicts = merge_catalogs(BASE, BASE, theirs)
+        self.assertEqual(merged, theirs)
+        self.assertEqual(list(changes), ['Hello'])
+        self.assertEqual(conflicts, [])
+
+        merged, changes, conflicts = merge_catalogs(BASE, theirs, BASE)
+        self.assertEqual(merged, theirs)
+        self.assertEqual(changes, {})
+
+    def test_different_keys_and_cells_do_not_conflict(self):
+        ours = edit(BASE, 'Hello', 'de', value='Guten Tag')
+        theirs = edit(edit(BASE, 'Hello', 'fr', value='Bonjour'), 'Bye', 'de', value='Ciao')
+        merged, _, conflicts = merge_catalogs(BASE, ours, theirs)
+        self.assertEqual(conflicts, [])
+        cells = merged['strings']['Hello']['localizations']
+        self.assertEqual(cells['de']['stringUnit']['value'], 'Guten Tag')
+        self.assertEqual(cells['fr']['stringUnit']['value'], 'Bonjour')
+        self.assertEqual(merged['strings']['Bye']['localizations']['de']['stringUnit']['value'], 'Ciao')
+
+    def test_state_and_value_of_one_cell_merge_separately(self):
+        ours = edit(BASE, 'Hello', 'fr', state='translated')
+        theirs = edit(BASE, 'Hello', 'fr', value='Bonjour')
+        merged, _, conflicts = merge_catalogs(BASE, ours, theirs)
+        self.assertEqual(conflicts, [])
+        self.assertEqual(merged['strings']['Hello']['localizations']['fr'], unit('Bonjour'))
+
+    def test_identical_change_on_both_sides_is_clean(self):
+        changed = edit(BASE, 'Hello', 'de', value='Guten Tag')
+        merged, _, conflicts = merge_catalogs(BASE, changed, changed)
+        self.assertEqual(merged, changed)
+        self.assertEqual(conflicts, [])
+
+    def test_same_field_changed_differently_conflicts_and_keeps_ours(self):
+        ours = edit(BASE, 'Hello', 'de', value='Guten Tag')
+        theirs = edit(BASE, 'Hello', 'de', value='Servus', state='needs_review')
+        merged, _, conflicts = merge_catalogs(BASE, ours, theirs)
+        self.assertEqual(len(conflicts), 1)
+        conflict = conflicts[0]
+        self.assertEqual((conflict.key, conflict.language, conflict.field), ('Hello', 'de', 'stringUnit.value'))
+        self.assertEqual((conflict.base, conflict.ours, conflict.theirs, conflict.resolved),
+                         ('Hallo', 'Guten Tag', 'Servus', 'Guten Tag'))
+        # The state only changed on their side, so it is taken
+        self.assertEqual(merged['strings']['Hello']['localizations']['de'], unit('Guten Tag', 'needs_review'))
+
+    def test_key_removed_on_one_side_is_removed(self):
+        theirs = catalog(Hello=BASE['strings']['Hello'])
+        merged, changes, conflicts = merge_catalogs(BASE, BASE, theirs)
+        self.assertNotIn('Bye', merged['strings'])
+        self.assertEqual(changes, {'Bye': None})
+        self.assertEqual(conflicts, [])
+
+    def test_edit_wins_over_removal(self):
+        ours = edit(BASE, 'Bye', 'de', value='Ciao')
+        theirs = catalog(Hello=BASE['strings']['Hello'])
+        merged, _, conflicts = merge_catalogs(BASE, ours, theirs)
+        self.assertEqual(merged['strings']['Bye'], ours['strings']['Bye'])
+        self.assertEqual([(conflict.key, conflict.field) for conflict in conflicts], [('Bye', 'entry')])
+
+        merged, _, conflicts = merge_catalogs(BASE, theirs, ours)
+        self.assertEqual(merged['strings']['Bye'], ours['strings']['Bye'])
+        self.assertEqual(len(conflicts), 1)
+
+    def test_key_added_on_both_sides_merges_its_cells(self):
+        ours = json.loads(json.dumps(BASE))
+        theirs = json.loads(json.dumps(BASE))
+        ours['strings']['New'] = {'localizations': {'en': unit('New'), 'de': unit('Neu')}}
+        theirs['strings']['New'] = {'localizations': {'en': unit('New'), 'fr': unit('Nouveau')}}
+        merged, _, conflicts = merge_catalogs(BASE, ours, theirs)
+        self.assertEqual(conflicts, [])
+        self.assertEqual(sorted(merged['strings']['New']['localizations']), ['de', 'en', 'fr'])
+
+    def test_catalog_field_conflict_has_no_key(self):
+        ours = {**BASE, 'version': '1.1'}
+        theirs = {**BASE, 'version': '2.0'}
+        merged, _, conflicts = merge_catalogs(BASE, ours, theirs)
+        self.assertEqual(merged['version'], '1.1')
+        self.assertEqual([(conflict.key, conflict.field) for conflict in conflicts], [(None, 'version')])
+
+
+class RunMergeTest(unittest.TestCase):
+
+    def setUp(self):
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        self.directory = Path(directory.name)
+
+    def write(self, name, data):
+        path = self.directory / name
+        path.write_text(format_xcstrings(data), encoding='utf-8')
+        return path
+
+    def merge(self, base, ours, theirs):
+        paths = self.write('base', base), self.write('ours', ours), self.write('theirs', theirs)
+        with contextlib.redirect_stdout(io.StringIO()):
+            status = run_merge(*paths, path='Localizable.xcstrings')
+        return status, paths[1].read_bytes()
+
+    def test_clean_merge_exits_0_and_writes_xcode_layout(self):
+        ours = edit(BASE, 'Hello', 'de', value='Guten Tag')
+        theirs = edit(BASE, 'Bye', 'de', value='Ciao')
+        status, content = self.merge(BASE, ours, theirs)
+        self.assertEqual(status, 0)
+        expected = edit(ours, 'Bye', 'de', value='Ciao')
+        self.assertEqual(content, format_xcstrings(expected).encode('utf-8'))
+
+    def test_keys_removed_at_the_end_by_theirs_leave_valid_json(self):
+        base = catalog(Apple={'localizations': {'en': unit('Apple')}}, **BASE['strings'])
+        theirs = catalog(Apple=base['strings']['Apple'])
+        paths = self.write('base', base), self.write('ours', base), self.write('theirs', theirs)
+        output = io.StringIO()
+        with contextlib.redirect_stdout(output):
+            status = run_merge(*paths, path='Localizable.xcstrings', output_format='json')
+        self.assertEqual(status, 0)
+        content = paths[1].read_bytes()
+        self.assertEqual(json.loads(content), theirs)
+        self.assertEqual(content, format_xcstrings(theirs).encode('utf-8'))
+        report = json.loads(output.getvalue())
+        self.assertEqual((report['merged_keys'], report['removed_keys']), (0, 2))
+
+    def test_conflict_exits_1_and_keeps_ours(self):
+        ours = edit(BASE, 'Hello', 'de', value='Guten Tag')
+        theirs = edit(BASE, 'Hello', 'de', value='Servus')
+        status, content = self.merge(BASE, ours, theirs)
+        self.assertEqual(status, 1)
+        self.assertEqual(content, format_xcstrings(ours).encode('utf-8'))
+
+    def test_unreadable_version_exits_2_and_leaves_ours(self):
+        ours = self.write('ours', BASE)
+        broken = self.directory / 'theirs'
+        broken.write_text('{', encoding='utf-8')
+        with contextlib.redirect_stderr(io.StringIO()):
+            status = run_merge(self.write('base', BASE), ours, broken)
+        self.assertEqual(status, 2)
+        self.assertEqual(ours.read_text(encoding='utf-8'), format_xcstrings(BASE))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,52 @@
+"""
+Format Placeholder Tests
+Signatures of printf-style specifiers, including positional and aliased
+forms, and the per-cell parity check against the source
+"""
+
+import unittest
+
+from localization_placeholders import describe_signature, format_signature, mismatched_cells
+
+
+class FormatSignatureTest(unittest.TestCase):
+
+    def test_sequential_specifiers_are_numbered_from_one(self):
+        self.assertEqual(format_signature('%@ has %lld items'), ((1, '@'), (2, 'lld')))
+
+    def test_positional_specifiers_match_their_sequential_form(self):
+        self.assertEqual(format_signature('%2$lld Einträge für %1$@'), format_signature('%@ %lld'))
+
+    def test_flags_width_and_precision_do_not_change_the_type(self):
+        self.assertEqual(format_signature('%-08.2f'), ((1, 'f'),))
+        self.assertEqual(format_signature('%*d'), ((1, 'd'),))
+
+    def test_aliases_are_normalized(self):
+        self.assertEqual(format_signature('%qd %ld %lld'), format_signature('%lld %lld %lld'))
+        self.assertEqual(format_signature('%i %D'), format_signature('%d %d'))
+
+    def test_literal_percent_and_plain_text_have_no_arguments(self):
+        self.assertEqual(format_signature('100%% done'), ())
+        self.assertEqual(format_signature('No placeholders'), ())
+
+    def test_describe_signature(self):
+        self.assertEqual(describe_signature(format_signature('%@ %lld')), '%1$@ %2$lld')
+        self.assertEqual(describe_signature(()), '(none)')
+
+
+class MismatchedCellsTest(unittest.TestCase):
+
+    def test_matching_values_pass(self):
+        values = ['%@ hat %lld Einträge', '%2$lld éléments pour %1$@', '%1$@ に %2$qd 件']
+        self.assertEqual(mismatched_cells('%@ has %lld items', values), [])
+
+    def test_dropped_added_and_retyped_arguments_are_reported(self):
+        values = ['%@ hat Einträge', '%@ a %lld éléments %@', '%@ tiene %d elementos', None]
+        self.assertEqual(mismatched_cells('%@ has %lld items', values), [0, 1, 2])
+
+    def test_source_without_specifiers(self):
+        self.assertEqual(mismatched_cells('Save', ['Speichern', '100%% sicher', 'Save %@']), [2])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,55 @@
+"""
+Translation Quality Tests
+Column-wide bit masks for copies of the source text, values in the wrong
+script for their locale and texts with no letters at all
+"""
+
+import unittest
+
+from localization_quality import copy_bits, letter_bits, wrong_script_bits
+
+
+def rows(bits, count):
+    """Indexes of the set bytes in a packed per-key mask."""
+    return [row for row, flag in enumerate(bits.to_bytes(count, 'big')) if flag]
+
+
+class CopyBitsTest(unittest.TestCase):
+
+    def test_values_equal_to_the_source_are_flagged(self):
+        source = ['Save', 'Open', 'OK', 'Close']
+        column = ['Speichern', 'Open', 'OK', None]
+        self.assertEqual(rows(copy_bits(column, source), 4), [1, 2])
+
+
+class WrongScriptBitsTest(unittest.TestCase):
+
+    def test_latin_values_in_non_latin_locales_are_flagged(self):
+        column = ['保存', 'Save', '2025', 'iPhone を開く', '']
+        self.assertEqual(rows(wrong_script_bits('ja', column), len(column)), [1])
+
+    def test_each_locale_checks_its_own_script(self):
+        column = ['مرحبا', 'नमस्ते', '안녕하세요', '你好']
+        self.assertEqual(rows(wrong_script_bits('ar', column), 4), [])
+        self.assertEqual(rows(wrong_script_bits('ko', ['Hello', *column]), 5), [0])
+        # Hangul has no Latin letters, so only Latin values count as the wrong script
+        self.assertEqual(rows(wrong_script_bits('zh-Hans', ['Hello', '안녕']), 2), [0])
+
+    def test_latin_locales_are_never_flagged(self):
+        self.assertEqual(wrong_script_bits('de', ['Hello', 'こんにちは']), 0)
+
+    def test_separator_inside_a_value_does_not_shift_rows(self):
+        column = ['Save\x00Open', '保存', 'Save']
+        self.assertEqual(rows(wrong_script_bits('ja', column), 3), [0, 2])
+
+
+class LetterBitsTest(unittest.TestCase):
+
+    def test_texts_without_letters_are_cleared(self):
+        texts = ['Save', '2025.12.1', '•', '保存', '', '%lld', None]
+        # None is scanned as the text 'None'; callers mask absent cells out
+        self.assertEqual(rows(letter_bits(texts), len(texts)), [0, 3, 5, 6])
+
+
+if __name__ == "__main__":
+    unittest.main()
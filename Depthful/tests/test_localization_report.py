@@ -0,0 +1,125 @@
+"""
+Report Record Tests
+Fields of the JSON and NDJSON records the tools emit, and where their
+progress messages go when stdout carries JSON
+"""
+
+import contextlib
+import io
+import json
+import unittest
+from pathlib import Path
+
+from localization_catalog import Catalog, analyze_completeness
+from localization_changeset import Operation
+from localization_merge import Conflict
+from localization_report import (
+    SCHEMA_VERSION,
+    analysis_document,
+    change_record,
+    conflict_record,
+    finding_records,
+    fix_record,
+    progress_to_stderr,
+    summary_record,
+    write_json,
+    write_records,
+)
+
+PATH = Path('App/Localizable.xcstrings')
+LANGUAGES = ['en', 'de', 'ja']
+
+
+def unit(value, state='translated'):
+    return {'stringUnit': {'state': state, 'value': value}}
+
+
+# Save is copied into German and Japanese, Open only has English and
+# Internal is never translated
+CATALOG = Catalog.from_data({'sourceLanguage': 'en', 'version': '1.0', 'strings': {
+    'Save': {'localizations': {'en': unit('Save'), 'de': unit('Save'), 'ja': unit('Save')}},
+    'Open': {'localizations': {'en': unit('Open')}},
+    'Internal': {'shouldTranslate': False},
+}})
+
+
+class SummaryRecordTest(unittest.TestCase):
+
+    def test_counters(self):
+        record = summary_record('status', PATH, analyze_completeness(CATALOG, LANGUAGES))
+        self.assertEqual((record['schema'], record['type'], record['tool'], record['path']),
+                         (SCHEMA_VERSION, 'summary', 'status', str(PATH)))
+        self.assertEqual((record['total_keys'], record['translatable_keys'], record['should_not_translate'],
+                          record['complete_keys'], record['incomplete_keys']), (3, 2, 1, 1, 1))
+        self.assertEqual(record['completion_percentage'], 50.0)
+        self.assertEqual((record['true_complete_keys'], record['true_completion_percentage']), (0, 0.0))
+
+    def test_true_completion_is_left_out_when_values_were_not_checked(self):
+        record = summary_record('status', PATH, analyze_completeness(CATALOG, LANGUAGES, check_values=False))
+        self.assertNotIn('true_complete_keys', record)
+        self.assertNotIn('true_completion_percentage', record)
+
+
+class AnalysisRecordsTest(unittest.TestCase):
+
+    def setUp(self):
+        self.analysis = analyze_completeness(CATALOG, LANGUAGES)
+
+    def test_findings_are_one_record_per_kind_language_and_key(self):
+        findings = [(record['kind'], record['language'], record['key'])
+                    for record in finding_records(PATH, self.analysis)]
+        self.assertEqual(findings, [('untranslated_copies', 'de', 'Save'),
+                                    ('untranslated_copies', 'ja', 'Save'),
+                                    ('wrong_script', 'ja', 'Save')])
+
+    def test_analysis_document_lists_incomplete_keys_and_findings(self):
+        document = analysis_document('analyze', PATH, self.analysis)
+        self.assertEqual(document['incomplete'], [{'key': 'Open', 'missing_languages': ['de', 'ja']}])
+        self.assertEqual(document['wrong_script'], {'ja': ['Save']})
+        self.assertEqual(document['placeholder_mismatches'], {})
+
+
+class OtherRecordsTest(unittest.TestCase):
+
+    def test_change_record(self):
+        record = change_record(PATH, Operation('add', 'Open', 'de', 'Öffnen', 'needs_review'))
+        self.assertEqual({field: record[field] for field in ('type', 'op', 'key', 'language', 'value', 'state')},
+                         {'type': 'change', 'op': 'add', 'key': 'Open', 'language': 'de',
+                          'value': 'Öffnen', 'state': 'needs_review'})
+
+    def test_fix_record_without_verification(self):
+        record = fix_record(PATH, {'completion_percentage': 50.0}, None, 2, dry_run=True, saved=False)
+        self.assertEqual((record['completion_before'], record['completion_after'], record['change_count']),
+                         (50.0, None, 2))
+
+    def test_conflict_record(self):
+        conflict = Conflict('Hello', 'stringUnit.value', 'de', 'Hallo', 'Guten Tag', 'Servus', 'Guten Tag')
+        record = conflict_record('Localizable.xcstrings', conflict)
+        self.assertEqual((record['type'], record['key'], record['language'], record['resolved']),
+                         ('conflict', 'Hello', 'de', 'Guten Tag'))
+
+
+class WritersTest(unittest.TestCase):
+
+    def test_records_are_written_one_compact_line_each(self):
+        stream = io.StringIO()
+        write_records([{'key': 'Größe'}, {'key': 'b', 'languages': ['de']}], stream)
+        self.assertEqual(stream.getvalue(), '{"key":"Größe"}\n{"key":"b","languages":["de"]}\n')
+
+    def test_json_document_is_indented_and_unescaped(self):
+        stream = io.StringIO()
+        write_json({'key': 'こんにちは'}, stream)
+        self.assertEqual(stream.getvalue(), '{\n  "key": "こんにちは"\n}\n')
+        self.assertEqual(json.loads(stream.getvalue()), {'key': 'こんにちは'})
+
+    def test_progress_moves_to_stderr_for_machine_formats(self):
+        for output_format, expected in (('text', ('progress\n', '')), ('json', ('', 'progress\n'))):
+            stdout, stderr = io.StringIO(), io.StringIO()
+            with contextlib.redirect_stdout(stdout), contextlib.redirect_stderr(stderr):
+                with progress_to_stderr(output_format):
+                    print("progress")
+            self.assertEqual((stdout.getvalue(), stderr.getvalue()), expected)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,166 @@
+"""
+Swift Scanner Tests
+Key extraction from Swift call sites, the per-file scan cache and the
+cross reference against the catalog
+"""
+
+import contextlib
+import io
+import tempfile
+import unittest
+from pathlib import Path
+
+from localization_catalog import Catalog
+from localization_scanner import (
+    KIND_LOCALIZED,
+    KIND_LOCALIZED_WITH,
+    KIND_NSLOCALIZED,
+    KIND_STRING_LOCALIZED,
+    KIND_SWIFTUI,
+    CallSite,
+    UsageIndex,
+    compare_with_catalog,
+    extract_keys,
+    find_swift_files,
+    scan_content,
+    scan_sources,
+)
+
+
+def keys(source):
+    return [(key, kind) for key, _, kind, _ in extract_keys(source)]
+
+
+class ExtractKeysTest(unittest.TestCase):
+
+    def test_call_site_kinds(self):
+        source = '\n'.join([
+            'Text("Hello")',
+            'Button("Save", action: save)',
+            'let title = NSLocalizedString("Title", comment: "")',
+            'let name = String(localized: "Name")',
+            'label.text = "Welcome".localized',
+            'label.text = "Count %d".localized(with: count)',
+        ])
+        self.assertEqual(extract_keys(source), [
+            ('Hello', 1, KIND_SWIFTUI, False),
+            ('Save', 2, KIND_SWIFTUI, False),
+            ('Title', 3, KIND_NSLOCALIZED, False),
+            ('Name', 4, KIND_STRING_LOCALIZED, False),
+            ('Welcome', 5, KIND_LOCALIZED, False),
+            ('Count %d', 6, KIND_LOCALIZED_WITH, False),
+        ])
+
+    def test_plain_strings_and_other_calls_are_ignored(self):
+        source = 'let a = "Hello"\nprint("Debug")\nText(verbatim: "Raw")\nText("Part" + suffix)'
+        self.assertEqual(keys(source), [])
+
+    def test_comments_are_skipped(self):
+        source = '// Text("Line")\n/* Text("Block") /* nested */ Text("Still") */\nText("Real")'
+        self.assertEqual(extract_keys(source), [('Real', 3, KIND_SWIFTUI, False)])
+
+    def test_escapes_and_raw_strings_are_decoded(self):
+        source = r'Text("Say \"hi\"\t\u{1F600}")' + '\n' + r'Text(#"C:\path \#(name)"#)'
+        self.assertEqual(extract_keys(source), [
+            ('Say "hi"\t\U0001F600', 1, KIND_SWIFTUI, False),
+            ('C:\\path %@', 2, KIND_SWIFTUI, True),
+        ])
+
+    def test_interpolation_becomes_a_placeholder(self):
+        source = r'Text("Hello \(user.name(for: "x")), you have \(count) items")'
+        self.assertEqual(extract_keys(source),
+                         [('Hello %@, you have %@ items', 1, KIND_SWIFTUI, True)])
+
+    def test_multiline_strings_drop_the_closing_indentation(self):
+        source = 'Text("""\n    First\n      Second\n    """)\nText("After")'
+        self.assertEqual(extract_keys(source), [
+            ('First\n  Second', 1, KIND_SWIFTUI, False),
+            ('After', 5, KIND_SWIFTUI, False),
+        ])
+
+    def test_unterminated_or_undecodable_sources_yield_nothing(self):
+        with contextlib.redirect_stderr(io.StringIO()) as errors:
+            self.assertEqual(scan_content(b'Text("Open', 'Broken.swift'), [])
+            self.assertEqual(scan_content(b'Text("\xff")', 'Binary.swift'), [])
+        self.assertIn("Broken.swift", errors.getvalue())
+
+
+class ScanSourcesTest(unittest.TestCase):
+
+    def setUp(self):
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        self.root = Path(directory.name)
+        self.cache_dir = self.root / 'cache'
+
+    def write(self, name, source):
+        path = self.root / name
+        path.parent.mkdir(parents=True, exist_ok=True)
+        path.write_text(source, encoding='utf-8')
+        return path
+
+    def scan(self):
+        return scan_sources(self.root, jobs=1, cache_dir=self.cache_dir)
+
+    def test_build_and_hidden_directories_are_skipped(self):
+        self.write('App/ContentView.swift', 'Text("A")')
+        self.write('App/Notes.txt', 'Text("B")')
+        for skipped in ('build', 'DerivedData', 'Pods', '.git'):
+            self.write(f'{skipped}/Generated.swift', 'Text("C")')
+        self.assertEqual(find_swift_files(self.root), [self.root / 'App/ContentView.swift'])
+
+    def test_sites_are_recorded_relative_to_the_root(self):
+        self.write('App/A.swift', 'Text("Hello")\nText("Bye")')
+        self.write('App/B.swift', '\n\nText("Hello")')
+        index = self.scan()
+        self.assertEqual(len(index), 2)
+        self.assertEqual([(site.file, site.line) for site in index.sites['Hello']],
+                         [('App/A.swift', 1), ('App/B.swift', 3)])
+
+    def test_unchanged_files_come_from_the_cache(self):
+        self.write('A.swift', 'Text("Hello")')
+        self.write('B.swift', 'Text("Hello")')
+        first = self.scan()
+        # Identical contents are parsed once
+        self.assertEqual((first.scanned_files, first.parsed_files), (2, 1))
+
+        second = self.scan()
+        self.assertEqual((second.scanned_files, second.parsed_files), (0, 0))
+        self.assertEqual(second.sites, first.sites)
+
+        self.write('B.swift', 'Text("Changed")')
+        third = self.scan()
+        self.assertEqual((third.scanned_files, third.parsed_files), (1, 1))
+        self.assertEqual(sorted(third.sites), ['Changed', 'Hello'])
+
+
+class CompareWithCatalogTest(unittest.TestCase):
+
+    def setUp(self):
+        self.catalog = Catalog.from_data({'sourceLanguage': 'en', 'version': '1.0', 'strings': {
+            'Hello': {}, 'Unused': {}, 'Internal': {'shouldTranslate': False},
+            '%lld items': {}, 'Hello %@': {},
+        }})
+
+    def compare(self, *calls):
+        index = UsageIndex()
+        for call in calls:
+            for key, line, kind, interpolated in extract_keys(call):
+                index.add(key, CallSite('View.swift', line, kind), interpolated)
+        return compare_with_catalog(index, self.catalog)
+
+    def test_missing_and_unreferenced_keys(self):
+        usage = self.compare('Text("Hello")', 'Text("Goodbye")')
+        self.assertEqual(usage['used_keys'], 2)
+        self.assertEqual(usage['missing_from_catalog'], ['Goodbye'])
+        # Untranslatable keys are never reported; the rest keep catalog order
+        self.assertEqual(usage['unreferenced_keys'], ['Unused', '%lld items', 'Hello %@'])
+
+    def test_interpolations_match_typed_format_specifiers(self):
+        usage = self.compare(r'Text("\(count) items")', r'Text("Hello \(name)")', r'Text("\(value)")')
+        self.assertEqual(usage['missing_from_catalog'], [])
+        self.assertEqual(usage['unreferenced_keys'], ['Hello', 'Unused'])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,73 @@
+"""
+Status Checker Tests
+Exit codes and messages of the standalone status script, and the true
+completion fields it only reports when asked to
+"""
+
+import contextlib
+import io
+import json
+import tempfile
+import unittest
+from pathlib import Path
+
+from localization_status import main
+from localization_writer import format_xcstrings
+
+
+def unit(value):
+    return {'stringUnit': {'state': 'translated', 'value': value}}
+
+
+# Every expected language is present, but German is a copy of the source,
+# which only the value checks notice
+GREETINGS = {
+    'ar': 'مرحبا', 'de': 'Hello', 'en': 'Hello', 'es': 'Hola', 'fr': 'Bonjour', 'hi': 'नमस्ते',
+    'ja': 'こんにちは', 'ko': '안녕하세요', 'pt': 'Olá', 'zh-Hans': '你好',
+}
+CATALOG = {'sourceLanguage': 'en', 'version': '1.0', 'strings': {
+    'Hello': {'localizations': {lang: unit(value) for lang, value in GREETINGS.items()}},
+}}
+
+
+class StatusMainTest(unittest.TestCase):
+
+    def setUp(self):
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        self.catalog = Path(directory.name) / "App.xcstrings"
+        self.catalog.write_text(format_xcstrings(CATALOG), encoding='utf-8')
+
+    def run_main(self, *arguments):
+        output = io.StringIO()
+        with contextlib.redirect_stdout(output), contextlib.redirect_stderr(io.StringIO()):
+            try:
+                main(list(arguments))
+                status = 0
+            except SystemExit as e:
+                status = e.code
+        return status, output.getvalue()
+
+    def test_missing_catalog_exits_1_and_names_it(self):
+        missing = self.catalog.with_name("Missing.xcstrings")
+        status, output = self.run_main(str(missing))
+        self.assertEqual(status, 1)
+        self.assertIn(str(missing), output)
+
+    def test_given_catalog_is_checked(self):
+        status, output = self.run_main(str(self.catalog))
+        self.assertEqual(status, 0)
+        self.assertIn("Total strings: 1", output)
+        self.assertNotIn("True completion", output)
+
+    def test_true_completion_is_opt_in(self):
+        _, output = self.run_main(str(self.catalog), '--format', 'json')
+        record = json.loads(output)
+        self.assertEqual(record['complete_keys'], 1)
+        self.assertNotIn('true_complete_keys', record)
+        _, output = self.run_main(str(self.catalog), '--format', 'json', '--true-completion')
+        self.assertEqual(json.loads(output)['true_complete_keys'], 0)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,98 @@
+"""
+Translation Store Tests
+Lookups through the LRU and SQLite, importing a translation memory, and
+how the fixer states hits that only the store knows about
+"""
+
+import tempfile
+import unittest
+from pathlib import Path
+
+from localization_catalog import Catalog
+from localization_fixer import lookup_language
+from localization_memory import TranslationMemory
+from localization_store import HUMAN_PROVIDER, TranslationStore
+
+
+def catalog(path, **strings):
+    return Catalog.from_data({'sourceLanguage': 'en', 'version': '1.0', 'strings': strings},
+                             path=Path(path))
+
+
+def localized(**values):
+    return {'localizations': {lang: {'stringUnit': {'state': 'translated', 'value': value}}
+                              for lang, value in values.items()}}
+
+
+class StoreTestCase(unittest.TestCase):
+
+    def setUp(self):
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        self.path = Path(directory.name) / 'translations.sqlite3'
+        self.store = TranslationStore(self.path)
+        self.addCleanup(self.store.close)
+
+
+class TranslationStoreTest(StoreTestCase):
+
+    def test_lookups_normalize_the_source(self):
+        self.store.put('Delete  entry', 'de', 'mt', 'Eintrag löschen', 'needs_review')
+        self.assertEqual(self.store.get(' Delete entry ', 'de', 'mt'), ('Eintrag löschen', 'needs_review'))
+        self.assertIsNone(self.store.get('Delete entry', 'fr', 'mt'))
+        self.assertIsNone(self.store.get('Delete entry', 'de', HUMAN_PROVIDER))
+
+    def test_get_many_returns_only_stored_sources(self):
+        count = self.store.put_many([('Save', 'de', 'mt', 'Speichern', 'translated'),
+                                     ('Open', 'de', 'mt', 'Öffnen', 'translated')])
+        self.assertEqual(count, 2)
+        self.assertEqual(self.store.get_many(['Save', 'Close', 'Open'], 'de', 'mt'),
+                         {'Save': ('Speichern', 'translated'), 'Open': ('Öffnen', 'translated')})
+
+    def test_rows_survive_reopening_and_absent_lookups_are_refreshed(self):
+        self.assertIsNone(self.store.get('Save', 'de', 'mt'))
+        self.store.put('Save', 'de', 'mt', 'Speichern')
+        self.assertEqual(self.store.get('Save', 'de', 'mt'), ('Speichern', 'translated'))
+        with TranslationStore(self.path) as reopened:
+            self.assertEqual(reopened.get_many(['Save'], 'de', 'mt'), {'Save': ('Speichern', 'translated')})
+
+    def test_lru_is_bounded(self):
+        store = TranslationStore(self.path, capacity=2)
+        self.addCleanup(store.close)
+        store.put_many([(source, 'de', 'mt', source.upper(), 'translated') for source in ('a', 'b', 'c')])
+        self.assertEqual(len(store._lru), 2)
+        self.assertEqual(store.get('a', 'de', 'mt'), ('A', 'translated'))
+
+
+class ImportMemoryTest(StoreTestCase):
+
+    def test_human_translations_are_imported_once_per_catalog_version(self):
+        path = self.path.with_name('App.xcstrings')
+        memory = TranslationMemory()
+
+        def ingest(**strings):
+            path.write_text(str(strings), encoding='utf-8')
+            memory.update_from_catalog(catalog(path, **strings))
+
+        ingest(Save=localized(en='Save', de='Speichern'))
+        self.assertEqual(self.store.import_memory(memory), 1)
+        self.assertEqual(self.store.get('Save', 'de', HUMAN_PROVIDER), ('Speichern', 'translated'))
+        self.assertEqual(self.store.import_memory(memory), 0)
+
+        ingest(Save=localized(en='Save', de='Speichern', fr='Enregistrer'), Open=localized(en='Open', de='Öffnen'))
+        self.assertEqual(self.store.import_memory(memory), 3)
+        self.assertEqual(self.store.get('Open', 'de', HUMAN_PROVIDER), ('Öffnen', 'translated'))
+
+
+class FixerLookupTest(StoreTestCase):
+
+    def test_store_only_hits_are_proposed_for_review(self):
+        self.store.put('Save', 'de', HUMAN_PROVIDER, 'Sichern')
+        memory = TranslationMemory()
+        memory.add_catalog(catalog('/app/Localizable.xcstrings', Open=localized(en='Open', de='Öffnen')))
+        found = lookup_language('de', [('Save', 'Save'), ('Open', 'Open'), ('Close', 'Close')], memory, self.store)
+        self.assertEqual(found, [('Sichern', 'needs_review'), ('Öffnen', 'translated'), None])
+
+
+if __name__ == "__main__":
+    unittest.main()
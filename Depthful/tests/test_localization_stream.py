@@ -0,0 +1,115 @@
+"""
+Streaming Parser Tests
+Tokens split across chunk boundaries, the cell records of each key, and
+streamed counts matching the counts of a parsed catalog
+"""
+
+import io
+import json
+import tempfile
+import unittest
+from pathlib import Path
+
+from localization_catalog import Catalog, analyze_completeness
+from localization_stream import (
+    END_MAP,
+    KEY,
+    LITERAL,
+    START_MAP,
+    STRING,
+    CellRecord,
+    iter_cells,
+    iter_events,
+    stream_completeness,
+)
+from localization_writer import format_xcstrings
+
+REPOSITORY_CATALOG = Path(__file__).resolve().parent.parent / "Localizable.xcstrings"
+
+
+def unit(value, state='translated'):
+    return {'stringUnit': {'state': state, 'value': value}}
+
+
+DATA = {'sourceLanguage': 'en', 'version': '1.0', 'strings': {
+    '': {'shouldTranslate': False},
+    'Quote " and \\u00e9': {'localizations': {'en': unit('Quote " and é'), 'de': unit('Zitat', 'needs_review')}},
+    '%lld items': {'localizations': {
+        'en': unit('%lld items'),
+        'de': {'variations': {'plural': {'one': unit('%lld Eintrag'), 'other': unit('%lld Einträge')}}},
+        'fr': {'stringUnit': {'value': 'éléments'}},
+    }},
+    'Logo': {'localizations': {'en': unit('Logo')}, 'shouldTranslate': False},
+}}
+
+
+class EventTest(unittest.TestCase):
+
+    def events(self, text, chunk_size):
+        return list(iter_events(io.StringIO(text), chunk_size))
+
+    def test_chunk_boundaries_do_not_change_the_events(self):
+        text = format_xcstrings(DATA)
+        expected = self.events(text, 1 << 20)
+        for chunk_size in (1, 2, 3, 7, 64):
+            self.assertEqual(self.events(text, chunk_size), expected, chunk_size)
+
+    def test_keys_strings_and_literals(self):
+        events = self.events('{"a" : [true, -1.5e3], "b" : "x\\"y"}', 4)
+        self.assertEqual(events[:2], [(START_MAP, '{'), (KEY, '"a"')])
+        self.assertIn((LITERAL, 'true'), events)
+        self.assertIn((LITERAL, '-1.5e3'), events)
+        self.assertEqual(events[-2:], [(STRING, '"x\\"y"'), (END_MAP, '}')])
+
+    def test_truncated_input_is_an_error(self):
+        with self.assertRaises(ValueError):
+            self.events('{"a" : "unterminated', 8)
+        with self.assertRaises(ValueError):
+            self.events('{"a" : @}', 8)
+
+
+class StreamCatalogTest(unittest.TestCase):
+
+    def setUp(self):
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        self.path = Path(directory.name) / "Localizable.xcstrings"
+        self.path.write_text(format_xcstrings(DATA), encoding='utf-8')
+
+    def test_one_record_per_cell_with_decoded_keys(self):
+        records = sorted(iter_cells(self.path), key=lambda record: (record.key, record.language or ''))
+        self.assertEqual(records, [
+            CellRecord('', False, None, None),
+            CellRecord('%lld items', True, 'de', None),
+            CellRecord('%lld items', True, 'en', 'translated'),
+            CellRecord('%lld items', True, 'fr', ''),
+            CellRecord('Logo', False, 'en', 'translated'),
+            CellRecord('Quote " and \\u00e9', True, 'de', 'needs_review'),
+            CellRecord('Quote " and \\u00e9', True, 'en', 'translated'),
+        ])
+
+    def assertCountsMatchParse(self, path):
+        streamed = stream_completeness(path)
+        parsed = analyze_completeness(Catalog.from_data(json.loads(path.read_bytes())), check_values=False)
+        for field in ('total_keys', 'complete_keys', 'should_not_translate', 'completion_percentage',
+                      'language_coverage', 'state_counts'):
+            self.assertEqual(streamed[field], parsed[field], field)
+        self.assertNotIn('true_completion_percentage', streamed)
+
+    def test_counts_match_a_parsed_catalog(self):
+        self.assertCountsMatchParse(self.path)
+
+    @unittest.skipUnless(REPOSITORY_CATALOG.exists(), "repository catalog not found")
+    def test_counts_match_for_the_repository_catalog(self):
+        self.assertCountsMatchParse(REPOSITORY_CATALOG)
+
+    def test_incomplete_keys_are_reported_with_missing_languages(self):
+        seen = {}
+        stream_completeness(self.path, {'en', 'de'}, lambda key, missing: seen.update({key: missing}))
+        self.assertEqual(seen, {})
+        stream_completeness(self.path, {'en', 'ja'}, lambda key, missing: seen.update({key: missing}))
+        self.assertEqual(seen, {'Quote " and \\u00e9': ['ja'], '%lld items': ['ja']})
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,105 @@
+"""
+Machine Translation Client Tests
+HTTPTranslationProvider and translate_cells against the local stub server,
+including retries, batching and the translation store
+"""
+
+import asyncio
+import contextlib
+import io
+import tempfile
+import unittest
+from pathlib import Path
+
+from localization_mt_stub import start_stub_server
+from localization_store import TranslationStore
+from localization_translate import (
+    MACHINE_STATE,
+    HTTPTranslationProvider,
+    TranslationError,
+    TranslationProvider,
+    translate_cells,
+)
+
+
+class StubServerTestCase(unittest.TestCase):
+    fail_first = 0
+
+    def setUp(self):
+        self.server = start_stub_server(fail_first=self.fail_first)
+        self.addCleanup(self.server.server_close)
+        self.addCleanup(self.server.shutdown)
+        self.provider = HTTPTranslationProvider(self.server.url, timeout=5)
+
+    def translate(self, cells, **options):
+        options.setdefault('backoff', 0)
+        output = io.StringIO()
+        with contextlib.redirect_stdout(output):
+            results = translate_cells(self.provider, cells, **options)
+        return results, output.getvalue()
+
+
+class HTTPTranslationProviderTest(StubServerTestCase):
+
+    def test_translate_batch_keeps_order(self):
+        texts = ['One', 'Two', 'Größe & "quotes"']
+        translations = asyncio.run(self.provider.translate_batch(texts, 'en', 'de'))
+        self.assertEqual(translations, [f"[de] {text}" for text in texts])
+        self.assertEqual(self.server.requests, [('de', 3)])
+
+    def test_unreachable_endpoint_is_retryable(self):
+        self.server.shutdown()
+        self.server.server_close()
+        with self.assertRaises(TranslationError) as raised:
+            asyncio.run(self.provider.translate_batch(['One'], 'en', 'de'))
+        self.assertTrue(raised.exception.retryable)
+
+    def test_provider_must_implement_translate_batch(self):
+        with self.assertRaises(TypeError):
+            TranslationProvider()
+
+
+class TranslateCellsTest(StubServerTestCase):
+
+    def test_one_request_per_language_with_duplicates_removed(self):
+        results, _ = self.translate({'de': ['Save', 'Open', 'Save'], 'fr': ['Save']})
+        self.assertEqual(results, {('Save', 'de'): '[de] Save', ('Open', 'de'): '[de] Open',
+                                   ('Save', 'fr'): '[fr] Save'})
+        self.assertEqual(sorted(self.server.requests), [('de', 2), ('fr', 1)])
+
+    def test_large_batches_are_split(self):
+        self.provider.max_batch_size = 2
+        sources = [f"Text {n}" for n in range(5)]
+        results, _ = self.translate({'ja': sources})
+        self.assertEqual(len(results), 5)
+        self.assertEqual(sorted(count for _, count in self.server.requests), [1, 2, 2])
+
+    def test_stored_translations_are_not_requested_again(self):
+        with tempfile.TemporaryDirectory() as directory:
+            with TranslationStore(Path(directory) / 'translations.sqlite') as store:
+                first, _ = self.translate({'de': ['Save', 'Open']}, store=store)
+                second, _ = self.translate({'de': ['Save', 'Open', 'Close']}, store=store)
+                stored = store.get_many(['Save'], 'de', self.provider.key)
+        self.assertEqual(second, {**first, ('Close', 'de'): '[de] Close'})
+        self.assertEqual(self.server.requests, [('de', 2), ('de', 1)])
+        self.assertEqual(stored, {'Save': ('[de] Save', MACHINE_STATE)})
+
+
+class RetryTest(StubServerTestCase):
+    fail_first = 2
+
+    def test_transient_failures_are_retried(self):
+        results, output = self.translate({'de': ['Save']}, retries=3)
+        self.assertEqual(results, {('Save', 'de'): '[de] Save'})
+        self.assertEqual(len(self.server.requests), 3)
+        self.assertEqual(output, '')
+
+    def test_a_language_that_keeps_failing_is_left_out(self):
+        results, output = self.translate({'de': ['Save']}, retries=1)
+        self.assertEqual(results, {})
+        self.assertEqual(len(self.server.requests), 2)
+        self.assertIn("Machine translation failed for de", output)
+
+
+if __name__ == "__main__":
+    unittest.main()
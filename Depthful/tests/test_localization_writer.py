@@ -0,0 +1,144 @@
+"""
+Catalog Writer Tests
+Round trips through the Xcode-compatible writer must reproduce the input
+byte for byte, and spliced edits must equal a full re-encode
+"""
+
+import contextlib
+import io
+import json
+import tempfile
+import unittest
+from pathlib import Path
+
+from localization_writer import (
+    format_xcstrings,
+    index_entries,
+    read_entries,
+    save_fixed_file,
+    splice_entries,
+    xcode_sort_key,
+)
+
+REPOSITORY_CATALOG = Path(__file__).resolve().parent.parent / "Localizable.xcstrings"
+
+SAMPLE = {
+    'sourceLanguage': 'en',
+    'strings': {
+        '': {'shouldTranslate': False},
+        '%lld items': {
+            'localizations': {
+                'de': {'variations': {'plural': {
+                    'one': {'stringUnit': {'state': 'translated', 'value': '%lld Eintrag'}},
+                    'other': {'stringUnit': {'state': 'translated', 'value': '%lld Einträge'}},
+                }}},
+            },
+        },
+        'Item 2': {'comment': 'Quote " and backslash \\ and tab \t', 'localizations': {}},
+        'Item 10': {'extractionState': 'manual', 'localizations': {
+            'ja': {'stringUnit': {'state': 'new', 'value': '項目 10 🎉'}},
+        }},
+        'List': {'localizations': {'en': {'stringUnit': {'state': 'translated', 'value': 'List'}}},
+                 'tags': []},
+    },
+    'version': '1.0',
+}
+
+
+class RoundTripTest(unittest.TestCase):
+
+    def assertRoundTrips(self, content: bytes):
+        self.assertEqual(format_xcstrings(json.loads(content)).encode('utf-8'), content)
+
+    @unittest.skipUnless(REPOSITORY_CATALOG.exists(), "repository catalog not found")
+    def test_repository_catalog_is_byte_identical(self):
+        self.assertRoundTrips(REPOSITORY_CATALOG.read_bytes())
+
+    def test_sample_catalog_is_byte_identical(self):
+        content = format_xcstrings(SAMPLE).encode('utf-8')
+        self.assertRoundTrips(content)
+        self.assertIn(b'"tags" : [\n\n', content)
+        self.assertIn('項目 10 🎉'.encode('utf-8'), content)
+        self.assertFalse(content.endswith(b'\n'))
+
+    def test_empty_catalog(self):
+        self.assertRoundTrips(format_xcstrings({'sourceLanguage': 'en', 'strings': {}}).encode('utf-8'))
+
+    def test_entries_are_indexed_with_their_exact_spans(self):
+        data = {**SAMPLE, 'strings': dict(sorted(SAMPLE['strings'].items(),
+                                                 key=lambda item: xcode_sort_key(item[0])))}
+        content = format_xcstrings(data).encode('utf-8')
+        spans = index_entries(content)
+        self.assertEqual([key for key, _, _ in spans], list(data['strings']))
+        self.assertEqual(read_entries(content, spans, list(data['strings'])), data['strings'])
+
+
+class SpliceTest(unittest.TestCase):
+
+    def setUp(self):
+        self.data = {**SAMPLE, 'strings': dict(sorted(SAMPLE['strings'].items(),
+                                                      key=lambda item: xcode_sort_key(item[0])))}
+        self.content = format_xcstrings(self.data).encode('utf-8')
+
+    def expected(self, strings):
+        ordered = dict(sorted(strings.items(), key=lambda item: xcode_sort_key(item[0])))
+        return format_xcstrings({**self.data, 'strings': ordered}).encode('utf-8')
+
+    def test_no_changes_keeps_the_bytes(self):
+        self.assertEqual(splice_entries(self.content, {}), self.content)
+
+    def test_replace_insert_and_remove_match_a_full_encode(self):
+        strings = dict(self.data['strings'])
+        strings['List'] = {'localizations': {'en': {'stringUnit': {'state': 'translated', 'value': 'Lists'}}}}
+        strings['Item 3'] = {'localizations': {}}
+        strings['zzz'] = {'localizations': {}}
+        del strings['Item 10']
+        changes = {'List': strings['List'], 'Item 3': strings['Item 3'], 'zzz': strings['zzz'], 'Item 10': None}
+        self.assertEqual(splice_entries(self.content, changes), self.expected(strings))
+
+    def assertSplices(self, changes):
+        strings = {key: entry for key, entry in self.data['strings'].items() if changes.get(key, entry) is not None}
+        strings.update((key, entry) for key, entry in changes.items() if entry is not None)
+        spliced = splice_entries(self.content, changes)
+        self.assertEqual(json.loads(spliced), json.loads(self.expected(strings)))
+        self.assertEqual(spliced, self.expected(strings))
+
+    def test_removing_the_last_entry(self):
+        self.assertSplices({list(self.data['strings'])[-1]: None})
+
+    def test_removing_several_trailing_entries(self):
+        keys = list(self.data['strings'])
+        self.assertSplices({key: None for key in keys[-2:]})
+        self.assertSplices({key: None for key in keys[1:]})
+
+    def test_removing_a_run_in_the_middle(self):
+        keys = list(self.data['strings'])
+        self.assertSplices({key: None for key in keys[1:3]})
+
+    def test_inserting_after_removed_trailing_entries(self):
+        keys = list(self.data['strings'])
+        changes = {key: None for key in keys[-2:]}
+        changes['zzz'] = {'localizations': {}}
+        self.assertSplices(changes)
+
+    def test_other_layouts_are_refused(self):
+        self.assertIsNone(splice_entries(json.dumps(self.data).encode('utf-8'), {}))
+
+
+class SaveTest(unittest.TestCase):
+
+    def test_save_writes_what_format_returns_and_keeps_a_backup(self):
+        with tempfile.TemporaryDirectory() as directory:
+            path = Path(directory) / "Localizable.xcstrings"
+            original = format_xcstrings(SAMPLE).encode('utf-8')
+            path.write_bytes(original)
+            changed = {**SAMPLE, 'version': '1.1'}
+            with contextlib.redirect_stdout(io.StringIO()):
+                self.assertTrue(save_fixed_file(changed, path))
+            self.assertEqual(path.read_bytes(), format_xcstrings(changed).encode('utf-8'))
+            backups = list(Path(directory).glob('*.backup*'))
+            self.assertEqual([backup.read_bytes() for backup in backups], [original])
+
+
+if __name__ == "__main__":
+    unittest.main()